@@ -0,0 +1,50 @@
+"""add chat sessions
+
+Revision ID: 20261017_0001
+Revises: 20260305_0001
+Create Date: 2026-10-17 00:00:00
+
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20261017_0001"
+down_revision: Union[str, None] = "20260305_0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "chatsession",
+        sa.Column("id", sa.String(length=32), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("context_json", sa.String(), nullable=True),
+        sa.Column("summary", sa.String(), nullable=False),
+        sa.Column("summarized_turns", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_chatsession_user_id"), "chatsession", ["user_id"], unique=False)
+
+    op.create_table(
+        "chatturn",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("session_id", sa.String(length=32), nullable=False),
+        sa.Column("role", sa.String(length=16), nullable=False),
+        sa.Column("content", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_chatturn_session_id"), "chatturn", ["session_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_chatturn_session_id"), table_name="chatturn")
+    op.drop_table("chatturn")
+    op.drop_index(op.f("ix_chatsession_user_id"), table_name="chatsession")
+    op.drop_table("chatsession")
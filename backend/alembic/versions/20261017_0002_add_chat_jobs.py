@@ -0,0 +1,44 @@
+"""add chat jobs
+
+Revision ID: 20261017_0002
+Revises: 20261017_0001
+Create Date: 2026-10-17 00:00:00
+
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20261017_0002"
+down_revision: Union[str, None] = "20261017_0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "chatjob",
+        sa.Column("id", sa.String(length=32), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("priority", sa.Integer(), nullable=False),
+        sa.Column("trip_id", sa.Integer(), nullable=True),
+        sa.Column("action", sa.String(length=32), nullable=True),
+        sa.Column("message", sa.String(), nullable=False),
+        sa.Column("context_json", sa.String(), nullable=True),
+        sa.Column("reply", sa.String(), nullable=True),
+        sa.Column("fallback", sa.Boolean(), nullable=False),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_chatjob_user_id"), "chatjob", ["user_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_chatjob_user_id"), table_name="chatjob")
+    op.drop_table("chatjob")
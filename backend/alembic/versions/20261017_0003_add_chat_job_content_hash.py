@@ -0,0 +1,27 @@
+"""add chat job content hash
+
+Revision ID: 20261017_0003
+Revises: 20261017_0002
+Create Date: 2026-10-17 00:00:00
+
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20261017_0003"
+down_revision: Union[str, None] = "20261017_0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("chatjob", sa.Column("content_hash", sa.String(length=64), nullable=True))
+    op.create_index(op.f("ix_chatjob_trip_id"), "chatjob", ["trip_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_chatjob_trip_id"), table_name="chatjob")
+    op.drop_column("chatjob", "content_hash")
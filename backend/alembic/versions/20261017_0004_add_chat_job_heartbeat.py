@@ -0,0 +1,27 @@
+"""add chat job heartbeat
+
+Revision ID: 20261017_0004
+Revises: 20261017_0003
+Create Date: 2026-10-17 00:00:00
+
+"""
+
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20261017_0004"
+down_revision: Union[str, None] = "20261017_0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("chatjob", sa.Column("claimed_by", sa.String(length=64), nullable=True))
+    op.add_column("chatjob", sa.Column("heartbeat_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("chatjob", "heartbeat_at")
+    op.drop_column("chatjob", "claimed_by")
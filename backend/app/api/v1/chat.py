@@ -1,85 +1,89 @@
 """API routes for AI chatbot endpoint."""
 
 import json
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 
-import httpx
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session, select
 
-from app.auth.security import get_current_user
+from app.auth.security import get_current_user, get_optional_current_user
+from app.core.admission import AdmissionRejectedError
 from app.core.config import settings
 from app.db.session import get_session
 from app.logger import get_logger
-from app.models import SavedTrip, User
-from app.schemas import ChatFromTripRequest, ChatFromTripResponse, ChatHealthResponse, ChatRequest, ChatResponse
-from app.services.llm import generate_chat_reply
+from app.models import ChatJob, ChatSession, SavedTrip, User
+from app.schemas import (
+    ChatFromTripRequest,
+    ChatFromTripResponse,
+    ChatHealthResponse,
+    ChatJobCreate,
+    ChatJobResponse,
+    ChatRequest,
+    ChatResponse,
+    ChatSessionCreate,
+    ChatSessionResponse,
+    ChatTurnResponse,
+)
+from app.services.chat_jobs import (
+    TERMINAL_JOB_STATUSES,
+    create_chat_job,
+    get_chat_job,
+    get_chat_job_pool,
+    wait_for_chat_job,
+)
+from app.services.chat_sessions import (
+    ChatHistory,
+    create_chat_session,
+    get_chat_session,
+    list_turns,
+    load_history,
+    open_db_session,
+    record_exchange,
+    schedule_summary,
+    session_context,
+)
+from app.services.llm import (
+    LLM_PRIORITY_CHAT,
+    LLM_PRIORITY_TRIP,
+    FallbackReply,
+    generate_chat_reply,
+    get_llm_scheduler,
+    get_ollama_client,
+    stream_chat_reply,
+    summarize_conversation,
+)
+from app.services.ollama_backends import get_ollama_backend_pool
+from app.services.trip_actions import (
+    PREGENERATED_ACTIONS,
+    build_trip_action_message,
+    build_trip_context,
+    pregenerated_reply,
+    store_trip_action_reply,
+)
 
 logger = get_logger(__name__)
 
 router = APIRouter(tags=["chat"])
 
+_SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
 
-def _build_trip_context(trip: SavedTrip) -> Dict[str, str]:
-    trip_days = (trip.end_date - trip.start_date).days + 1
-    context: Dict[str, str] = {
-        "origin": trip.origin,
-        "destination": trip.destination,
-        "start_date": trip.start_date.isoformat(),
-        "end_date": trip.end_date.isoformat(),
-        "days": str(max(trip_days, 1)),
-        "travelers": str(trip.travelers),
-        "transport_type": trip.transport_type,
-        "budget": f"{trip.total:.2f}",
-    }
 
-    try:
-        breakdown = json.loads(trip.breakdown_json)
-        if isinstance(breakdown, dict):
-            context["food_total"] = str(breakdown.get("food", ""))
-            context["misc_total"] = str(breakdown.get("misc", ""))
-    except (TypeError, ValueError):
-        logger.warning("Could not parse trip breakdown_json for trip_id=%s", trip.id)
-
-    return context
+def _client_key(http_request: Request) -> str:
+    client_host = http_request.client.host if http_request.client else "unknown"
+    return f"ip:{client_host}"
 
 
-def _build_trip_action_message(request: ChatFromTripRequest, context: Dict[str, str]) -> str:
-    destination = context.get("destination", "this destination")
-    days = context.get("days", "")
-    budget = context.get("budget", "")
-    transport_type = context.get("transport_type", "any")
+def _user_key(user: User) -> str:
+    return f"user:{user.id}"
 
-    if request.question:
-        return request.question
 
-    if request.action == "improve_itinerary":
-        return (
-            f"Improve my itinerary for {destination} in {days} day(s). "
-            "Give a day-wise plan with morning, afternoon, and evening suggestions."
-        )
-
-    if request.action == "reduce_budget_15":
-        target_budget_text = ""
-        try:
-            target_budget = round(float(budget) * 0.85, 2)
-            target_budget_text = f"Target total budget: {target_budget}. "
-        except (TypeError, ValueError):
-            target_budget_text = ""
-        return (
-            f"Reduce this trip budget by 15% while keeping good experience quality. {target_budget_text}"
-            f"Current preferred transport: {transport_type}."
-        )
-
-    if request.action == "family_friendly":
-        return (
-            f"Create a family-friendly version of this {days}-day {destination} trip. "
-            "Include kid-friendly attractions, rest breaks, and practical transport advice."
-        )
-
-    return (
-        f"Using this saved-trip context for {destination} ({days} day(s)), "
-        "give practical recommendations for planning and execution."
+def _busy_exception(exc: AdmissionRejectedError) -> HTTPException:
+    logger.warning("Chat request rejected by admission queue: %s", exc.reason)
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(exc),
+        headers={"Retry-After": exc.retry_after_header},
     )
 
 
@@ -94,18 +98,119 @@ def _get_user_trip_or_404(session: Session, current_user: User, trip_id: int) ->
     return trip
 
 
-def _extract_model_names(payload: Dict[str, Any]) -> List[str]:
-    models = payload.get("models")
-    if not isinstance(models, list):
-        return []
+def _get_chat_session_or_404(session: Session, session_id: str, current_user: Optional[User]) -> ChatSession:
+    """The chat session, if it is anonymous or belongs to ``current_user``."""
+    chat_session = get_chat_session(session, session_id)
+    if chat_session is not None and chat_session.user_id is not None:
+        # Someone else's session looks the same as a missing one.
+        if current_user is None or current_user.id != chat_session.user_id:
+            chat_session = None
+    if not chat_session:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chat session not found")
+    return chat_session
+
+
+def _resolve_chat_session(
+    session: Session,
+    request: ChatRequest,
+    current_user: Optional[User],
+) -> Tuple[Optional[ChatSession], Optional[Dict[str, str]], Optional[ChatHistory]]:
+    """Session, effective context and history for a chat request; the request's own context wins."""
+    if not request.session_id:
+        return None, request.context, None
+    chat_session = _get_chat_session_or_404(session, request.session_id, current_user)
+    context = request.context if request.context is not None else session_context(chat_session)
+    return chat_session, context, load_history(session, chat_session)
+
+
+def _trip_prefix_key(trip: SavedTrip) -> str:
+    return f"trip:{trip.id}"
+
+
+def _session_prefix_key(chat_session: Optional[ChatSession]) -> Optional[str]:
+    return f"session:{chat_session.id}" if chat_session is not None else None
+
+
+def _record_reply(session: Session, chat_session: ChatSession, message: str, reply: str) -> None:
+    """Append the exchange and compact older turns in the background; fallback replies are not kept."""
+    if isinstance(reply, FallbackReply):
+        return
+    overflow_turns = record_exchange(session, chat_session, message, str(reply))
+    schedule_summary(chat_session.id, overflow_turns, summarize_conversation)
+
+
+def _record_streamed_reply(session_id: str, message: str) -> Callable[[str], None]:
+    def record(reply: str) -> None:
+        with open_db_session() as session:
+            chat_session = get_chat_session(session, session_id)
+            if chat_session is not None:
+                _record_reply(session, chat_session, message, reply)
+
+    return record
+
+
+def _is_pregenerated(request: ChatFromTripRequest) -> bool:
+    return request.question is None and request.action in PREGENERATED_ACTIONS
+
+
+async def _precomputed_trip_reply(session: Session, trip: SavedTrip, request: ChatFromTripRequest) -> Optional[str]:
+    """Reply pre-generated for this trip version; waits for one that is being generated right now."""
+    if not _is_pregenerated(request):
+        return None
+    reply = await pregenerated_reply(session, trip, request.action, settings.llm_timeout_seconds)
+    if reply is not None:
+        logger.info(f"Serving pre-generated {request.action} reply for trip {trip.id}")
+    return reply
+
+
+def _store_streamed_trip_reply(trip_id: int, action: str) -> Callable[[str], None]:
+    def store(reply: str) -> None:
+        with open_db_session() as session:
+            trip = session.get(SavedTrip, trip_id)
+            if trip is not None:
+                store_trip_action_reply(session, trip, action, reply)
+
+    return store
+
+
+async def _single_chunk(text: str) -> AsyncIterator[str]:
+    yield text
+
+
+def _chat_session_response(session: Session, chat_session: ChatSession) -> ChatSessionResponse:
+    return ChatSessionResponse(
+        session_id=chat_session.id,
+        created_at=chat_session.created_at,
+        context=session_context(chat_session),
+        summary=chat_session.summary,
+        summarized_turns=chat_session.summarized_turns,
+        turns=[
+            ChatTurnResponse(role=turn.role, content=turn.content, created_at=turn.created_at)
+            for turn in list_turns(session, chat_session)
+        ],
+    )
+
+
+def _chat_job_response(job: ChatJob) -> ChatJobResponse:
+    return ChatJobResponse(
+        job_id=job.id,
+        status=job.status,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        trip_id=job.trip_id,
+        action=job.action,
+        reply=job.reply,
+        fallback=job.fallback,
+        error=job.error,
+    )
+
 
-    names: List[str] = []
-    for item in models:
-        if isinstance(item, dict):
-            name = item.get("name")
-            if isinstance(name, str) and name.strip():
-                names.append(name.strip())
-    return names
+def _get_user_chat_job_or_404(session: Session, current_user: User, job_id: str) -> ChatJob:
+    job = get_chat_job(session, job_id)
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chat job not found")
+    return job
 
 
 async def _get_chat_provider_health() -> Dict[str, Any]:
@@ -122,33 +227,72 @@ async def _get_chat_provider_health() -> Dict[str, Any]:
             "model_available": False,
         }
 
-    endpoint = f"{base_url.rstrip('/')}/api/tags"
-    timeout = httpx.Timeout(5.0)
-
-    try:
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.get(endpoint)
-            response.raise_for_status()
-            payload = response.json()
-    except (httpx.HTTPError, ValueError):
-        return {
-            "provider": provider,
-            "base_url": base_url,
-            "model": model,
-            "provider_reachable": False,
-            "model_available": False,
-        }
-
-    names = _extract_model_names(payload)
+    pool = get_ollama_backend_pool()
+    if not pool.snapshot_fresh():
+        # Only before the background probes covered every backend, or if they stopped.
+        await pool.check_all(get_ollama_client)
+    backends = pool.stats()
     return {
         "provider": provider,
-        "base_url": base_url,
+        "base_url": pool.backends[0].base_url,
         "model": model,
-        "provider_reachable": True,
-        "model_available": model in names,
+        "provider_reachable": any(backend["reachable"] for backend in backends.values()),
+        "model_available": any(backend["model_available"] for backend in backends.values()),
+        "checked_at": pool.checked_at,
+        "backends": backends,
     }
 
 
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _start_stream(chunks: AsyncIterator[str]) -> Optional[str]:
+    """Pull the first chunk so queueing and provider errors surface before the response starts."""
+    try:
+        return await chunks.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+async def _sse_reply_events(
+    first_chunk: Optional[str],
+    chunks: AsyncIterator[str],
+    leading_events: List[str],
+    on_complete: Optional[Callable[[str], None]] = None,
+) -> AsyncIterator[str]:
+    for event in leading_events:
+        yield event
+
+    fallback = isinstance(first_chunk, FallbackReply)
+    parts: List[str] = []
+    try:
+        if first_chunk is not None:
+            parts.append(first_chunk)
+            yield _sse_event("token", {"content": first_chunk})
+        async for chunk in chunks:
+            fallback = fallback or isinstance(chunk, FallbackReply)
+            parts.append(chunk)
+            yield _sse_event("token", {"content": chunk})
+    except RuntimeError as exc:
+        logger.warning("Chat stream aborted: %s", str(exc))
+        yield _sse_event("error", {"detail": str(exc)})
+        return
+    except Exception as exc:
+        logger.error("Unexpected chat stream error: %s", str(exc), exc_info=True)
+        yield _sse_event("error", {"detail": "Failed to generate response. Please try again."})
+        return
+    finally:
+        await chunks.aclose()
+
+    if on_complete is not None and not fallback:
+        try:
+            on_complete("".join(parts))
+        except Exception as exc:
+            logger.warning("Could not record streamed chat reply: %s", str(exc))
+    yield _sse_event("done", {"fallback": fallback})
+
+
 @router.get(
     "/chat/health",
     response_model=ChatHealthResponse,
@@ -157,8 +301,10 @@ async def _get_chat_provider_health() -> Dict[str, Any]:
     },
 )
 async def chat_health() -> ChatHealthResponse:
-    """Return chatbot provider/model readiness details."""
+    """Return chatbot provider/model readiness from the background-refreshed health snapshot."""
     health = await _get_chat_provider_health()
+    # Per-backend URLs and error text stay on the authenticated /metrics endpoint.
+    health.pop("backends", None)
     return ChatHealthResponse(**health)
 
 
@@ -167,16 +313,35 @@ async def chat_health() -> ChatHealthResponse:
     response_model=ChatResponse,
     responses={
         400: {"description": "Invalid chat request"},
+        404: {"description": "Chat session not found"},
         503: {"description": "LLM provider unavailable"},
         500: {"description": "Internal server error"},
     },
 )
-async def chat(request: ChatRequest) -> ChatResponse:
+async def chat(
+    request: ChatRequest,
+    http_request: Request,
+    session: Session = Depends(get_session),
+    current_user: Optional[User] = Depends(get_optional_current_user),
+) -> ChatResponse:
     """Generate a chatbot response from the configured LLM provider."""
+    chat_session, context, history = _resolve_chat_session(session, request, current_user)
     try:
         logger.info("Chat message received")
-        reply = await generate_chat_reply(request.message, request.context)
-        return ChatResponse(reply=reply)
+        reply = await generate_chat_reply(
+            request.message,
+            context,
+            user_key=_client_key(http_request),
+            priority=LLM_PRIORITY_CHAT,
+            history=history,
+            prefix_key=_session_prefix_key(chat_session),
+        )
+        if chat_session is None:
+            return ChatResponse(reply=reply)
+        _record_reply(session, chat_session, request.message, reply)
+        return ChatResponse(reply=reply, session_id=chat_session.id)
+    except AdmissionRejectedError as exc:
+        raise _busy_exception(exc) from exc
     except RuntimeError as exc:
         logger.warning("Chat provider unavailable: %s", str(exc))
         raise HTTPException(
@@ -191,12 +356,105 @@ async def chat(request: ChatRequest) -> ChatResponse:
         ) from exc
 
 
+@router.post(
+    "/chat/stream",
+    response_class=StreamingResponse,
+    responses={
+        200: {"description": "Server-Sent Events: `token` events with text deltas, then `done` (or `error`)"},
+        400: {"description": "Invalid chat request"},
+        404: {"description": "Chat session not found"},
+        503: {"description": "LLM provider unavailable"},
+        500: {"description": "Internal server error"},
+    },
+)
+async def chat_stream(
+    request: ChatRequest,
+    http_request: Request,
+    session: Session = Depends(get_session),
+    current_user: Optional[User] = Depends(get_optional_current_user),
+) -> StreamingResponse:
+    """Stream a chatbot response token by token as Server-Sent Events."""
+    chat_session, context, history = _resolve_chat_session(session, request, current_user)
+    chunks = stream_chat_reply(
+        request.message,
+        context,
+        user_key=_client_key(http_request),
+        priority=LLM_PRIORITY_CHAT,
+        history=history,
+        prefix_key=_session_prefix_key(chat_session),
+    )
+    try:
+        logger.info("Chat stream message received")
+        first_chunk = await _start_stream(chunks)
+    except AdmissionRejectedError as exc:
+        raise _busy_exception(exc) from exc
+    except RuntimeError as exc:
+        logger.warning("Chat provider unavailable: %s", str(exc))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc),
+        ) from exc
+    except Exception as exc:
+        logger.error("Unexpected chat error: %s", str(exc), exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to generate response. Please try again.",
+        ) from exc
+
+    on_complete = _record_streamed_reply(chat_session.id, request.message) if chat_session else None
+    return StreamingResponse(
+        _sse_reply_events(first_chunk, chunks, [], on_complete),
+        media_type="text/event-stream",
+        headers=_SSE_HEADERS,
+    )
+
+
+@router.post(
+    "/chat/sessions",
+    response_model=ChatSessionResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={
+        500: {"description": "Internal server error"},
+    },
+)
+async def start_chat_session(
+    request: ChatSessionCreate,
+    session: Session = Depends(get_session),
+    current_user: Optional[User] = Depends(get_optional_current_user),
+) -> ChatSessionResponse:
+    """Start a server-side chat session; pass its ID as `session_id` to continue the conversation.
+
+    Sessions started while signed in can only be read and continued by the same user.
+    """
+    chat_session = create_chat_session(session, request.context, user_id=current_user.id if current_user else None)
+    return _chat_session_response(session, chat_session)
+
+
+@router.get(
+    "/chat/sessions/{session_id}",
+    response_model=ChatSessionResponse,
+    responses={
+        404: {"description": "Chat session not found"},
+        500: {"description": "Internal server error"},
+    },
+)
+async def read_chat_session(
+    session_id: str,
+    session: Session = Depends(get_session),
+    current_user: Optional[User] = Depends(get_optional_current_user),
+) -> ChatSessionResponse:
+    """Return a chat session's summary and recorded turns."""
+    chat_session = _get_chat_session_or_404(session, session_id, current_user)
+    return _chat_session_response(session, chat_session)
+
+
 @router.post(
     "/chat/from-trip/{trip_id}",
     response_model=ChatFromTripResponse,
     responses={
         401: {"description": "Unauthorized"},
         404: {"description": "Trip not found"},
+        503: {"description": "LLM service busy"},
         500: {"description": "Internal server error"},
     },
 )
@@ -209,9 +467,28 @@ async def chat_from_saved_trip(
     """Generate chat response using trusted context from an authenticated user's saved trip."""
     try:
         trip = _get_user_trip_or_404(session, current_user, trip_id)
-        context = _build_trip_context(trip)
-        message = _build_trip_action_message(request, context)
-        reply = await generate_chat_reply(message, context)
+        context = build_trip_context(trip)
+        precomputed = await _precomputed_trip_reply(session, trip, request)
+        if precomputed is not None:
+            return ChatFromTripResponse(
+                trip_id=trip.id,
+                action=request.action,
+                reply=precomputed,
+                context=context,
+                precomputed=True,
+            )
+
+        message = build_trip_action_message(request.action, request.question, context)
+        reply = await generate_chat_reply(
+            message,
+            context,
+            user_key=_user_key(current_user),
+            priority=LLM_PRIORITY_TRIP,
+            prefix_key=_trip_prefix_key(trip),
+            endpoint="from_trip",
+        )
+        if _is_pregenerated(request) and not isinstance(reply, FallbackReply):
+            store_trip_action_reply(session, trip, request.action, reply)
         return ChatFromTripResponse(
             trip_id=trip.id,
             action=request.action,
@@ -220,9 +497,145 @@ async def chat_from_saved_trip(
         )
     except HTTPException:
         raise
+    except AdmissionRejectedError as exc:
+        raise _busy_exception(exc) from exc
     except Exception as exc:
         logger.error("Unexpected chat-from-trip error: %s", str(exc), exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to generate trip-based response. Please try again.",
         ) from exc
+
+
+@router.post(
+    "/chat/from-trip/{trip_id}/stream",
+    response_class=StreamingResponse,
+    responses={
+        200: {"description": "Server-Sent Events: `context`, then `token` events, then `done` (or `error`)"},
+        401: {"description": "Unauthorized"},
+        404: {"description": "Trip not found"},
+        503: {"description": "LLM service busy"},
+        500: {"description": "Internal server error"},
+    },
+)
+async def chat_from_saved_trip_stream(
+    trip_id: int,
+    request: ChatFromTripRequest,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+) -> StreamingResponse:
+    """Stream a saved-trip chat response as Server-Sent Events."""
+    try:
+        trip = _get_user_trip_or_404(session, current_user, trip_id)
+        context = build_trip_context(trip)
+        precomputed = await _precomputed_trip_reply(session, trip, request)
+        if precomputed is not None:
+            chunks = _single_chunk(precomputed)
+        else:
+            message = build_trip_action_message(request.action, request.question, context)
+            chunks = stream_chat_reply(
+                message,
+                context,
+                user_key=_user_key(current_user),
+                priority=LLM_PRIORITY_TRIP,
+                prefix_key=_trip_prefix_key(trip),
+                endpoint="from_trip_stream",
+            )
+        first_chunk = await _start_stream(chunks)
+    except HTTPException:
+        raise
+    except AdmissionRejectedError as exc:
+        raise _busy_exception(exc) from exc
+    except Exception as exc:
+        logger.error("Unexpected chat-from-trip error: %s", str(exc), exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to generate trip-based response. Please try again.",
+        ) from exc
+
+    context_event = _sse_event(
+        "context",
+        {"trip_id": trip.id, "action": request.action, "context": context, "precomputed": precomputed is not None},
+    )
+    on_complete = None
+    if precomputed is None and _is_pregenerated(request):
+        on_complete = _store_streamed_trip_reply(trip.id, request.action)
+    return StreamingResponse(
+        _sse_reply_events(first_chunk, chunks, [context_event], on_complete=on_complete),
+        media_type="text/event-stream",
+        headers=_SSE_HEADERS,
+    )
+
+
+@router.post(
+    "/chat/jobs",
+    response_model=ChatJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={
+        401: {"description": "Unauthorized"},
+        404: {"description": "Trip not found"},
+        503: {"description": "Too many queued jobs"},
+        500: {"description": "Internal server error"},
+    },
+)
+async def queue_chat_job(
+    request: ChatJobCreate,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+) -> ChatJobResponse:
+    """Queue a long generation and return its job ID right away; poll `GET /chat/jobs/{job_id}` for the reply."""
+    pool = get_chat_job_pool()
+    if pool.is_full():
+        logger.warning("Chat job rejected: job queue is full")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many chat jobs are queued. Please try again later.",
+            headers={"Retry-After": str(max(1, round(get_llm_scheduler().service_seconds)))},
+        )
+
+    if request.trip_id is not None:
+        trip = _get_user_trip_or_404(session, current_user, request.trip_id)
+        context = build_trip_context(trip)
+        message = build_trip_action_message(request.action, request.message, context)
+        job = create_chat_job(
+            session,
+            current_user.id,
+            message,
+            context,
+            LLM_PRIORITY_TRIP,
+            trip_id=trip.id,
+            action=request.action,
+        )
+    else:
+        job = create_chat_job(session, current_user.id, request.message, request.context, LLM_PRIORITY_CHAT)
+
+    pool.submit(job.id)
+    logger.info(f"Chat job {job.id} queued")
+    return _chat_job_response(job)
+
+
+@router.get(
+    "/chat/jobs/{job_id}",
+    response_model=ChatJobResponse,
+    responses={
+        401: {"description": "Unauthorized"},
+        404: {"description": "Chat job not found"},
+        500: {"description": "Internal server error"},
+    },
+)
+async def read_chat_job(
+    job_id: str,
+    wait: float = Query(
+        default=0,
+        ge=0,
+        le=settings.llm_job_max_wait_seconds,
+        description="Seconds to hold the request open until the job finishes (long polling)",
+    ),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session),
+) -> ChatJobResponse:
+    """Return a chat job's status, and its reply once it has finished."""
+    job = _get_user_chat_job_or_404(session, current_user, job_id)
+    if wait > 0 and job.status not in TERMINAL_JOB_STATUSES:
+        job = await wait_for_chat_job(job_id, wait) or job
+    return _chat_job_response(job)
@@ -0,0 +1,71 @@
+"""API routes exposing runtime performance metrics."""
+
+import secrets
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+
+from app.core.config import settings
+from app.providers.registry import get_provider_registry
+from app.services.chat_cache import get_chat_response_cache
+from app.services.chat_jobs import get_chat_job_pool
+from app.services.city_index import get_city_stats_index
+from app.services.intent_router import get_intent_router
+from app.services.llm import get_cluster_semaphore, get_llm_scheduler, get_model_keeper, llm_client_stats
+from app.services.llm_metrics import get_generation_metrics
+from app.services.ollama_backends import get_ollama_backend_pool
+from app.services.pricing import get_singleflight_stats
+from app.services.prompt_prefix import get_prompt_prefix_tracker
+from app.services.quote_cache import get_quote_cache
+
+router = APIRouter(tags=["metrics"])
+
+
+def require_metrics_token(authorization: Optional[str] = Header(default=None)) -> None:
+    """Allow only callers presenting ``METRICS_TOKEN`` as a bearer token; user logins are not enough."""
+    expected = settings.metrics_token
+    if not expected:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Metrics are disabled")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.strip(), expected):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@router.get(
+    "/metrics",
+    responses={
+        401: {"description": "Missing or invalid metrics token"},
+        403: {"description": "Metrics are disabled"},
+    },
+    dependencies=[Depends(require_metrics_token)],
+)
+async def get_metrics() -> Dict[str, Any]:
+    """Return in-process counters for connection pools and caches, and LLM timing histograms.
+
+    Requires the ops ``METRICS_TOKEN``: the counters include internal backend URLs and raw error text.
+    """
+    registry = get_provider_registry()
+    return {
+        "transport_providers": registry.stats(),
+        "circuit_breakers": registry.breaker_stats(),
+        "quote_cache": get_quote_cache().stats(),
+        "singleflight": get_singleflight_stats(),
+        "city_stats_index": get_city_stats_index().stats(),
+        "chat_response_cache": get_chat_response_cache().stats(),
+        "llm_http": llm_client_stats(),
+        "ollama_backends": get_ollama_backend_pool().stats(),
+        "ollama_model_keeper": get_model_keeper().stats(),
+        "ollama_generation": get_generation_metrics().stats(),
+        "prompt_prefix_reuse": {
+            **get_prompt_prefix_tracker().stats(),
+            "affinity": get_ollama_backend_pool().affinity_stats(),
+        },
+        "chat_fast_path": get_intent_router().stats(),
+        "llm_admission": get_llm_scheduler().stats(),
+        "chat_jobs": get_chat_job_pool().stats(),
+        "llm_cluster_limit": get_cluster_semaphore().stats() if settings.llm_cluster_limit_enabled else None,
+    }
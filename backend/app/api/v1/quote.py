@@ -1,10 +1,26 @@
 """API routes for trip quote endpoint."""
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import ValidationError
 from sqlmodel import Session
 
-from app.schemas import TripRequest, QuoteResponse, Breakdown
-from app.services.pricing import estimate_trip
+from app.schemas import (
+    TripRequest,
+    QuoteResponse,
+    Breakdown,
+    BatchQuoteRequest,
+    BatchQuoteResponse,
+    BatchQuoteItemResult,
+    PriceCalendarRequest,
+    PriceCalendarResponse,
+    PriceCalendarEntry,
+    ItineraryRequest,
+    ItineraryQuoteResponse,
+)
+from app.services.pricing import estimate_trip, estimate_trips
+from app.services.price_calendar import estimate_price_calendar
+from app.services.itinerary import estimate_itinerary
+from app.core.config import settings
 from app.db.session import get_session
 from app.exceptions import TravelBuddyException, create_http_exception
 from app.logger import get_logger
@@ -14,6 +30,19 @@ logger = get_logger(__name__)
 router = APIRouter(tags=["quotes"])
 
 
+def _build_quote_response(result: dict) -> QuoteResponse:
+    breakdown = Breakdown(
+        transport=result["transport_options"],
+        accommodation=result["accommodation"],
+        food=result["food"],
+        misc=result["misc"],
+        total=result["total"],
+    )
+    partial = any(option.partial for option in result["transport_options"])
+    estimated = any(option.estimated for option in result["transport_options"])
+    return QuoteResponse(trip_days=result["trip_days"], breakdown=breakdown, partial=partial, estimated=estimated)
+
+
 @router.post(
     "/quote",
     response_model=QuoteResponse,
@@ -56,15 +85,7 @@ async def create_quote(
         result = await estimate_trip(request, session)
         
         # Build response
-        breakdown = Breakdown(
-            transport=result["transport_options"],
-            accommodation=result["accommodation"],
-            food=result["food"],
-            misc=result["misc"],
-            total=result["total"],
-        )
-        
-        response = QuoteResponse(trip_days=result["trip_days"], breakdown=breakdown)
+        response = _build_quote_response(result)
         logger.info(f"Quote created successfully: ${response.breakdown.total}")
         return response
         
@@ -77,3 +98,176 @@ async def create_quote(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to create quote. Please try again later.",
         )
+
+
+@router.post(
+    "/quotes/batch",
+    response_model=BatchQuoteResponse,
+    responses={
+        422: {"description": "Batch is empty or exceeds the maximum size"},
+        500: {"description": "Internal server error"},
+    },
+)
+async def create_batch_quote(
+    request: BatchQuoteRequest,
+    session: Session = Depends(get_session),
+) -> BatchQuoteResponse:
+    """
+    Price many trip variants in one request.
+    
+    Each item is validated and estimated exactly like `POST /quote`. Provider
+    calls run concurrently, and routes or destinations shared by several items
+    are fetched once. A failing item does not fail the batch; its error is
+    reported in place.
+    """
+    results: list = [None] * len(request.items)
+    valid_indexes: list = []
+    valid_requests: list = []
+
+    for index, item in enumerate(request.items):
+        try:
+            valid_requests.append(TripRequest.model_validate(item))
+            valid_indexes.append(index)
+        except ValidationError as e:
+            message = "; ".join(error.get("msg", "Invalid value") for error in e.errors())
+            results[index] = BatchQuoteItemResult(
+                index=index,
+                status="error",
+                error=message,
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+
+    logger.info(f"Creating batch quote: {len(request.items)} items, {len(valid_requests)} valid")
+
+    estimates = await estimate_trips(
+        valid_requests,
+        session,
+        max_concurrency=settings.quote_batch_max_concurrency,
+    )
+
+    for index, outcome in zip(valid_indexes, estimates):
+        if isinstance(outcome, TravelBuddyException):
+            http_exc = create_http_exception(outcome)
+            results[index] = BatchQuoteItemResult(
+                index=index,
+                status="error",
+                error=http_exc.detail,
+                status_code=http_exc.status_code,
+            )
+        elif isinstance(outcome, Exception):
+            logger.error(f"Unexpected error in batch quote item {index}: {str(outcome)}")
+            results[index] = BatchQuoteItemResult(
+                index=index,
+                status="error",
+                error="Failed to create quote. Please try again later.",
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+        else:
+            results[index] = BatchQuoteItemResult(
+                index=index,
+                status="ok",
+                quote=_build_quote_response(outcome),
+            )
+
+    succeeded = sum(1 for result in results if result.status == "ok")
+    return BatchQuoteResponse(
+        results=results,
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+    )
+
+
+@router.post(
+    "/quote/calendar",
+    response_model=PriceCalendarResponse,
+    responses={
+        422: {"description": "Invalid date window"},
+        500: {"description": "Internal server error"},
+    },
+)
+async def create_price_calendar(
+    request: PriceCalendarRequest,
+    session: Session = Depends(get_session),
+) -> PriceCalendarResponse:
+    """
+    Price a fixed-length trip for every departure date in a window.
+    
+    Replaces one `/quote` call per candidate date: provider prices are fetched
+    once per date bucket and the per-date costs are computed in one pass.
+    """
+    try:
+        logger.info(
+            f"Creating price calendar: {request.origin} -> {request.destination}, "
+            f"{request.window_start} to {request.window_end}, {request.trip_days} days"
+        )
+        rows = await estimate_price_calendar(
+            origin=request.origin,
+            destination=request.destination,
+            window_start=request.window_start,
+            window_end=request.window_end,
+            trip_days=request.trip_days,
+            travelers=request.travelers,
+            session=session,
+        )
+        entries = [PriceCalendarEntry(**row) for row in rows]
+        cheapest = min(entries, key=lambda entry: entry.total)
+        return PriceCalendarResponse(trip_days=request.trip_days, entries=entries, cheapest=cheapest)
+    except TravelBuddyException as e:
+        logger.warning(f"Error creating price calendar: {e.message}")
+        raise create_http_exception(e)
+    except Exception as e:
+        logger.error(f"Unexpected error creating price calendar: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to create price calendar. Please try again later.",
+        )
+
+
+@router.post(
+    "/quote/itinerary",
+    response_model=ItineraryQuoteResponse,
+    responses={
+        422: {"description": "Invalid itinerary"},
+        500: {"description": "Internal server error"},
+    },
+)
+async def create_itinerary_quote(
+    request: ItineraryRequest,
+    session: Session = Depends(get_session),
+) -> ItineraryQuoteResponse:
+    """
+    Quote a round trip from the origin through several stops and back.
+    
+    Transport for every city pair is fetched concurrently once; unless
+    `optimize_order` is false, stops are visited in the order with the lowest
+    transport cost. Each stop's accommodation, food and misc costs follow the
+    single-trip quote model for its number of nights.
+    """
+    try:
+        logger.info(
+            f"Creating itinerary quote: {request.origin} via {len(request.stops)} stops "
+            f"from {request.start_date}, {request.travelers} travelers"
+        )
+        result = await estimate_itinerary(
+            origin=request.origin,
+            stops=[(stop.city, stop.nights) for stop in request.stops],
+            start_date=request.start_date,
+            travelers=request.travelers,
+            session=session,
+            optimize_order=request.optimize_order,
+        )
+        options = [leg["option"] for leg in result["legs"]]
+        return ItineraryQuoteResponse(
+            **result,
+            partial=any(option.partial for option in options),
+            estimated=any(option.estimated for option in options),
+        )
+    except TravelBuddyException as e:
+        logger.warning(f"Error creating itinerary quote: {e.message}")
+        raise create_http_exception(e)
+    except Exception as e:
+        logger.error(f"Unexpected error creating itinerary quote: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to create itinerary quote. Please try again later.",
+        )
@@ -2,20 +2,36 @@
 
 import json
 from typing import List
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, status, HTTPException
 from sqlmodel import Session, select
 
 from app.auth.security import get_current_user
 from app.db.session import get_session
+from app.logger import get_logger
 from app.models import SavedTrip, User
 from app.schemas import SavedTripCreate, SavedTripResponse, Breakdown
+from app.services.trip_actions import prepare_trip_action_jobs, submit_trip_action_jobs
+
+logger = get_logger(__name__)
 
 router = APIRouter(tags=["trips"])
 
 
+def _schedule_trip_actions(session: Session, trip: SavedTrip, background_tasks: BackgroundTasks) -> None:
+    """Drop AI replies for the previous trip version and pre-generate the common actions after the response."""
+    try:
+        job_ids = prepare_trip_action_jobs(session, trip)
+    except Exception as exc:
+        logger.warning("Could not schedule saved-trip action pre-generation: %s", str(exc))
+        return
+    if job_ids:
+        background_tasks.add_task(submit_trip_action_jobs, job_ids)
+
+
 @router.post("/trips", response_model=SavedTripResponse, status_code=status.HTTP_201_CREATED)
 def save_trip(
     payload: SavedTripCreate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session),
 ) -> SavedTripResponse:
@@ -34,6 +50,7 @@ def save_trip(
     session.add(saved)
     session.commit()
     session.refresh(saved)
+    _schedule_trip_actions(session, saved, background_tasks)
 
     breakdown = Breakdown.model_validate(json.loads(saved.breakdown_json))
     return SavedTripResponse(
@@ -108,6 +125,7 @@ def get_trip(
 def update_trip(
     trip_id: int,
     payload: SavedTripCreate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session),
 ) -> SavedTripResponse:
@@ -130,6 +148,7 @@ def update_trip(
     session.add(trip)
     session.commit()
     session.refresh(trip)
+    _schedule_trip_actions(session, trip, background_tasks)
     
     breakdown = Breakdown.model_validate(json.loads(trip.breakdown_json))
     return SavedTripResponse(
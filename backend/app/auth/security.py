@@ -53,3 +53,16 @@ def get_current_user(
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
 
     return user
+
+
+def get_optional_current_user(
+    request: Request,
+    session: Session = Depends(get_session),
+) -> Optional[User]:
+    """The signed-in user, or None for anonymous requests and invalid or expired tokens."""
+    if not request.cookies.get(settings.auth_cookie_name):
+        return None
+    try:
+        return get_current_user(request, session)
+    except HTTPException:
+        return None
@@ -0,0 +1,225 @@
+"""Fair, priority-aware admission control for a fixed number of execution slots."""
+
+import asyncio
+import math
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from time import perf_counter
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+REJECT_QUEUE_FULL = "queue_full"
+REJECT_USER_QUEUE_FULL = "user_queue_full"
+REJECT_WAIT_TOO_LONG = "wait_too_long"
+REJECT_TIMEOUT = "timeout"
+
+
+class AdmissionRejectedError(RuntimeError):
+    """Raised when a request cannot be admitted; ``retry_after`` is a suggested delay in seconds."""
+
+    def __init__(self, reason: str, retry_after: float):
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__("LLM service is busy. Please retry in a few seconds.")
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class _Waiter:
+    __slots__ = ("key", "priority", "future", "enqueued_at")
+
+    def __init__(self, key: str, priority: int, future: "asyncio.Future[None]") -> None:
+        self.key = key
+        self.priority = priority
+        self.future = future
+        self.enqueued_at = perf_counter()
+
+
+class FairScheduler:
+    """
+    Hands out ``slots`` concurrent permits.
+
+    Waiters are grouped by priority (lower value first); inside a priority
+    class users are served round-robin, so one user with many queued requests
+    only gets every n-th free slot. Requests are rejected up front when the
+    queue is full, the user already has too many queued requests, or the
+    expected wait (queued work ahead divided by slots, times the observed
+    service time) exceeds ``max_wait_seconds``.
+    """
+
+    def __init__(
+        self,
+        slots: int,
+        max_queue_depth: int = 32,
+        max_queued_per_key: int = 4,
+        max_wait_seconds: float = 20.0,
+        initial_service_seconds: float = 5.0,
+        ewma_alpha: float = 0.2,
+    ) -> None:
+        self.slots = max(1, slots)
+        self.max_queue_depth = max(0, max_queue_depth)
+        self.max_queued_per_key = max(1, max_queued_per_key)
+        self.max_wait_seconds = max(0.0, max_wait_seconds)
+        self.ewma_alpha = min(1.0, max(0.01, ewma_alpha))
+        self._service_seconds = max(0.0, initial_service_seconds)
+        self._wait_seconds = 0.0
+        self._max_wait_observed = 0.0
+        self._in_use = 0
+        self._depth = 0
+        self._queues: Dict[int, "OrderedDict[str, Deque[_Waiter]]"] = {}
+        self._counters: Dict[str, int] = {
+            "admitted": 0,
+            "queued": 0,
+            REJECT_QUEUE_FULL: 0,
+            REJECT_USER_QUEUE_FULL: 0,
+            REJECT_WAIT_TOO_LONG: 0,
+            REJECT_TIMEOUT: 0,
+        }
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    @property
+    def queue_depth(self) -> int:
+        return self._depth
+
+    @property
+    def service_seconds(self) -> float:
+        return self._service_seconds
+
+    def estimated_wait(self, ahead: int) -> float:
+        """Expected seconds until a slot frees up for a request with ``ahead`` waiters in front of it."""
+        if self._in_use < self.slots and ahead == 0:
+            return 0.0
+        return (ahead + 1) / self.slots * self._service_seconds
+
+    def _ahead_of(self, priority: int) -> int:
+        return sum(
+            len(waiters)
+            for level, users in self._queues.items()
+            if level <= priority
+            for waiters in users.values()
+        )
+
+    def _queued_for(self, key: str) -> int:
+        return sum(len(users.get(key, ())) for users in self._queues.values())
+
+    def _reject(self, reason: str, retry_after: float) -> AdmissionRejectedError:
+        self._counters[reason] += 1
+        return AdmissionRejectedError(reason, retry_after)
+
+    def _observe_wait(self, waited: float) -> None:
+        self._wait_seconds += self.ewma_alpha * (waited - self._wait_seconds)
+        self._max_wait_observed = max(self._max_wait_observed, waited)
+
+    def _observe_service(self, elapsed: float) -> None:
+        self._service_seconds += self.ewma_alpha * (elapsed - self._service_seconds)
+
+    async def acquire(self, key: str, priority: int = 0) -> None:
+        """Wait for a slot; raises AdmissionRejectedError instead of queueing hopelessly."""
+        if self._in_use < self.slots and self._depth == 0:
+            self._in_use += 1
+            self._counters["admitted"] += 1
+            self._observe_wait(0.0)
+            return
+
+        if self._depth >= self.max_queue_depth:
+            raise self._reject(REJECT_QUEUE_FULL, self.estimated_wait(self._depth))
+        if self._queued_for(key) >= self.max_queued_per_key:
+            raise self._reject(REJECT_USER_QUEUE_FULL, self.estimated_wait(self._ahead_of(priority)))
+        expected_wait = self.estimated_wait(self._ahead_of(priority))
+        if expected_wait > self.max_wait_seconds:
+            raise self._reject(REJECT_WAIT_TOO_LONG, expected_wait)
+
+        waiter = _Waiter(key, priority, asyncio.get_running_loop().create_future())
+        self._queues.setdefault(priority, OrderedDict()).setdefault(key, deque()).append(waiter)
+        self._depth += 1
+        self._counters["queued"] += 1
+
+        try:
+            await asyncio.wait({waiter.future}, timeout=self.max_wait_seconds)
+        except BaseException:
+            # Cancelled while waiting: give back a slot that was already handed over.
+            if waiter.future.done() and not waiter.future.cancelled():
+                self.release()
+            else:
+                self._discard(waiter)
+            raise
+
+        if not waiter.future.done():
+            self._discard(waiter)
+            raise self._reject(REJECT_TIMEOUT, self.estimated_wait(self._ahead_of(priority)))
+
+    def _discard(self, waiter: _Waiter) -> None:
+        if not waiter.future.done():
+            waiter.future.cancel()
+        users = self._queues.get(waiter.priority)
+        waiters = users.get(waiter.key) if users is not None else None
+        if waiters is None or waiter not in waiters:
+            return
+        waiters.remove(waiter)
+        self._depth -= 1
+        if not waiters:
+            del users[waiter.key]
+
+    def _pop_next(self) -> Optional[_Waiter]:
+        for priority in sorted(self._queues):
+            users = self._queues[priority]
+            while users:
+                key, waiters = next(iter(users.items()))
+                waiter = waiters.popleft()
+                self._depth -= 1
+                if waiters:
+                    users.move_to_end(key)
+                else:
+                    del users[key]
+                if not waiter.future.done():
+                    return waiter
+        return None
+
+    def release(self, service_seconds: Optional[float] = None) -> None:
+        """Free a slot, handing it directly to the next waiter when there is one."""
+        if service_seconds is not None:
+            self._observe_service(service_seconds)
+
+        waiter = self._pop_next()
+        if waiter is None:
+            self._in_use = max(0, self._in_use - 1)
+            return
+
+        self._counters["admitted"] += 1
+        self._observe_wait(perf_counter() - waiter.enqueued_at)
+        waiter.future.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, key: str, priority: int = 0) -> AsyncIterator[None]:
+        await self.acquire(key, priority)
+        started_at = perf_counter()
+        try:
+            yield
+        finally:
+            self.release(perf_counter() - started_at)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "slots": self.slots,
+            "in_use": self._in_use,
+            "utilization": round(self._in_use / self.slots, 3),
+            "queue_depth": self._depth,
+            "queue_depth_by_priority": {
+                str(priority): sum(len(waiters) for waiters in users.values())
+                for priority, users in sorted(self._queues.items())
+                if users
+            },
+            "max_queue_depth": self.max_queue_depth,
+            "avg_wait_seconds": round(self._wait_seconds, 4),
+            "max_wait_seconds_observed": round(self._max_wait_observed, 4),
+            "avg_service_seconds": round(self._service_seconds, 4),
+            **self._counters,
+        }
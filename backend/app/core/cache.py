@@ -0,0 +1,147 @@
+"""Cache building blocks shared by quote and chat caching layers."""
+
+import json
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Dict, Optional
+
+from app.logger import get_logger
+
+try:
+    import redis.asyncio as redis
+except Exception:  # pragma: no cover - import guard for environments without redis package
+    redis = None
+
+logger = get_logger(__name__)
+
+
+class LRUCache:
+    """Bounded process-local LRU map with optional per-entry TTL."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, tuple[Any, Optional[float]]]" = OrderedDict()
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        value, expires_at = entry
+        if expires_at is not None and monotonic() >= expires_at:
+            del self._entries[key]
+            self.expirations += 1
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        expires_at = monotonic() + ttl_seconds if ttl_seconds is not None else None
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class RedisJSONCache:
+    """Redis-backed JSON value cache; failures degrade to cache misses."""
+
+    def __init__(
+        self,
+        redis_url: str,
+        key_prefix: str,
+        connect_timeout_seconds: float,
+        socket_timeout_seconds: float,
+    ) -> None:
+        if redis is None:
+            raise RuntimeError("Redis package is not installed.")
+
+        self.key_prefix = key_prefix.strip() or "travel_buddy:cache"
+        self.errors = 0
+        self._client = redis.from_url(
+            redis_url,
+            decode_responses=True,
+            socket_connect_timeout=connect_timeout_seconds,
+            socket_timeout=socket_timeout_seconds,
+        )
+
+    def _build_key(self, key: str) -> str:
+        return f"{self.key_prefix}:{key}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = await self._client.get(self._build_key(key))
+        except Exception as exc:
+            self.errors += 1
+            logger.warning("Redis cache read failed for key '%s': %s", key, str(exc))
+            return None
+
+        if raw is None:
+            return None
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return None
+
+    async def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        try:
+            await self._client.set(self._build_key(key), json.dumps(value), ex=max(1, int(ttl_seconds)))
+        except Exception as exc:
+            self.errors += 1
+            logger.warning("Redis cache write failed for key '%s': %s", key, str(exc))
+
+    async def delete(self, key: str) -> None:
+        try:
+            await self._client.delete(self._build_key(key))
+        except Exception as exc:
+            self.errors += 1
+            logger.warning("Redis cache delete failed for key '%s': %s", key, str(exc))
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def create_redis_cache(
+    backend: str,
+    redis_url: Optional[str],
+    key_prefix: str,
+    connect_timeout_seconds: float = 1.5,
+    socket_timeout_seconds: float = 1.5,
+) -> Optional[RedisJSONCache]:
+    """Return a Redis cache tier for backend ``redis``, or None for process-local caching only."""
+    selected_backend = (backend or "memory").strip().lower()
+    if selected_backend != "redis":
+        return None
+    if not redis_url:
+        raise RuntimeError("Redis cache backend requires REDIS_URL.")
+
+    return RedisJSONCache(
+        redis_url=redis_url,
+        key_prefix=key_prefix,
+        connect_timeout_seconds=connect_timeout_seconds,
+        socket_timeout_seconds=socket_timeout_seconds,
+    )
+
+
+def cache_stats(cache: LRUCache, extra: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge common LRU counters into a stats payload."""
+    return {
+        "entries": len(cache),
+        "max_entries": cache.max_entries,
+        "evictions": cache.evictions,
+        "expirations": cache.expirations,
+        **extra,
+    }
@@ -0,0 +1,266 @@
+"""Circuit breaker with optional Redis-shared open state."""
+
+from collections import deque
+from time import time
+from typing import Any, Deque, Dict, Optional, Protocol, Tuple
+
+from app.logger import get_logger
+
+try:
+    import redis.asyncio as redis
+except Exception:  # pragma: no cover - import guard for environments without redis package
+    redis = None
+
+logger = get_logger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open."""
+
+    def __init__(self, name: str, retry_after: float = 0.0):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"Circuit '{name}' is open")
+
+
+class BreakerStateStore(Protocol):
+    async def get_open_until(self, name: str) -> Optional[float]:
+        ...
+
+    async def set_open_until(self, name: str, open_until: float) -> None:
+        ...
+
+    async def clear(self, name: str) -> None:
+        ...
+
+    async def close(self) -> None:
+        ...
+
+
+class InMemoryBreakerStateStore:
+    """Process-local store; each replica trips its own breakers."""
+
+    def __init__(self) -> None:
+        self._open_until: Dict[str, float] = {}
+
+    async def get_open_until(self, name: str) -> Optional[float]:
+        return self._open_until.get(name)
+
+    async def set_open_until(self, name: str, open_until: float) -> None:
+        self._open_until[name] = open_until
+
+    async def clear(self, name: str) -> None:
+        self._open_until.pop(name, None)
+
+    async def close(self) -> None:
+        return None
+
+
+class RedisBreakerStateStore:
+    """Redis store so a breaker tripped on one replica opens on all of them."""
+
+    def __init__(
+        self,
+        redis_url: str,
+        key_prefix: str,
+        connect_timeout_seconds: float,
+        socket_timeout_seconds: float,
+    ) -> None:
+        if redis is None:
+            raise RuntimeError("Redis package is not installed.")
+
+        self.key_prefix = key_prefix.strip() or "travel_buddy:cb"
+        self._client = redis.from_url(
+            redis_url,
+            decode_responses=True,
+            socket_connect_timeout=connect_timeout_seconds,
+            socket_timeout=socket_timeout_seconds,
+        )
+
+    def _build_key(self, name: str) -> str:
+        return f"{self.key_prefix}:{name}"
+
+    async def get_open_until(self, name: str) -> Optional[float]:
+        raw = await self._client.get(self._build_key(name))
+        return float(raw) if raw is not None else None
+
+    async def set_open_until(self, name: str, open_until: float) -> None:
+        ttl_seconds = max(1, int(open_until - time()) + 1)
+        await self._client.set(self._build_key(name), str(open_until), ex=ttl_seconds)
+
+    async def clear(self, name: str) -> None:
+        await self._client.delete(self._build_key(name))
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open breaker over a rolling window of recent calls.
+
+    The circuit opens when at least ``min_calls`` calls are in the window and
+    either the failure rate or the slow-call rate reaches its threshold. After
+    ``open_seconds`` a limited number of half-open probes decide whether it
+    closes again. Open state is published to the shared store, and other
+    replicas pick it up on their next check.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int = 20,
+        min_calls: int = 5,
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 5.0,
+        slow_call_rate_threshold: float = 0.8,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+        store: Optional[BreakerStateStore] = None,
+        shared_check_interval_seconds: float = 1.0,
+    ) -> None:
+        self.name = name
+        self.min_calls = max(1, min_calls)
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_seconds = max(0.0, open_seconds)
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self.shared_check_interval_seconds = shared_check_interval_seconds
+        self._store = store or InMemoryBreakerStateStore()
+        self._calls: Deque[Tuple[bool, bool]] = deque(maxlen=max(1, window_size))
+        self._state = STATE_CLOSED
+        self._open_until = 0.0
+        self._half_open_in_flight = 0
+        self._next_shared_check = 0.0
+        self._latency_ewma_ms: Optional[float] = None
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == STATE_OPEN and time() >= self._open_until:
+            return STATE_HALF_OPEN
+        return self._state
+
+    async def _sync_shared_state(self, now: float) -> None:
+        if now < self._next_shared_check:
+            return
+        self._next_shared_check = now + self.shared_check_interval_seconds
+        try:
+            open_until = await self._store.get_open_until(self.name)
+        except Exception as exc:
+            logger.warning("Circuit breaker state store read failed for '%s': %s", self.name, str(exc))
+            return
+        if open_until is not None and open_until > now and open_until > self._open_until:
+            self._state = STATE_OPEN
+            self._open_until = open_until
+
+    async def allow_request(self) -> None:
+        """Raise CircuitOpenError unless a call may proceed now."""
+        now = time()
+        if self._state == STATE_CLOSED:
+            await self._sync_shared_state(now)
+
+        if self._state == STATE_OPEN:
+            if now < self._open_until:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, retry_after=self._open_until - now)
+            self._state = STATE_HALF_OPEN
+            self._half_open_in_flight = 0
+
+        if self._state == STATE_HALF_OPEN:
+            if self._half_open_in_flight >= self.half_open_max_calls:
+                self.rejected += 1
+                raise CircuitOpenError(self.name)
+            self._half_open_in_flight += 1
+
+    def release(self) -> None:
+        """Give back a half-open probe slot for a call that ended without an outcome (e.g. was cancelled)."""
+        if self._state == STATE_HALF_OPEN:
+            self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+
+    async def record(self, success: bool, latency_seconds: float) -> None:
+        latency_ms = latency_seconds * 1000
+        if self._latency_ewma_ms is None:
+            self._latency_ewma_ms = latency_ms
+        else:
+            self._latency_ewma_ms = 0.8 * self._latency_ewma_ms + 0.2 * latency_ms
+        slow = latency_seconds >= self.slow_call_seconds
+
+        if self._state == STATE_HALF_OPEN:
+            self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+            if success and not slow:
+                await self._close()
+            else:
+                await self._open()
+            return
+
+        self._calls.append((success, slow))
+        if len(self._calls) < self.min_calls:
+            return
+
+        failures = sum(1 for ok, _ in self._calls if not ok)
+        slow_calls = sum(1 for _, is_slow in self._calls if is_slow)
+        if (
+            failures / len(self._calls) >= self.failure_rate_threshold
+            or slow_calls / len(self._calls) >= self.slow_call_rate_threshold
+        ):
+            await self._open()
+
+    async def _open(self) -> None:
+        self._state = STATE_OPEN
+        self._open_until = time() + self.open_seconds
+        self._calls.clear()
+        self.opened += 1
+        logger.warning("Circuit '%s' opened for %.0fs", self.name, self.open_seconds)
+        try:
+            await self._store.set_open_until(self.name, self._open_until)
+        except Exception as exc:
+            logger.warning("Circuit breaker state store write failed for '%s': %s", self.name, str(exc))
+
+    async def _close(self) -> None:
+        self._state = STATE_CLOSED
+        self._open_until = 0.0
+        self._calls.clear()
+        logger.info("Circuit '%s' closed", self.name)
+        try:
+            await self._store.clear(self.name)
+        except Exception as exc:
+            logger.warning("Circuit breaker state store clear failed for '%s': %s", self.name, str(exc))
+
+    def stats(self) -> Dict[str, Any]:
+        failures = sum(1 for ok, _ in self._calls if not ok)
+        return {
+            "state": self.state,
+            "window_calls": len(self._calls),
+            "window_failures": failures,
+            "latency_ewma_ms": round(self._latency_ewma_ms, 2) if self._latency_ewma_ms is not None else None,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+def create_breaker_state_store(
+    backend: str,
+    redis_url: Optional[str] = None,
+    redis_key_prefix: str = "travel_buddy:cb",
+    redis_connect_timeout_seconds: float = 1.5,
+    redis_socket_timeout_seconds: float = 1.5,
+) -> BreakerStateStore:
+    selected_backend = (backend or "memory").strip().lower()
+    if selected_backend == "redis":
+        if not redis_url:
+            raise RuntimeError("CIRCUIT_BREAKER_BACKEND=redis requires REDIS_URL.")
+        return RedisBreakerStateStore(
+            redis_url=redis_url,
+            key_prefix=redis_key_prefix,
+            connect_timeout_seconds=redis_connect_timeout_seconds,
+            socket_timeout_seconds=redis_socket_timeout_seconds,
+        )
+
+    return InMemoryBreakerStateStore()
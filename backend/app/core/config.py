@@ -11,6 +11,18 @@ def _parse_csv_env(value: str, default: list[str]) -> list[str]:
     return parsed or default
 
 
+def _parse_float_map_env(value: str) -> dict[str, float]:
+    """Parse ``name=value`` pairs such as ``rome2rio=900,mock=86400``."""
+    parsed: dict[str, float] = {}
+    for item in _parse_csv_env(value, []):
+        name, _, raw_number = item.partition("=")
+        try:
+            parsed[name.strip().lower()] = float(raw_number)
+        except ValueError:
+            continue
+    return parsed
+
+
 class Settings:
     # Database
     database_url: str = os.getenv("DATABASE_URL", "sqlite:///./travel.db")
@@ -41,6 +53,12 @@ class Settings:
     max_travelers: int = int(os.getenv("MAX_TRAVELERS", "20"))
     max_trip_days: int = int(os.getenv("MAX_TRIP_DAYS", "365"))
     min_trip_days: int = 1
+    quote_batch_max_items: int = int(os.getenv("QUOTE_BATCH_MAX_ITEMS", "50"))
+    quote_batch_max_concurrency: int = int(os.getenv("QUOTE_BATCH_MAX_CONCURRENCY", "8"))
+    quote_calendar_max_window_days: int = int(os.getenv("QUOTE_CALENDAR_MAX_WINDOW_DAYS", "60"))
+    itinerary_max_stops: int = int(os.getenv("ITINERARY_MAX_STOPS", "12"))
+    # Up to this many stops the cheapest order is exact (Held-Karp); beyond it a nearest-neighbour + 2-opt/or-opt heuristic.
+    itinerary_exact_max_stops: int = int(os.getenv("ITINERARY_EXACT_MAX_STOPS", "10"))
     api_rate_limit_enabled: bool = os.getenv("API_RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
     api_rate_limit_backend: str = os.getenv("API_RATE_LIMIT_BACKEND", "memory").strip().lower()
     api_rate_limit_requests: int = int(os.getenv("API_RATE_LIMIT_REQUESTS", "120"))
@@ -59,9 +77,50 @@ class Settings:
     default_food_per_day: float = 35.0
     default_misc_per_day: float = 20.0
     
+    # In-memory CityStats index refresh interval (picks up writes from other replicas)
+    city_stats_index_ttl_seconds: float = float(os.getenv("CITY_STATS_INDEX_TTL_SECONDS", "300"))
+    
     # Payment/Transport provider timeout
     provider_timeout_seconds: int = int(os.getenv("PROVIDER_TIMEOUT", "10"))
 
+    # Shared provider HTTP connection pool
+    provider_http_max_connections: int = int(os.getenv("PROVIDER_HTTP_MAX_CONNECTIONS", "100"))
+    provider_http_max_keepalive_connections: int = int(os.getenv("PROVIDER_HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    provider_http_keepalive_expiry_seconds: float = float(os.getenv("PROVIDER_HTTP_KEEPALIVE_EXPIRY_SECONDS", "30"))
+    provider_http2_enabled: bool = os.getenv("PROVIDER_HTTP2_ENABLED", "false").lower() in ("1", "true", "yes")
+
+    # Transport quote cache (L1 in-process LRU, optional Redis L2)
+    quote_cache_enabled: bool = os.getenv("QUOTE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+    quote_cache_backend: str = os.getenv("QUOTE_CACHE_BACKEND", "memory").strip().lower()
+    quote_cache_max_entries: int = int(os.getenv("QUOTE_CACHE_MAX_ENTRIES", "10000"))
+    quote_cache_ttl_seconds: float = float(os.getenv("QUOTE_CACHE_TTL_SECONDS", "900"))
+    quote_cache_provider_ttls: dict = _parse_float_map_env(os.getenv("QUOTE_CACHE_PROVIDER_TTLS", ""))
+    quote_cache_negative_ttl_seconds: float = float(os.getenv("QUOTE_CACHE_NEGATIVE_TTL_SECONDS", "30"))
+    quote_cache_stale_while_revalidate_seconds: float = float(os.getenv("QUOTE_CACHE_STALE_WHILE_REVALIDATE_SECONDS", "300"))
+    quote_cache_date_bucket_days: int = int(os.getenv("QUOTE_CACHE_DATE_BUCKET_DAYS", "7"))
+    quote_cache_last_good_ttl_seconds: float = float(os.getenv("QUOTE_CACHE_LAST_GOOD_TTL_SECONDS", "86400"))
+    redis_quote_cache_prefix: str = os.getenv("REDIS_QUOTE_CACHE_PREFIX", "travel_buddy:quote")
+
+    # Concurrent fan-out: with two or more names (e.g. "rome2rio,mock") every listed
+    # provider is queried under one deadline and the cheapest option per type wins.
+    transport_providers: list = _parse_csv_env(os.getenv("TRANSPORT_PROVIDERS", ""), [])
+    provider_fanout_deadline_seconds: float = float(os.getenv("PROVIDER_FANOUT_DEADLINE_SECONDS", "8"))
+    provider_timeouts: dict = _parse_float_map_env(os.getenv("PROVIDER_TIMEOUTS", ""))
+
+    # Circuit breakers around real transport providers (the mock is never wrapped).
+    # While a circuit is open, quotes are served from the last cached price or the
+    # mock provider and flagged as estimated.
+    circuit_breaker_enabled: bool = os.getenv("CIRCUIT_BREAKER_ENABLED", "true").lower() in ("1", "true", "yes")
+    circuit_breaker_backend: str = os.getenv("CIRCUIT_BREAKER_BACKEND", "memory").strip().lower()
+    circuit_breaker_window_size: int = int(os.getenv("CIRCUIT_BREAKER_WINDOW_SIZE", "20"))
+    circuit_breaker_min_calls: int = int(os.getenv("CIRCUIT_BREAKER_MIN_CALLS", "5"))
+    circuit_breaker_failure_rate: float = float(os.getenv("CIRCUIT_BREAKER_FAILURE_RATE", "0.5"))
+    circuit_breaker_slow_call_seconds: float = float(os.getenv("CIRCUIT_BREAKER_SLOW_CALL_SECONDS", "5"))
+    circuit_breaker_slow_call_rate: float = float(os.getenv("CIRCUIT_BREAKER_SLOW_CALL_RATE", "0.8"))
+    circuit_breaker_open_seconds: float = float(os.getenv("CIRCUIT_BREAKER_OPEN_SECONDS", "30"))
+    circuit_breaker_half_open_max_calls: int = int(os.getenv("CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS", "1"))
+    redis_circuit_breaker_prefix: str = os.getenv("REDIS_CIRCUIT_BREAKER_PREFIX", "travel_buddy:cb")
+
     # Rome2Rio API (leave blank to use MockProvider fallback)
     rome2rio_api_key: str = os.getenv("ROME2RIO_API_KEY", "")
 
@@ -72,14 +131,46 @@ class Settings:
     auth_cookie_name: str = os.getenv("AUTH_COOKIE_NAME", "travel_buddy_token")
     auth_cookie_secure: bool = os.getenv("AUTH_COOKIE_SECURE", "false").lower() in ("1", "true", "yes")
     auth_cookie_samesite: str = os.getenv("AUTH_COOKIE_SAMESITE", "lax")
+    # Bearer token for /api/v1/metrics; metrics are disabled while it is empty
+    metrics_token: str = os.getenv("METRICS_TOKEN", "")
 
     # LLM / Chatbot
     llm_provider: str = os.getenv("LLM_PROVIDER", "ollama")
     llm_timeout_seconds: int = int(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
     llm_max_tokens: int = int(os.getenv("LLM_MAX_TOKENS", "220"))
+    # Generation budget for itineraries: base + per requested day, capped
+    llm_itinerary_base_tokens: int = int(os.getenv("LLM_ITINERARY_BASE_TOKENS", "200"))
+    llm_itinerary_tokens_per_day: int = int(os.getenv("LLM_ITINERARY_TOKENS_PER_DAY", "120"))
+    llm_itinerary_max_tokens: int = int(os.getenv("LLM_ITINERARY_MAX_TOKENS", "2400"))
+    # Fixed context window sent with every request; changing it per request makes Ollama reload the model
+    llm_num_ctx: int = int(os.getenv("LLM_NUM_CTX", "8192"))
     llm_retry_attempts: int = int(os.getenv("LLM_RETRY_ATTEMPTS", "2"))
     llm_max_concurrent_requests: int = int(os.getenv("LLM_MAX_CONCURRENT_REQUESTS", "2"))
     llm_queue_wait_timeout_seconds: int = int(os.getenv("LLM_QUEUE_WAIT_TIMEOUT_SECONDS", "20"))
+    llm_queue_max_depth: int = int(os.getenv("LLM_QUEUE_MAX_DEPTH", "32"))
+    llm_queue_max_per_user: int = int(os.getenv("LLM_QUEUE_MAX_PER_USER", "2"))
+    llm_queue_initial_service_seconds: float = float(os.getenv("LLM_QUEUE_INITIAL_SERVICE_SECONDS", "5"))
+    # Server-side chat sessions: verbatim history window and the summary of older turns
+    llm_history_token_budget: int = int(os.getenv("LLM_HISTORY_TOKEN_BUDGET", "1024"))
+    llm_summary_max_tokens: int = int(os.getenv("LLM_SUMMARY_MAX_TOKENS", "200"))
+    llm_summary_min_turns: int = int(os.getenv("LLM_SUMMARY_MIN_TURNS", "4"))
+    # Background chat jobs (POST /chat/jobs): worker pool size, queue bound and generation budget
+    llm_job_workers: int = int(os.getenv("LLM_JOB_WORKERS", "2"))
+    llm_job_max_pending: int = int(os.getenv("LLM_JOB_MAX_PENDING", "100"))
+    llm_job_timeout_seconds: float = float(os.getenv("LLM_JOB_TIMEOUT_SECONDS", "300"))
+    llm_job_max_wait_seconds: int = int(os.getenv("LLM_JOB_MAX_WAIT_SECONDS", "30"))
+    # How often a replica refreshes the heartbeat of the jobs it holds; jobs whose heartbeat stops are lost
+    llm_job_heartbeat_seconds: float = float(os.getenv("LLM_JOB_HEARTBEAT_SECONDS", "15"))
+    # Queue background generation of the common saved-trip actions when a trip is saved or updated
+    chat_pregenerate_trip_actions: bool = os.getenv("CHAT_PREGENERATE_TRIP_ACTIONS", "false").lower() in ("1", "true", "yes")
+    llm_fast_path_enabled: bool = os.getenv("LLM_FAST_PATH_ENABLED", "true").lower() in ("1", "true", "yes")
+    llm_cluster_limit_enabled: bool = os.getenv("LLM_CLUSTER_LIMIT_ENABLED", "false").lower() in ("1", "true", "yes")
+    llm_cluster_limit_backend: str = os.getenv("LLM_CLUSTER_LIMIT_BACKEND", "memory")
+    llm_cluster_max_concurrent_requests: int = int(os.getenv("LLM_CLUSTER_MAX_CONCURRENT_REQUESTS", "4"))
+    llm_cluster_backend_limits: dict = _parse_float_map_env(os.getenv("LLM_CLUSTER_BACKEND_LIMITS", ""))
+    llm_cluster_lease_seconds: float = float(os.getenv("LLM_CLUSTER_LEASE_SECONDS", "30"))
+    redis_llm_semaphore_prefix: str = os.getenv("REDIS_LLM_SEMAPHORE_PREFIX", "travel_buddy:llm_sem")
+    llm_http_keepalive_expiry_seconds: float = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS", "120"))
     llm_max_message_chars: int = int(os.getenv("LLM_MAX_MESSAGE_CHARS", "2000"))
     llm_max_context_items: int = int(os.getenv("LLM_MAX_CONTEXT_ITEMS", "12"))
     llm_max_context_value_chars: int = int(os.getenv("LLM_MAX_CONTEXT_VALUE_CHARS", "256"))
@@ -113,6 +204,29 @@ class Settings:
     # Ollama (local)
     ollama_base_url: str = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
     ollama_model: str = os.getenv("OLLAMA_MODEL", "llama3.1:8b")
+    # Optional list of backends as url or url=capacity; defaults to OLLAMA_BASE_URL alone
+    ollama_backends: list = _parse_csv_env(os.getenv("OLLAMA_BACKENDS", ""), [])
+    ollama_eject_after_failures: int = int(os.getenv("OLLAMA_EJECT_AFTER_FAILURES", "3"))
+    ollama_eject_seconds: float = float(os.getenv("OLLAMA_EJECT_SECONDS", "30"))
+    ollama_health_check_interval_seconds: float = float(os.getenv("OLLAMA_HEALTH_CHECK_INTERVAL_SECONDS", "10"))
+    ollama_health_check_timeout_seconds: float = float(os.getenv("OLLAMA_HEALTH_CHECK_TIMEOUT_SECONDS", "5"))
+    # Probes older than this no longer count as "provider known down"
+    ollama_health_max_age_seconds: float = float(os.getenv("OLLAMA_HEALTH_MAX_AGE_SECONDS", "30"))
+    # How long Ollama keeps the model loaded after a request (duration such as 30m, or seconds; -1 = forever)
+    ollama_keep_alive: str = os.getenv("OLLAMA_KEEP_ALIVE", "30m").strip()
+    ollama_warmup_enabled: bool = os.getenv("OLLAMA_WARMUP_ENABLED", "true").lower() in ("1", "true", "yes")
+    ollama_warmup_timeout_seconds: float = float(os.getenv("OLLAMA_WARMUP_TIMEOUT_SECONDS", "120"))
+    # Reload the model when it was evicted while there was traffic in the last OLLAMA_KEEPER_IDLE_SECONDS
+    ollama_keeper_interval_seconds: float = float(os.getenv("OLLAMA_KEEPER_INTERVAL_SECONDS", "60"))
+    ollama_keeper_idle_seconds: float = float(os.getenv("OLLAMA_KEEPER_IDLE_SECONDS", "1800"))
+    ollama_cold_start_threshold_ms: float = float(os.getenv("OLLAMA_COLD_START_THRESHOLD_MS", "1000"))
+
+    # Exact-match chat reply cache (fallback replies are never stored)
+    chat_cache_enabled: bool = os.getenv("CHAT_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+    chat_cache_backend: str = os.getenv("CHAT_CACHE_BACKEND", "memory").strip().lower()
+    chat_cache_max_entries: int = int(os.getenv("CHAT_CACHE_MAX_ENTRIES", "2000"))
+    chat_cache_ttl_seconds: float = float(os.getenv("CHAT_CACHE_TTL_SECONDS", "3600"))
+    redis_chat_cache_prefix: str = os.getenv("REDIS_CHAT_CACHE_PREFIX", "travel_buddy:chat")
     
     def is_development(self) -> bool:
         return self.app_environment.lower() in ("development", "dev")
@@ -0,0 +1,21 @@
+"""Helpers for inspecting shared httpx connection pools."""
+
+from typing import Optional, Tuple
+
+import httpx
+
+
+def pool_connection_counts(client: Optional[httpx.AsyncClient]) -> Tuple[int, int]:
+    """Return (open, idle) connection counts of a client's default transport pool."""
+    open_connections = 0
+    idle_connections = 0
+    transport = getattr(client, "_transport", None) if client is not None else None
+    pool = getattr(transport, "_pool", None)
+    for connection in getattr(pool, "connections", None) or []:
+        open_connections += 1
+        try:
+            if connection.is_idle():
+                idle_connections += 1
+        except Exception:
+            continue
+    return open_connections, idle_connections
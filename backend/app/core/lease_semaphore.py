@@ -0,0 +1,228 @@
+"""Counting semaphores with expiring leases, optionally shared across processes through Redis."""
+
+import asyncio
+from time import monotonic
+from typing import Any, Dict, Optional, Protocol, Set
+from uuid import uuid4
+
+from app.logger import get_logger
+
+try:
+    import redis.asyncio as redis
+except Exception:  # pragma: no cover - import guard for environments without redis package
+    redis = None
+
+logger = get_logger(__name__)
+
+# Scores are lease expiry times in Redis server milliseconds, so replica clock skew does not matter.
+_ACQUIRE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[1]) then
+  redis.call('ZADD', KEYS[1], now + tonumber(ARGV[2]), ARGV[3])
+  redis.call('PEXPIRE', KEYS[1], tonumber(ARGV[2]) * 2)
+  return 1
+end
+return 0
+"""
+
+_RENEW_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local expires = redis.call('ZSCORE', KEYS[1], ARGV[2])
+if expires and tonumber(expires) > now then
+  redis.call('ZADD', KEYS[1], 'XX', now + tonumber(ARGV[1]), ARGV[2])
+  redis.call('PEXPIRE', KEYS[1], tonumber(ARGV[1]) * 2)
+  return 1
+end
+return 0
+"""
+
+_LOCAL_TOKEN_PREFIX = "local:"
+
+
+class LeaseSemaphore(Protocol):
+    async def acquire(self, name: str, limit: int, timeout: float) -> Optional[str]:
+        """Return a lease token, or None when no permit freed up within ``timeout`` seconds."""
+        ...
+
+    async def release(self, name: str, token: str) -> None:
+        ...
+
+    def stats(self) -> Dict[str, Any]:
+        ...
+
+    async def close(self) -> None:
+        ...
+
+
+class InMemoryLeaseSemaphore:
+    """Process-local permits per name; leases end only on release."""
+
+    def __init__(self) -> None:
+        self._holders: Dict[str, Set[str]] = {}
+        self._conditions: Dict[str, asyncio.Condition] = {}
+
+    async def acquire(self, name: str, limit: int, timeout: float) -> Optional[str]:
+        holders = self._holders.setdefault(name, set())
+        condition = self._conditions.setdefault(name, asyncio.Condition())
+        async with condition:
+            try:
+                await asyncio.wait_for(
+                    condition.wait_for(lambda: len(holders) < max(1, limit)),
+                    timeout=max(0.0, timeout),
+                )
+            except TimeoutError:
+                return None
+            token = uuid4().hex
+            holders.add(token)
+            return token
+
+    async def release(self, name: str, token: str) -> None:
+        condition = self._conditions.get(name)
+        if condition is None:
+            return
+        async with condition:
+            self._holders.get(name, set()).discard(token)
+            condition.notify()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", "held": {name: len(holders) for name, holders in self._holders.items()}}
+
+    async def close(self) -> None:
+        return None
+
+
+class RedisLeaseSemaphore:
+    """
+    Cluster-wide permits stored as a Redis sorted set of lease tokens.
+
+    Each lease expires after ``lease_seconds`` unless the holder keeps
+    renewing it, so a crashed worker's permits return to the pool on their
+    own. When Redis cannot be reached, permits come from a process-local
+    ``InMemoryLeaseSemaphore`` with the same limit instead.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        key_prefix: str,
+        lease_seconds: float,
+        connect_timeout_seconds: float,
+        socket_timeout_seconds: float,
+        poll_interval_seconds: float = 0.05,
+    ) -> None:
+        if redis is None:
+            raise RuntimeError("Redis package is not installed.")
+
+        self.key_prefix = key_prefix.strip() or "travel_buddy:llm_sem"
+        self.lease_seconds = max(1.0, lease_seconds)
+        self.poll_interval_seconds = max(0.01, poll_interval_seconds)
+        self._client = redis.from_url(
+            redis_url,
+            decode_responses=True,
+            socket_connect_timeout=connect_timeout_seconds,
+            socket_timeout=socket_timeout_seconds,
+        )
+        self._local = InMemoryLeaseSemaphore()
+        self._renewals: Dict[str, asyncio.Task] = {}
+        self._counters: Dict[str, int] = {"acquired": 0, "timeouts": 0, "fallbacks": 0, "errors": 0, "leases_lost": 0}
+
+    def _key(self, name: str) -> str:
+        return f"{self.key_prefix}:{name}"
+
+    async def acquire(self, name: str, limit: int, timeout: float) -> Optional[str]:
+        deadline = monotonic() + max(0.0, timeout)
+        token = uuid4().hex
+        lease_ms = int(self.lease_seconds * 1000)
+
+        while True:
+            try:
+                granted = await self._client.eval(_ACQUIRE_SCRIPT, 1, self._key(name), max(1, limit), lease_ms, token)
+            except Exception as exc:
+                self._counters["errors"] += 1
+                logger.warning("Redis lease semaphore unavailable; using local limit for '%s': %s", name, str(exc))
+                local_token = await self._local.acquire(name, limit, max(0.0, deadline - monotonic()))
+                if local_token is None:
+                    self._counters["timeouts"] += 1
+                    return None
+                self._counters["fallbacks"] += 1
+                return _LOCAL_TOKEN_PREFIX + local_token
+
+            if int(granted):
+                self._counters["acquired"] += 1
+                self._renewals[token] = asyncio.create_task(self._renew(name, token))
+                return token
+
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                self._counters["timeouts"] += 1
+                return None
+            await asyncio.sleep(min(self.poll_interval_seconds, remaining))
+
+    async def _renew(self, name: str, token: str) -> None:
+        lease_ms = int(self.lease_seconds * 1000)
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                renewed = await self._client.eval(_RENEW_SCRIPT, 1, self._key(name), lease_ms, token)
+            except Exception as exc:
+                logger.warning("Failed to renew lease on '%s': %s", name, str(exc))
+                continue
+            if not int(renewed):
+                self._counters["leases_lost"] += 1
+                logger.warning("Lease on '%s' expired before it was renewed", name)
+                return
+
+    async def release(self, name: str, token: str) -> None:
+        if token.startswith(_LOCAL_TOKEN_PREFIX):
+            await self._local.release(name, token[len(_LOCAL_TOKEN_PREFIX):])
+            return
+
+        renewal = self._renewals.pop(token, None)
+        if renewal is not None:
+            renewal.cancel()
+        try:
+            await self._client.zrem(self._key(name), token)
+        except Exception as exc:
+            # The lease expires on its own once renewals stop.
+            logger.warning("Failed to release lease on '%s': %s", name, str(exc))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "redis",
+            "lease_seconds": self.lease_seconds,
+            "held_leases": len(self._renewals),
+            "local_fallback": self._local.stats()["held"],
+            **self._counters,
+        }
+
+    async def close(self) -> None:
+        for renewal in self._renewals.values():
+            renewal.cancel()
+        self._renewals.clear()
+        await self._client.aclose()
+
+
+def create_lease_semaphore(
+    backend: str,
+    redis_url: Optional[str] = None,
+    redis_key_prefix: str = "travel_buddy:llm_sem",
+    lease_seconds: float = 30.0,
+    redis_connect_timeout_seconds: float = 1.5,
+    redis_socket_timeout_seconds: float = 1.5,
+) -> LeaseSemaphore:
+    selected_backend = (backend or "memory").strip().lower()
+    if selected_backend == "redis":
+        if not redis_url:
+            raise RuntimeError("LLM_CLUSTER_LIMIT_BACKEND=redis requires REDIS_URL.")
+        return RedisLeaseSemaphore(
+            redis_url=redis_url,
+            key_prefix=redis_key_prefix,
+            lease_seconds=lease_seconds,
+            connect_timeout_seconds=redis_connect_timeout_seconds,
+            socket_timeout_seconds=redis_socket_timeout_seconds,
+        )
+
+    return InMemoryLeaseSemaphore()
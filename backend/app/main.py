@@ -3,6 +3,7 @@
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from sqlmodel import Session
 import os
 import time
 
@@ -10,10 +11,25 @@ from app.api.v1 import quote as quote_router
 from app.api.v1 import auth as auth_router
 from app.api.v1 import trips as trips_router
 from app.api.v1 import chat as chat_router
-from app.db.session import init_db
+from app.api.v1 import metrics as metrics_router
+from app.db.session import engine, init_db
 from app import seed
 from app.core.config import settings
 from app.core.rate_limit import InMemoryRateLimiter, RateLimiter, create_rate_limiter
+from app.providers.registry import close_provider_registry
+from app.services.city_index import get_city_stats_index
+from app.services.quote_cache import close_quote_cache
+from app.services.chat_cache import close_chat_response_cache
+from app.services.chat_jobs import close_chat_job_pool
+from app.services.chat_sessions import cancel_pending_summaries
+from app.services.llm import (
+    close_cluster_semaphore,
+    close_llm_clients,
+    close_model_keeper,
+    get_model_keeper,
+    get_ollama_client,
+)
+from app.services.ollama_backends import close_ollama_backend_pool, get_ollama_backend_pool
 from app.schemas import HealthResponse
 from app.logger import get_logger
 
@@ -156,11 +172,30 @@ def on_startup():
         init_db()
         seed.seed_city_stats()
         logger.info("Database initialized successfully")
+        with Session(engine) as session:
+            city_index = get_city_stats_index()
+            city_index.load(session)
+        for backend in get_ollama_backend_pool().backends:
+            get_ollama_client(backend.base_url)
     except Exception as e:
         logger.error(f"Startup error: {str(e)}", exc_info=True)
         raise
 
 
+@app.on_event("startup")
+async def on_startup_warm_model():
+    """Load the chat model in the background so the first chat does not pay for it."""
+    if settings.llm_provider.strip().lower() == "ollama" and settings.ollama_warmup_enabled:
+        get_model_keeper().start()
+
+
+@app.on_event("startup")
+async def on_startup_health_checks():
+    """Keep the chat provider health snapshot current in the background."""
+    if settings.llm_provider.strip().lower() == "ollama":
+        get_ollama_backend_pool().start_health_checks(get_ollama_client)
+
+
 @app.on_event("shutdown")
 async def on_shutdown():
     """Cleanup on shutdown."""
@@ -168,6 +203,42 @@ async def on_shutdown():
         await rate_limiter.close()
     except Exception as exc:
         logger.warning("Rate limiter shutdown cleanup failed: %s", str(exc))
+    try:
+        await close_provider_registry()
+    except Exception as exc:
+        logger.warning("Provider registry shutdown cleanup failed: %s", str(exc))
+    try:
+        await close_quote_cache()
+    except Exception as exc:
+        logger.warning("Quote cache shutdown cleanup failed: %s", str(exc))
+    try:
+        await close_chat_response_cache()
+    except Exception as exc:
+        logger.warning("Chat cache shutdown cleanup failed: %s", str(exc))
+    try:
+        await close_chat_job_pool()
+    except Exception as exc:
+        logger.warning("Chat job pool shutdown cleanup failed: %s", str(exc))
+    try:
+        await cancel_pending_summaries()
+    except Exception as exc:
+        logger.warning("Chat summary shutdown cleanup failed: %s", str(exc))
+    try:
+        await close_model_keeper()
+    except Exception as exc:
+        logger.warning("Ollama model keeper shutdown cleanup failed: %s", str(exc))
+    try:
+        await close_ollama_backend_pool()
+    except Exception as exc:
+        logger.warning("Ollama backend pool shutdown cleanup failed: %s", str(exc))
+    try:
+        await close_llm_clients()
+    except Exception as exc:
+        logger.warning("LLM client shutdown cleanup failed: %s", str(exc))
+    try:
+        await close_cluster_semaphore()
+    except Exception as exc:
+        logger.warning("LLM cluster limit shutdown cleanup failed: %s", str(exc))
     logger.info("Application shutting down...")
 
 
@@ -233,6 +304,11 @@ app.include_router(
     },
 )
 
+app.include_router(
+    metrics_router.router,
+    prefix="/api/v1",
+)
+
 
 # ===== ERROR HANDLERS =====
 
@@ -1,10 +1,15 @@
 """Database models for Travel Buddy API."""
 
 from typing import Optional
-from datetime import datetime, date
+from datetime import datetime, date, timezone
+from uuid import uuid4
 from sqlmodel import SQLModel, Field
 
 
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class User(SQLModel, table=True):
     """User account for authentication."""
 
@@ -40,6 +45,52 @@ class SavedTrip(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow, description="Saved at")
 
 
+class ChatSession(SQLModel, table=True):
+    """Server-side multi-turn chat conversation."""
+
+    id: str = Field(default_factory=lambda: uuid4().hex, primary_key=True, max_length=32)
+    user_id: Optional[int] = Field(default=None, index=True, description="Owner, when created while signed in")
+    context_json: Optional[str] = Field(default=None, description="JSON trip context used for every turn")
+    summary: str = Field(default="", description="Compact summary of turns no longer sent verbatim")
+    summarized_turns: int = Field(default=0, ge=0, description="Number of oldest turns folded into the summary")
+    created_at: datetime = Field(default_factory=_utcnow, description="Created at")
+    updated_at: datetime = Field(default_factory=_utcnow, description="Last turn at")
+
+
+class ChatTurn(SQLModel, table=True):
+    """One user or assistant message of a chat session."""
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    session_id: str = Field(index=True, max_length=32, description="Chat session ID")
+    role: str = Field(max_length=16, description="user or assistant")
+    content: str = Field(description="Message text")
+    created_at: datetime = Field(default_factory=_utcnow, description="Created at")
+
+
+class ChatJob(SQLModel, table=True):
+    """Chat generation run in the background; the result is kept for polling from any replica."""
+
+    id: str = Field(default_factory=lambda: uuid4().hex, primary_key=True, max_length=32)
+    user_id: int = Field(index=True, description="Owner")
+    status: str = Field(default="queued", max_length=16, description="queued, running, succeeded or failed")
+    priority: int = Field(default=1, description="Admission priority class")
+    trip_id: Optional[int] = Field(default=None, index=True, description="Saved trip used as context")
+    action: Optional[str] = Field(default=None, max_length=32, description="Saved-trip action")
+    content_hash: Optional[str] = Field(
+        default=None, max_length=64, description="Trip content a pre-generated reply was written for"
+    )
+    message: str = Field(description="Message sent to the model")
+    context_json: Optional[str] = Field(default=None, description="JSON context sent with the message")
+    reply: Optional[str] = Field(default=None, description="Generated reply")
+    fallback: bool = Field(default=False, description="Whether the reply is the canned fallback")
+    error: Optional[str] = Field(default=None, description="Why the job failed")
+    created_at: datetime = Field(default_factory=_utcnow, description="Queued at")
+    started_at: Optional[datetime] = Field(default=None, description="Picked up by a worker at")
+    finished_at: Optional[datetime] = Field(default=None, description="Finished at")
+    claimed_by: Optional[str] = Field(default=None, max_length=64, description="Worker pool holding the job")
+    heartbeat_at: Optional[datetime] = Field(default=None, description="Last sign of life from that worker pool")
+
+
 class CityStats(SQLModel, table=True):
     """City statistics for cost estimation."""
     
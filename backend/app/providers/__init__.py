@@ -1,6 +1,7 @@
 """Transport provider abstraction and implementations."""
 
-__all__ = ["BaseProvider", "MockProvider"]
+__all__ = ["BaseProvider", "MockProvider", "ProviderRegistry", "get_provider_registry", "close_provider_registry"]
 
 from app.providers.base import BaseProvider
 from app.providers.mock_provider import MockProvider
+from app.providers.registry import ProviderRegistry, get_provider_registry, close_provider_registry
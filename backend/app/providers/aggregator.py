@@ -0,0 +1,101 @@
+"""Provider that fans out to several transport providers under one deadline."""
+
+import asyncio
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from app.providers.base import TIMEOUT_CANCEL_MESSAGE, BaseProvider, is_timeout_cancel
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class AggregatorProvider(BaseProvider):
+    """
+    Queries every wrapped provider concurrently and merges their options.
+
+    Each provider runs under its own timeout and the whole fan-out under an
+    overall deadline. Options are deduplicated by ``transport_type`` keeping
+    the cheapest. When some providers fail or miss the deadline, whatever
+    arrived in time is returned with ``"partial": True`` on every option.
+    """
+
+    def __init__(
+        self,
+        providers: Dict[str, BaseProvider],
+        deadline_seconds: float,
+        timeouts: Optional[Dict[str, float]] = None,
+        default_timeout_seconds: float = 10,
+    ):
+        self.name = "aggregate"
+        self.providers = dict(providers)
+        self.deadline_seconds = max(0.01, deadline_seconds)
+        self.timeouts = dict(timeouts or {})
+        self.default_timeout_seconds = default_timeout_seconds
+
+    def _timeout_for(self, name: str) -> float:
+        return min(self.timeouts.get(name, self.default_timeout_seconds), self.deadline_seconds)
+
+    async def _fetch(self, name: str, provider: BaseProvider, *args: Any) -> List[Dict[str, Any]]:
+        # Cancel with TIMEOUT_CANCEL_MESSAGE (rather than asyncio.wait_for) so
+        # wrapped providers can tell a timeout from a cancelled request.
+        task = asyncio.current_task()
+        handle = asyncio.get_running_loop().call_later(self._timeout_for(name), task.cancel, TIMEOUT_CANCEL_MESSAGE)
+        try:
+            return await provider.get_prices(*args)
+        except asyncio.CancelledError as exc:
+            if is_timeout_cancel(exc):
+                raise asyncio.TimeoutError() from None
+            raise
+        finally:
+            handle.cancel()
+
+    async def get_prices(
+        self,
+        origin: str,
+        destination: str,
+        start_date: date,
+        end_date: date,
+        travelers: int,
+    ) -> List[Dict[str, Any]]:
+        """Return the cheapest option per transport type across providers that answered in time."""
+        tasks = {
+            asyncio.ensure_future(self._fetch(name, provider, origin, destination, start_date, end_date, travelers)): name
+            for name, provider in self.providers.items()
+        }
+        done, pending = await asyncio.wait(tasks.keys(), timeout=self.deadline_seconds)
+        for task in pending:
+            task.cancel(TIMEOUT_CANCEL_MESSAGE)
+        if pending:
+            # Let the late calls unwind so circuit breakers record them as timed out.
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        answered: List[str] = []
+        missing: Dict[str, str] = {tasks[task]: "deadline exceeded" for task in pending}
+        cheapest: Dict[str, Dict[str, Any]] = {}
+
+        for task in done:
+            name = tasks[task]
+            exc = task.exception()
+            if exc is not None:
+                missing[name] = "timeout" if isinstance(exc, asyncio.TimeoutError) else str(exc) or exc.__class__.__name__
+                continue
+            answered.append(name)
+            for option in task.result():
+                transport_type = option.get("transport_type")
+                current = cheapest.get(transport_type)
+                if current is None or option["price"] < current["price"]:
+                    cheapest[transport_type] = option
+
+        if not answered:
+            details = ", ".join(f"{name}: {reason}" for name, reason in sorted(missing.items()))
+            raise RuntimeError(f"No transport provider answered in time ({details})")
+
+        partial = bool(missing)
+        if partial:
+            logger.warning(
+                f"Partial transport fan-out for {origin} -> {destination}: "
+                f"answered={sorted(answered)}, missing={missing}"
+            )
+
+        return [{**option, "partial": partial} for option in cheapest.values()]
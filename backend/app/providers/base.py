@@ -1,9 +1,19 @@
 """Base provider class for transport price fetching."""
 
+import asyncio
 from abc import ABC, abstractmethod
 from datetime import date
 from typing import List, Dict, Any
 
+# Cancellation message used when a caller gives up on a provider call for
+# taking too long, as opposed to being cancelled itself.
+TIMEOUT_CANCEL_MESSAGE = "provider call timed out"
+
+
+def is_timeout_cancel(exc: BaseException) -> bool:
+    """True for a CancelledError raised because the call exceeded its timeout."""
+    return isinstance(exc, asyncio.CancelledError) and exc.args[:1] == (TIMEOUT_CANCEL_MESSAGE,)
+
 
 class BaseProvider(ABC):
     """Abstract base class for transport providers."""
@@ -0,0 +1,51 @@
+"""Provider wrapper that routes calls through a circuit breaker."""
+
+import asyncio
+from datetime import date
+from time import perf_counter
+from typing import Any, Dict, List
+
+from app.core.circuit_breaker import CircuitBreaker
+from app.providers.base import BaseProvider, is_timeout_cancel
+
+
+class CircuitBreakerProvider(BaseProvider):
+    """
+    Calls the wrapped provider only while its circuit allows it.
+
+    Every call's outcome and latency feed the breaker; while the circuit is
+    open, ``get_prices`` raises ``CircuitOpenError`` immediately instead of
+    waiting on the upstream timeout. Calls cancelled for exceeding a timeout
+    (see ``is_timeout_cancel``) count as failures; other cancellations are
+    not recorded.
+    """
+
+    def __init__(self, provider: BaseProvider, breaker: CircuitBreaker):
+        self.provider = provider
+        self.breaker = breaker
+        self.name = getattr(provider, "name", breaker.name)
+
+    async def get_prices(
+        self,
+        origin: str,
+        destination: str,
+        start_date: date,
+        end_date: date,
+        travelers: int,
+    ) -> List[Dict[str, Any]]:
+        await self.breaker.allow_request()
+        started = perf_counter()
+        try:
+            prices = await self.provider.get_prices(origin, destination, start_date, end_date, travelers)
+        except asyncio.CancelledError as exc:
+            if is_timeout_cancel(exc):
+                await self.breaker.record(False, perf_counter() - started)
+            else:
+                # A cancelled request says nothing about the provider's health.
+                self.breaker.release()
+            raise
+        except BaseException:
+            await self.breaker.record(False, perf_counter() - started)
+            raise
+        await self.breaker.record(True, perf_counter() - started)
+        return prices
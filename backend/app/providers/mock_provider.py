@@ -3,7 +3,6 @@
 from app.providers.base import BaseProvider
 from datetime import date
 from typing import List, Dict, Any
-import math
 from app.logger import get_logger
 
 logger = get_logger(__name__)
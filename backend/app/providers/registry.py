@@ -0,0 +1,247 @@
+"""Process-wide registry owning transport providers and their shared HTTP pool."""
+
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from app.core.circuit_breaker import BreakerStateStore, CircuitBreaker, create_breaker_state_store
+from app.core.config import settings
+from app.core.http_pool import pool_connection_counts
+from app.logger import get_logger
+from app.providers.aggregator import AggregatorProvider
+from app.providers.base import BaseProvider
+from app.providers.guarded import CircuitBreakerProvider
+from app.providers.mock_provider import MockProvider
+from app.providers.rome2rio_provider import Rome2RioProvider
+
+logger = get_logger(__name__)
+
+try:
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except Exception:  # pragma: no cover - import guard for environments without the h2 package
+    _HTTP2_AVAILABLE = False
+
+
+class ProviderRegistry:
+    """
+    Builds every configured transport provider once and hands them a shared
+    keep-alive ``httpx.AsyncClient`` so quotes reuse warm connections instead
+    of paying a TCP/TLS handshake per request.
+    """
+
+    def __init__(
+        self,
+        rome2rio_api_key: str = "",
+        timeout_seconds: float = 10,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry_seconds: float = 30.0,
+        http2: bool = False,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        fanout_providers: Optional[List[str]] = None,
+        fanout_deadline_seconds: float = 8.0,
+        provider_timeouts: Optional[Dict[str, float]] = None,
+        breaker_options: Optional[Dict[str, Any]] = None,
+        breaker_store: Optional[BreakerStateStore] = None,
+    ) -> None:
+        self.rome2rio_api_key = rome2rio_api_key
+        self.timeout_seconds = timeout_seconds
+        self.fanout_providers = [name.strip().lower() for name in fanout_providers or [] if name.strip()]
+        self.fanout_deadline_seconds = fanout_deadline_seconds
+        self.provider_timeouts = dict(provider_timeouts or {})
+        self.limits = httpx.Limits(
+            max_connections=max(1, max_connections),
+            max_keepalive_connections=max(0, max_keepalive_connections),
+            keepalive_expiry=max(0.0, keepalive_expiry_seconds),
+        )
+        if http2 and not _HTTP2_AVAILABLE:
+            logger.warning("PROVIDER_HTTP2_ENABLED is set but the 'h2' package is not installed; using HTTP/1.1.")
+            http2 = False
+        self.http2 = http2
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._providers: Dict[str, BaseProvider] = {}
+        self._requests_sent = 0
+        # None disables circuit breaking; otherwise CircuitBreaker keyword arguments.
+        self.breaker_options = breaker_options
+        self._breaker_store = breaker_store
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    @classmethod
+    def from_settings(cls) -> "ProviderRegistry":
+        return cls(
+            rome2rio_api_key=settings.rome2rio_api_key,
+            timeout_seconds=settings.provider_timeout_seconds,
+            max_connections=settings.provider_http_max_connections,
+            max_keepalive_connections=settings.provider_http_max_keepalive_connections,
+            keepalive_expiry_seconds=settings.provider_http_keepalive_expiry_seconds,
+            http2=settings.provider_http2_enabled,
+            fanout_providers=settings.transport_providers,
+            fanout_deadline_seconds=settings.provider_fanout_deadline_seconds,
+            provider_timeouts=settings.provider_timeouts,
+            breaker_options=_breaker_options_from_settings(),
+            breaker_store=_breaker_store_from_settings(),
+        )
+
+    @property
+    def started(self) -> bool:
+        return self._client is not None
+
+    def start(self) -> None:
+        """Create the shared HTTP client and instantiate providers."""
+        if self._client is not None:
+            return
+
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(self.timeout_seconds),
+            limits=self.limits,
+            http2=self.http2,
+            transport=self._transport,
+            event_hooks={"request": [self._on_request]},
+        )
+
+        providers: Dict[str, BaseProvider] = {"mock": MockProvider()}
+        if self.rome2rio_api_key:
+            providers["rome2rio"] = Rome2RioProvider(
+                api_key=self.rome2rio_api_key,
+                timeout=self.provider_timeouts.get("rome2rio", self.timeout_seconds),
+                client=self._client,
+            )
+        if self.breaker_options is not None:
+            for name in list(providers):
+                if name == "mock":
+                    continue
+                breaker = self._breakers.get(name)
+                if breaker is None:
+                    breaker = CircuitBreaker(name=name, store=self._breaker_store, **self.breaker_options)
+                    self._breakers[name] = breaker
+                providers[name] = CircuitBreakerProvider(providers[name], breaker)
+
+        fanout = {name: providers[name] for name in self.fanout_providers if name in providers}
+        if len(fanout) > 1:
+            providers["aggregate"] = AggregatorProvider(
+                providers=fanout,
+                deadline_seconds=self.fanout_deadline_seconds,
+                timeouts=self.provider_timeouts,
+                default_timeout_seconds=self.timeout_seconds,
+            )
+        self._providers = providers
+
+        logger.info(
+            "Provider registry started (providers=%s, max_connections=%s, keepalive=%s, http2=%s)",
+            ",".join(sorted(providers)),
+            self.limits.max_connections,
+            self.limits.max_keepalive_connections,
+            self.http2,
+        )
+
+    async def close(self) -> None:
+        """Close the shared HTTP pool; providers become unusable afterwards."""
+        client = self._client
+        self._client = None
+        self._providers = {}
+        if client is not None:
+            await client.aclose()
+            logger.info("Provider registry closed")
+        if self._breaker_store is not None:
+            await self._breaker_store.close()
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        self._requests_sent += 1
+
+    @property
+    def http_client(self) -> Optional[httpx.AsyncClient]:
+        return self._client
+
+    def provider_names(self) -> List[str]:
+        return list(self._providers.keys())
+
+    def get(self, name: str) -> Optional[BaseProvider]:
+        return self._providers.get(name)
+
+    def primary_name(self) -> str:
+        """Name of the provider used for quotes: the fan-out aggregate, then Rome2Rio, then the mock."""
+        for name in ("aggregate", "rome2rio"):
+            if name in self._providers:
+                return name
+        return "mock"
+
+    def primary_provider(self) -> BaseProvider:
+        if not self.started:
+            self.start()
+        return self._providers[self.primary_name()]
+
+    def breaker_stats(self) -> Dict[str, Any]:
+        return {name: breaker.stats() for name, breaker in self._breakers.items()}
+
+    def stats(self) -> Dict[str, Any]:
+        """Return configured pool limits and current connection usage."""
+        open_connections, idle_connections = pool_connection_counts(self._client)
+        return {
+            "started": self.started,
+            "providers": self.provider_names(),
+            "primary": self.primary_name(),
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "keepalive_expiry_seconds": self.limits.keepalive_expiry,
+            "open_connections": open_connections,
+            "idle_connections": idle_connections,
+            "requests_sent": self._requests_sent,
+        }
+
+
+def _breaker_options_from_settings() -> Optional[Dict[str, Any]]:
+    if not settings.circuit_breaker_enabled:
+        return None
+    return {
+        "window_size": settings.circuit_breaker_window_size,
+        "min_calls": settings.circuit_breaker_min_calls,
+        "failure_rate_threshold": settings.circuit_breaker_failure_rate,
+        "slow_call_seconds": settings.circuit_breaker_slow_call_seconds,
+        "slow_call_rate_threshold": settings.circuit_breaker_slow_call_rate,
+        "open_seconds": settings.circuit_breaker_open_seconds,
+        "half_open_max_calls": settings.circuit_breaker_half_open_max_calls,
+    }
+
+
+def _breaker_store_from_settings() -> Optional[BreakerStateStore]:
+    if not settings.circuit_breaker_enabled:
+        return None
+    try:
+        return create_breaker_state_store(
+            backend=settings.circuit_breaker_backend,
+            redis_url=settings.redis_url,
+            redis_key_prefix=settings.redis_circuit_breaker_prefix,
+            redis_connect_timeout_seconds=settings.redis_connect_timeout_seconds,
+            redis_socket_timeout_seconds=settings.redis_socket_timeout_seconds,
+        )
+    except Exception as exc:
+        logger.warning(
+            "Failed to initialize circuit breaker backend '%s': %s. Falling back to in-memory state.",
+            settings.circuit_breaker_backend,
+            str(exc),
+        )
+        return create_breaker_state_store(backend="memory")
+
+
+_registry: Optional[ProviderRegistry] = None
+
+
+def get_provider_registry() -> ProviderRegistry:
+    """Return the process-wide registry, starting it lazily if the app lifespan has not."""
+    global _registry
+    if _registry is None:
+        _registry = ProviderRegistry.from_settings()
+    if not _registry.started:
+        _registry.start()
+    return _registry
+
+
+async def close_provider_registry() -> None:
+    global _registry
+    registry = _registry
+    _registry = None
+    if registry is not None:
+        await registry.close()
@@ -51,13 +51,19 @@ class Rome2RioProvider(BaseProvider):
     options with indicative prices and travel durations.
 
     API docs: https://api.rome2rio.com/api/1.4/
+
+    When ``client`` is given (normally the pooled client owned by the
+    provider registry) every request reuses its keep-alive connections;
+    otherwise a short-lived client is opened per call.
     """
 
     BASE_URL = "https://api.rome2rio.com/api/1.4/json/Search"
 
-    def __init__(self, api_key: str, timeout: int = 10):
+    def __init__(self, api_key: str, timeout: int = 10, client: Optional[httpx.AsyncClient] = None):
+        self.name = "rome2rio"
         self.api_key = api_key
         self.timeout = timeout
+        self._client = client
 
     async def get_prices(
         self,
@@ -77,10 +83,15 @@ class Rome2RioProvider(BaseProvider):
 
         logger.info(f"Rome2Rio: querying {origin} -> {destination}")
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            resp = await client.get(self.BASE_URL, params=params)
+        if self._client is not None:
+            resp = await self._client.get(self.BASE_URL, params=params, timeout=self.timeout)
             resp.raise_for_status()
             data = resp.json()
+        else:
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                resp = await client.get(self.BASE_URL, params=params)
+                resp.raise_for_status()
+                data = resp.json()
 
         routes = data.get("routes", [])
         logger.info(f"Rome2Rio: received {len(routes)} routes")
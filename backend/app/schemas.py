@@ -1,4 +1,4 @@
-from typing import List, Optional, Dict, Literal
+from typing import Any, List, Optional, Dict, Literal
 from datetime import datetime
 from pydantic import BaseModel, Field, field_validator, model_validator, EmailStr
 from datetime import date
@@ -73,6 +73,8 @@ class TransportOption(BaseModel):
     price: float = Field(..., gt=0, description="Price in specified currency")
     currency: str = Field(default="USD", description="Currency code")
     notes: Optional[str] = Field(default=None, description="Additional notes about the option")
+    partial: bool = Field(default=False, description="True when some providers missed the deadline and the cheapest option may be missing")
+    estimated: bool = Field(default=False, description="True when the provider's circuit is open and the price is a cached or mock estimate")
 
     class Config:
         json_schema_extra = {
@@ -126,6 +128,8 @@ class QuoteResponse(BaseModel):
     """Schema for the quote response."""
     trip_days: int = Field(..., ge=1, description="Number of days for the trip")
     breakdown: Breakdown = Field(..., description="Cost breakdown")
+    partial: bool = Field(default=False, description="True when transport prices come from an incomplete provider fan-out")
+    estimated: bool = Field(default=False, description="True when transport prices are estimates served while the provider is unavailable")
 
     class Config:
         json_schema_extra = {
@@ -142,6 +146,217 @@ class QuoteResponse(BaseModel):
         }
 
 
+class BatchQuoteRequest(BaseModel):
+    """Request schema for pricing many trip variants in one call."""
+    items: List[Dict[str, Any]] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.quote_batch_max_items,
+        description="Trip requests, each using the TripRequest schema; invalid items fail individually",
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "items": [
+                    {"origin": "Berlin", "destination": "Paris", "start_date": "2026-03-15", "end_date": "2026-03-20", "travelers": 2},
+                    {"origin": "Berlin", "destination": "Rome", "start_date": "2026-03-15", "end_date": "2026-03-20", "travelers": 2},
+                ]
+            }
+        }
+
+
+class BatchQuoteItemResult(BaseModel):
+    """Outcome of one item in a batch quote."""
+    index: int = Field(..., ge=0, description="Position of the item in the request")
+    status: Literal["ok", "error"] = Field(..., description="Whether the item was priced")
+    quote: Optional[QuoteResponse] = Field(default=None, description="Quote when status is ok")
+    error: Optional[str] = Field(default=None, description="Error message when status is error")
+    status_code: Optional[int] = Field(default=None, description="HTTP status the single-quote endpoint would return")
+
+
+class BatchQuoteResponse(BaseModel):
+    """Response schema for batch quotes."""
+    results: List[BatchQuoteItemResult] = Field(..., description="Per-item results in request order")
+    succeeded: int = Field(..., ge=0, description="Number of priced items")
+    failed: int = Field(..., ge=0, description="Number of failed items")
+
+
+class PriceCalendarRequest(BaseModel):
+    """Request schema for the flexible-dates price calendar."""
+    origin: str = Field(..., min_length=1, max_length=100, description="Origin city")
+    destination: str = Field(..., min_length=1, max_length=100, description="Destination city")
+    window_start: date = Field(..., description="Earliest departure date (today or later)")
+    window_end: date = Field(..., description="Latest departure date")
+    trip_days: int = Field(..., ge=1, le=settings.max_trip_days, description="Fixed trip length in days")
+    travelers: int = Field(default=1, ge=1, le=settings.max_travelers, description="Number of travelers")
+
+    @field_validator('origin', 'destination', mode='before')
+    @classmethod
+    def strip_and_validate_cities(cls, v: str) -> str:
+        """Strip whitespace and validate cities are not empty."""
+        if isinstance(v, str):
+            v = v.strip()
+        if not v:
+            raise ValueError("City name cannot be empty")
+        return v
+
+    @field_validator('window_start')
+    @classmethod
+    def validate_window_start_in_future(cls, v: date) -> date:
+        """Ensure the window starts today or in the future."""
+        if v < date.today():
+            raise ValueError(f"Window start must be today or in the future (not {v})")
+        return v
+
+    @model_validator(mode='after')
+    def validate_window(self) -> 'PriceCalendarRequest':
+        """Ensure cities differ and the window is ordered and bounded."""
+        if self.origin.lower() == self.destination.lower():
+            raise ValueError("Origin and destination must be different cities")
+        if self.window_end < self.window_start:
+            raise ValueError("Window end must be after or equal to window start")
+        window_days = (self.window_end - self.window_start).days + 1
+        if window_days > settings.quote_calendar_max_window_days:
+            raise ValueError(f"Date window exceeds maximum of {settings.quote_calendar_max_window_days} days")
+        return self
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "origin": "Berlin",
+                "destination": "Paris",
+                "window_start": "2026-03-01",
+                "window_end": "2026-04-29",
+                "trip_days": 5,
+                "travelers": 2
+            }
+        }
+
+
+class PriceCalendarEntry(BaseModel):
+    """Trip cost for one departure date."""
+    start_date: date = Field(..., description="Departure date")
+    end_date: date = Field(..., description="Return date")
+    transport: float = Field(..., ge=0, description="Sum of transport option prices")
+    accommodation: float = Field(..., ge=0, description="Total accommodation cost")
+    food: float = Field(..., ge=0, description="Total food cost")
+    misc: float = Field(..., ge=0, description="Total miscellaneous cost")
+    total: float = Field(..., ge=0, description="Total trip cost, as /quote would return it")
+
+
+class PriceCalendarResponse(BaseModel):
+    """Response schema for the flexible-dates price calendar."""
+    trip_days: int = Field(..., ge=1, description="Trip length in days")
+    entries: List[PriceCalendarEntry] = Field(..., description="One entry per departure date, in date order")
+    cheapest: PriceCalendarEntry = Field(..., description="Entry with the lowest total (earliest on ties)")
+
+
+class ItineraryStop(BaseModel):
+    """One stop of a multi-city itinerary."""
+    city: str = Field(..., min_length=1, max_length=100, description="Stop city")
+    nights: int = Field(..., ge=1, le=settings.max_trip_days, description="Nights spent at this stop")
+
+    @field_validator('city', mode='before')
+    @classmethod
+    def strip_and_validate_city(cls, v: str) -> str:
+        """Strip whitespace and validate the city is not empty."""
+        if isinstance(v, str):
+            v = v.strip()
+        if not v:
+            raise ValueError("City name cannot be empty")
+        return v
+
+
+class ItineraryRequest(BaseModel):
+    """Request schema for a multi-city round trip quote."""
+    origin: str = Field(..., min_length=1, max_length=100, description="Home city the trip starts and ends in")
+    stops: List[ItineraryStop] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.itinerary_max_stops,
+        description="Cities to visit with their night counts",
+    )
+    start_date: date = Field(..., description="Departure date from the origin (today or later)")
+    travelers: int = Field(default=1, ge=1, le=settings.max_travelers, description="Number of travelers")
+    optimize_order: bool = Field(default=True, description="Reorder stops to minimise transport cost")
+
+    @field_validator('origin', mode='before')
+    @classmethod
+    def strip_and_validate_origin(cls, v: str) -> str:
+        """Strip whitespace and validate the origin is not empty."""
+        if isinstance(v, str):
+            v = v.strip()
+        if not v:
+            raise ValueError("City name cannot be empty")
+        return v
+
+    @field_validator('start_date')
+    @classmethod
+    def validate_start_date_in_future(cls, v: date) -> date:
+        """Ensure start_date is today or in the future."""
+        if v < date.today():
+            raise ValueError(f"Start date must be today or in the future (not {v})")
+        return v
+
+    @model_validator(mode='after')
+    def validate_stops(self) -> 'ItineraryRequest':
+        """Ensure stops are distinct, differ from the origin and fit in the maximum trip length."""
+        names = [self.origin.lower()] + [stop.city.lower() for stop in self.stops]
+        if len(set(names)) != len(names):
+            raise ValueError("Stops must be distinct cities different from the origin")
+        total_nights = sum(stop.nights for stop in self.stops)
+        if total_nights > settings.max_trip_days:
+            raise ValueError(f"Trip duration exceeds maximum of {settings.max_trip_days} days")
+        return self
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "origin": "Berlin",
+                "stops": [
+                    {"city": "Paris", "nights": 3},
+                    {"city": "Rome", "nights": 2},
+                    {"city": "Barcelona", "nights": 4}
+                ],
+                "start_date": "2026-03-15",
+                "travelers": 2,
+                "optimize_order": True
+            }
+        }
+
+
+class ItineraryLeg(BaseModel):
+    """Transport between two consecutive cities of an itinerary."""
+    origin: str = Field(..., description="Departure city")
+    destination: str = Field(..., description="Arrival city")
+    departure_date: date = Field(..., description="Travel date")
+    option: TransportOption = Field(..., description="Cheapest transport option for this leg")
+
+
+class ItineraryStopEstimate(BaseModel):
+    """Stay costs at one itinerary stop."""
+    city: str = Field(..., description="Stop city")
+    arrival_date: date = Field(..., description="Arrival date")
+    nights: int = Field(..., ge=1, description="Nights spent at this stop")
+    accommodation: AccommodationEstimate = Field(..., description="Accommodation cost estimate")
+    food: float = Field(..., ge=0, description="Food cost at this stop")
+    misc: float = Field(..., ge=0, description="Miscellaneous cost at this stop")
+
+
+class ItineraryQuoteResponse(BaseModel):
+    """Response schema for a multi-city round trip quote."""
+    order: List[str] = Field(..., description="Stops in visiting order")
+    legs: List[ItineraryLeg] = Field(..., description="Transport legs including the return to the origin")
+    stops: List[ItineraryStopEstimate] = Field(..., description="Per-stop stay costs in visiting order")
+    transport_total: float = Field(..., ge=0, description="Sum of leg prices")
+    stay_total: float = Field(..., ge=0, description="Sum of accommodation, food and misc over all stops")
+    total: float = Field(..., ge=0, description="Total trip cost")
+    solver: Literal["exact", "heuristic", "fixed"] = Field(..., description="How the stop order was chosen")
+    partial: bool = Field(default=False, description="True when some leg prices come from an incomplete provider fan-out")
+    estimated: bool = Field(default=False, description="True when some leg prices are estimates served while the provider is unavailable")
+
+
 class ErrorResponse(BaseModel):
     """Schema for error responses."""
     detail: str = Field(..., description="Error message")
@@ -240,6 +455,11 @@ class ChatRequest(BaseModel):
         default=None,
         description="Optional chatbot context such as destination and days",
     )
+    session_id: Optional[str] = Field(
+        default=None,
+        max_length=32,
+        description="Chat session to continue; earlier turns are sent to the model as history",
+    )
 
     @field_validator('message', mode='before')
     @classmethod
@@ -254,6 +474,32 @@ class ChatRequest(BaseModel):
 class ChatResponse(BaseModel):
     """Response schema for AI chatbot replies."""
     reply: str = Field(..., description="Assistant reply")
+    session_id: Optional[str] = Field(default=None, description="Chat session the reply was recorded in")
+
+
+class ChatSessionCreate(BaseModel):
+    """Request schema for starting a server-side chat session."""
+    context: Optional[Dict[str, str]] = Field(
+        default=None,
+        description="Context used for every turn unless a message sends its own",
+    )
+
+
+class ChatTurnResponse(BaseModel):
+    """One recorded chat message."""
+    role: str = Field(..., description="user or assistant")
+    content: str = Field(..., description="Message text")
+    created_at: datetime = Field(..., description="Recorded at")
+
+
+class ChatSessionResponse(BaseModel):
+    """Response schema for a server-side chat session."""
+    session_id: str = Field(..., description="Chat session ID")
+    created_at: datetime = Field(..., description="Created at")
+    context: Optional[Dict[str, str]] = Field(default=None, description="Session context")
+    summary: str = Field(default="", description="Summary of turns no longer sent verbatim")
+    summarized_turns: int = Field(default=0, ge=0, description="Number of oldest turns folded into the summary")
+    turns: List[ChatTurnResponse] = Field(default_factory=list, description="All recorded turns, oldest first")
 
 
 class ChatHealthResponse(BaseModel):
@@ -263,6 +509,10 @@ class ChatHealthResponse(BaseModel):
     model: str = Field(..., description="Configured model name")
     provider_reachable: bool = Field(..., description="Whether provider API is reachable")
     model_available: bool = Field(..., description="Whether configured model exists locally")
+    checked_at: Optional[float] = Field(
+        default=None,
+        description="Unix time of the oldest backend probe in the health snapshot",
+    )
 
 
 class ChatFromTripRequest(BaseModel):
@@ -296,3 +546,50 @@ class ChatFromTripResponse(BaseModel):
     action: str = Field(..., description="Action used for generation")
     reply: str = Field(..., description="Assistant reply")
     context: Dict[str, str] = Field(..., description="Trusted trip context used for generation")
+    precomputed: bool = Field(default=False, description="Whether the reply was generated in the background after save")
+
+
+class ChatJobCreate(BaseModel):
+    """Request schema for queueing a background chat generation."""
+    trip_id: Optional[int] = Field(default=None, description="Saved trip whose trusted context is used")
+    action: Literal["general", "improve_itinerary", "reduce_budget_15", "family_friendly"] = Field(
+        default="general",
+        description="Saved-trip action (used with trip_id)",
+    )
+    message: Optional[str] = Field(
+        default=None,
+        min_length=1,
+        max_length=2000,
+        description="Question; required without trip_id, optional custom question with it",
+    )
+    context: Optional[Dict[str, str]] = Field(
+        default=None,
+        description="Optional chatbot context when no trip_id is given",
+    )
+
+    @field_validator('message', mode='before')
+    @classmethod
+    def strip_message(cls, v: Optional[str]) -> Optional[str]:
+        if isinstance(v, str):
+            v = v.strip()
+        return v or None
+
+    @model_validator(mode='after')
+    def require_message_or_trip(self) -> 'ChatJobCreate':
+        if self.trip_id is None and not self.message:
+            raise ValueError("Either message or trip_id is required")
+        return self
+
+
+class ChatJobResponse(BaseModel):
+    """Status and, once finished, result of a background chat job."""
+    job_id: str = Field(..., description="Chat job ID")
+    status: Literal["queued", "running", "succeeded", "failed"] = Field(..., description="Job status")
+    created_at: datetime = Field(..., description="Queued at")
+    started_at: Optional[datetime] = Field(default=None, description="Picked up by a worker at")
+    finished_at: Optional[datetime] = Field(default=None, description="Finished at")
+    trip_id: Optional[int] = Field(default=None, description="Saved trip used as context")
+    action: Optional[str] = Field(default=None, description="Saved-trip action")
+    reply: Optional[str] = Field(default=None, description="Assistant reply once succeeded")
+    fallback: bool = Field(default=False, description="Whether the reply is the canned fallback")
+    error: Optional[str] = Field(default=None, description="Failure reason")
@@ -0,0 +1,130 @@
+"""Exact-match cache for generated chat replies."""
+
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from app.core.cache import LRUCache, RedisJSONCache, cache_stats, create_redis_cache
+from app.core.config import settings
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+# Transport and residency settings that do not change the reply.
+_NON_CONTENT_KEYS = {"stream", "keep_alive"}
+
+
+def build_chat_cache_key(request_body: Dict[str, Any]) -> str:
+    """Hash everything the model sees: model, every message and generation options.
+
+    The whole body is hashed, including the separate system message that
+    carries the trip context, so a trip whose context changed produces a
+    different key and never reuses a reply written for the old one.
+    """
+    material = {key: value for key, value in request_body.items() if key not in _NON_CONTENT_KEYS}
+    encoded = json.dumps(material, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ChatResponseCache:
+    """
+    In-process LRU of chat replies with an optional shared Redis tier.
+
+    Only genuine model replies are stored; callers must not pass fallback
+    replies to ``set``.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2000,
+        ttl_seconds: float = 3600,
+        redis_cache: Optional[RedisJSONCache] = None,
+    ) -> None:
+        self.ttl_seconds = max(0.0, ttl_seconds)
+        self._l1 = LRUCache(max_entries)
+        self._l2 = redis_cache
+        self._counters: Dict[str, int] = {"l1_hits": 0, "l2_hits": 0, "misses": 0, "stores": 0}
+
+    @classmethod
+    def from_settings(cls) -> "ChatResponseCache":
+        redis_cache: Optional[RedisJSONCache] = None
+        try:
+            redis_cache = create_redis_cache(
+                backend=settings.chat_cache_backend,
+                redis_url=settings.redis_url,
+                key_prefix=settings.redis_chat_cache_prefix,
+                connect_timeout_seconds=settings.redis_connect_timeout_seconds,
+                socket_timeout_seconds=settings.redis_socket_timeout_seconds,
+            )
+        except Exception as exc:
+            logger.warning(
+                "Failed to initialize chat cache backend '%s': %s. Using in-process cache only.",
+                settings.chat_cache_backend,
+                str(exc),
+            )
+
+        return cls(
+            max_entries=settings.chat_cache_max_entries,
+            ttl_seconds=settings.chat_cache_ttl_seconds,
+            redis_cache=redis_cache,
+        )
+
+    async def get(self, key: str) -> Optional[str]:
+        reply = self._l1.get(key)
+        if reply is not None:
+            self._counters["l1_hits"] += 1
+            return reply
+
+        if self._l2 is not None:
+            reply = await self._l2.get(key)
+            if isinstance(reply, str) and reply:
+                self._counters["l2_hits"] += 1
+                self._l1.set(key, reply, ttl_seconds=self.ttl_seconds)
+                return reply
+
+        self._counters["misses"] += 1
+        return None
+
+    async def set(self, key: str, reply: str) -> None:
+        if self.ttl_seconds <= 0 or not reply:
+            return
+        self._counters["stores"] += 1
+        self._l1.set(key, str(reply), ttl_seconds=self.ttl_seconds)
+        if self._l2 is not None:
+            await self._l2.set(key, str(reply), self.ttl_seconds)
+
+    def clear(self) -> None:
+        self._l1.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return cache_stats(
+            self._l1,
+            {
+                **self._counters,
+                "l2_enabled": self._l2 is not None,
+                "l2_errors": self._l2.errors if self._l2 is not None else 0,
+            },
+        )
+
+    async def close(self) -> None:
+        if self._l2 is not None:
+            await self._l2.close()
+
+
+_chat_cache: Optional[ChatResponseCache] = None
+
+
+def get_chat_response_cache() -> ChatResponseCache:
+    global _chat_cache
+    if _chat_cache is None:
+        _chat_cache = ChatResponseCache.from_settings()
+    return _chat_cache
+
+
+async def close_chat_response_cache() -> None:
+    global _chat_cache
+    cache = _chat_cache
+    _chat_cache = None
+    if cache is not None:
+        await cache.close()
@@ -0,0 +1,340 @@
+"""Background chat jobs: long generations run by a bounded worker pool, results kept in the database."""
+
+import asyncio
+import json
+import os
+import socket
+from datetime import datetime, timedelta, timezone
+from time import monotonic
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from uuid import uuid4
+
+from sqlmodel import Session, col, delete, update
+
+from app.core.admission import AdmissionRejectedError
+from app.core.config import settings
+from app.db.session import engine
+from app.logger import get_logger
+from app.models import ChatJob
+from app.services.llm import LLM_PRIORITY_BACKGROUND, FallbackReply, generate_chat_reply
+
+logger = get_logger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+TERMINAL_JOB_STATUSES = {JOB_SUCCEEDED, JOB_FAILED}
+
+_POLL_INTERVAL_SECONDS = 0.5
+# A job whose heartbeat is this many intervals old was lost with the replica holding it.
+_MISSED_HEARTBEATS = 4
+
+JobRunner = Callable[[ChatJob], Awaitable[str]]
+
+
+class JobQueueFullError(RuntimeError):
+    """Raised when the job queue already holds ``LLM_JOB_MAX_PENDING`` jobs."""
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands datetimes back without tzinfo.
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def _job_deadline(job: ChatJob) -> datetime:
+    """When an unfinished job counts as lost: its worker pool stopped heartbeating, or it ran past twice the budget."""
+    last_seen = _as_utc(job.heartbeat_at or job.created_at)
+    deadline = last_seen + timedelta(seconds=_MISSED_HEARTBEATS * settings.llm_job_heartbeat_seconds)
+    if job.status == JOB_RUNNING and job.started_at is not None:
+        deadline = min(deadline, _as_utc(job.started_at) + timedelta(seconds=2 * settings.llm_job_timeout_seconds))
+    return deadline
+
+
+def _held_by_local_queue(job: ChatJob) -> bool:
+    return _job_pool is not None and _job_pool.done_event(job.id) is not None
+
+
+def job_context(job: ChatJob) -> Optional[Dict[str, str]]:
+    if not job.context_json:
+        return None
+    try:
+        context = json.loads(job.context_json)
+    except (TypeError, ValueError):
+        logger.warning("Could not parse context_json for chat job %s", job.id)
+        return None
+    return context if isinstance(context, dict) else None
+
+
+def create_chat_job(
+    db: Session,
+    user_id: int,
+    message: str,
+    context: Optional[Dict[str, str]],
+    priority: int,
+    trip_id: Optional[int] = None,
+    action: Optional[str] = None,
+    content_hash: Optional[str] = None,
+) -> ChatJob:
+    job = ChatJob(
+        user_id=user_id,
+        message=message,
+        context_json=json.dumps(context) if context else None,
+        priority=priority,
+        trip_id=trip_id,
+        action=action,
+        content_hash=content_hash,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def delete_chat_jobs(job_ids: List[str]) -> None:
+    if not job_ids:
+        return
+    with Session(engine) as db:
+        db.exec(delete(ChatJob).where(col(ChatJob.id).in_(job_ids)))
+        db.commit()
+
+
+def finish_chat_job(db: Session, job: ChatJob, **fields: Any) -> None:
+    for name, value in fields.items():
+        setattr(job, name, value)
+    job.finished_at = datetime.now(timezone.utc)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+
+def _expire_if_abandoned(db: Session, job: ChatJob) -> ChatJob:
+    """Fail a job whose worker pool is gone (e.g. restarted); jobs held by this process are not lost."""
+    if job.status in TERMINAL_JOB_STATUSES or (job.status == JOB_QUEUED and _held_by_local_queue(job)):
+        return job
+    if datetime.now(timezone.utc) > _job_deadline(job):
+        finish_chat_job(db, job, status=JOB_FAILED, error="Job did not finish in time.")
+    return job
+
+
+async def run_chat_job(job: ChatJob) -> str:
+    """Generate the reply with the job budget, waiting out a busy admission queue instead of failing."""
+    deadline = monotonic() + settings.llm_job_timeout_seconds
+    prefix_key = f"trip:{job.trip_id}" if job.trip_id is not None else None
+    # Background work must not use up the user's own per-user queue slots.
+    user_key = f"background:user:{job.user_id}" if job.priority >= LLM_PRIORITY_BACKGROUND else f"user:{job.user_id}"
+    while True:
+        try:
+            return await generate_chat_reply(
+                job.message,
+                job_context(job),
+                user_key=user_key,
+                priority=job.priority,
+                prefix_key=prefix_key,
+                timeout_seconds=settings.llm_job_timeout_seconds,
+                endpoint="chat_job",
+            )
+        except AdmissionRejectedError as exc:
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                raise
+            await asyncio.sleep(min(max(exc.retry_after, _POLL_INTERVAL_SECONDS), remaining))
+
+
+class ChatJobWorkerPool:
+    """
+    Runs queued chat jobs on ``workers`` asyncio tasks.
+
+    Only job IDs are queued in memory; inputs and results live in the
+    ``chatjob`` table, so any replica can answer polls. Workers start on the
+    first submitted job. ``max_pending`` bounds the in-memory backlog and
+    ``submit`` raises JobQueueFullError beyond it.
+
+    Submitted jobs are claimed in the table, and their ``heartbeat_at`` is
+    refreshed every ``LLM_JOB_HEARTBEAT_SECONDS`` until they finish, so
+    other replicas can tell a long-queued job from one lost to a restart.
+    """
+
+    def __init__(self, runner: JobRunner, workers: int = 2, max_pending: int = 100) -> None:
+        self.runner = runner
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=self.max_pending)
+        self._tasks: List[asyncio.Task] = []
+        self._done_events: Dict[str, asyncio.Event] = {}
+        self._submitted = 0
+        self._rejected = 0
+        self._succeeded = 0
+        self._failed = 0
+        self._running = 0
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+
+    @classmethod
+    def from_settings(cls) -> "ChatJobWorkerPool":
+        return cls(
+            runner=run_chat_job,
+            workers=settings.llm_job_workers,
+            max_pending=settings.llm_job_max_pending,
+        )
+
+    def _ensure_workers(self) -> None:
+        if self._tasks:
+            return
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._work()) for _ in range(self.workers)]
+        self._tasks.append(loop.create_task(self._heartbeat()))
+
+    def is_full(self) -> bool:
+        return self._queue.full()
+
+    def submit(self, job_id: str) -> None:
+        self._ensure_workers()
+        try:
+            self._queue.put_nowait(job_id)
+        except asyncio.QueueFull as exc:
+            self._rejected += 1
+            raise JobQueueFullError("Too many chat jobs are queued. Please try again later.") from exc
+        self._submitted += 1
+        self._done_events[job_id] = asyncio.Event()
+        self._touch([job_id], claim=True)
+
+    def _touch(self, job_ids: List[str], claim: bool = False) -> None:
+        """Record that this pool still holds ``job_ids``."""
+        statement = update(ChatJob).where(col(ChatJob.id).in_(job_ids)).where(
+            col(ChatJob.status).in_([JOB_QUEUED, JOB_RUNNING])
+        )
+        if not claim:
+            statement = statement.where(col(ChatJob.claimed_by) == self.owner)
+        values: Dict[str, Any] = {"heartbeat_at": datetime.now(timezone.utc)}
+        if claim:
+            values["claimed_by"] = self.owner
+        try:
+            with Session(engine) as db:
+                db.exec(statement.values(**values))
+                db.commit()
+        except Exception as exc:
+            logger.warning(f"Chat job heartbeat failed: {str(exc)}")
+
+    async def _heartbeat(self) -> None:
+        interval = max(0.01, settings.llm_job_heartbeat_seconds)
+        while True:
+            await asyncio.sleep(interval)
+            held = list(self._done_events)
+            if held:
+                self._touch(held)
+
+    def done_event(self, job_id: str) -> Optional[asyncio.Event]:
+        """Set when a job submitted to this process finishes; None for jobs queued elsewhere."""
+        return self._done_events.get(job_id)
+
+    async def _work(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as exc:
+                logger.error(f"Chat job {job_id} crashed: {str(exc)}", exc_info=True)
+            finally:
+                self._queue.task_done()
+                event = self._done_events.pop(job_id, None)
+                if event is not None:
+                    event.set()
+
+    async def _run(self, job_id: str) -> None:
+        with Session(engine) as db:
+            job = db.get(ChatJob, job_id)
+            if job is None or job.status != JOB_QUEUED:
+                return
+            job.status = JOB_RUNNING
+            job.started_at = datetime.now(timezone.utc)
+            db.add(job)
+            db.commit()
+            db.refresh(job)
+
+        self._running += 1
+        try:
+            reply = await self.runner(job)
+        except Exception as exc:
+            error = str(exc) if isinstance(exc, (AdmissionRejectedError, RuntimeError)) else "Failed to generate response."
+            logger.warning(f"Chat job {job_id} failed: {str(exc)}")
+            self._save_result(job_id, status=JOB_FAILED, error=error)
+            self._failed += 1
+            return
+        finally:
+            self._running -= 1
+
+        self._save_result(job_id, status=JOB_SUCCEEDED, reply=str(reply), fallback=isinstance(reply, FallbackReply))
+        self._succeeded += 1
+        logger.info(f"Chat job {job_id} finished")
+
+    def _save_result(self, job_id: str, **fields: Any) -> None:
+        with Session(engine) as db:
+            job = db.get(ChatJob, job_id)
+            # A job reported as expired in the meantime keeps that status.
+            if job is not None and job.status == JOB_RUNNING:
+                finish_chat_job(db, job, **fields)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "started": bool(self._tasks),
+            "pending": self._queue.qsize(),
+            "running": self._running,
+            "max_pending": self.max_pending,
+            "submitted": self._submitted,
+            "rejected": self._rejected,
+            "succeeded": self._succeeded,
+            "failed": self._failed,
+        }
+
+    async def close(self) -> None:
+        tasks = self._tasks
+        self._tasks = []
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+_job_pool: Optional[ChatJobWorkerPool] = None
+
+
+def get_chat_job_pool() -> ChatJobWorkerPool:
+    global _job_pool
+    if _job_pool is None:
+        _job_pool = ChatJobWorkerPool.from_settings()
+    return _job_pool
+
+
+async def close_chat_job_pool() -> None:
+    global _job_pool
+    pool = _job_pool
+    _job_pool = None
+    if pool is not None:
+        await pool.close()
+
+
+def get_chat_job(db: Session, job_id: str) -> Optional[ChatJob]:
+    job = db.get(ChatJob, job_id)
+    return _expire_if_abandoned(db, job) if job is not None else None
+
+
+async def wait_for_chat_job(job_id: str, wait_seconds: float) -> Optional[ChatJob]:
+    """Return the job once it finishes or ``wait_seconds`` pass, whichever is first."""
+    deadline = monotonic() + max(0.0, wait_seconds)
+    while True:
+        with Session(engine) as db:
+            job = get_chat_job(db, job_id)
+        remaining = deadline - monotonic()
+        if job is None or job.status in TERMINAL_JOB_STATUSES or remaining <= 0:
+            return job
+
+        event = get_chat_job_pool().done_event(job_id)
+        if event is None:
+            # Queued on another replica: poll the shared table.
+            await asyncio.sleep(min(_POLL_INTERVAL_SECONDS, remaining))
+            continue
+        try:
+            await asyncio.wait_for(event.wait(), timeout=remaining)
+        except asyncio.TimeoutError:
+            pass
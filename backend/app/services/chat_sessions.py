@@ -0,0 +1,183 @@
+"""Server-side chat sessions with token-budgeted history and lazy summaries."""
+
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.db.session import engine
+from app.logger import get_logger
+from app.models import ChatSession, ChatTurn
+
+logger = get_logger(__name__)
+
+# Rough budget math for Llama-style tokenizers: ~4 characters per token plus per-message framing.
+_CHARS_PER_TOKEN = 4
+_MESSAGE_OVERHEAD_TOKENS = 4
+
+Summarizer = Callable[[str, List[Dict[str, str]]], Awaitable[Optional[str]]]
+
+_summaries_in_flight: Set[str] = set()
+_summary_tasks: Set[asyncio.Task] = set()
+
+
+class ChatHistory(NamedTuple):
+    """What the model sees of earlier turns: a summary plus the most recent turns verbatim."""
+
+    summary: str
+    turns: List[Dict[str, str]]
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // _CHARS_PER_TOKEN) + _MESSAGE_OVERHEAD_TOKENS
+
+
+def split_history(turns: List[ChatTurn], budget_tokens: int) -> Tuple[List[ChatTurn], List[ChatTurn]]:
+    """Split into (older, recent): the longest suffix of turns fitting ``budget_tokens`` stays verbatim."""
+    used = 0
+    start = len(turns)
+    while start > 0:
+        cost = estimate_tokens(turns[start - 1].content)
+        if used + cost > budget_tokens:
+            break
+        used += cost
+        start -= 1
+    return turns[:start], turns[start:]
+
+
+def _as_messages(turns: List[ChatTurn]) -> List[Dict[str, str]]:
+    return [{"role": turn.role, "content": turn.content} for turn in turns]
+
+
+def _summary_max_chars() -> int:
+    return max(0, settings.llm_summary_max_tokens) * _CHARS_PER_TOKEN
+
+
+def open_db_session() -> Session:
+    """Session for work outside a request (streamed replies, background summaries)."""
+    return Session(engine)
+
+
+def create_chat_session(
+    db: Session,
+    context: Optional[Dict[str, str]] = None,
+    user_id: Optional[int] = None,
+) -> ChatSession:
+    chat_session = ChatSession(user_id=user_id, context_json=json.dumps(context) if context else None)
+    db.add(chat_session)
+    db.commit()
+    db.refresh(chat_session)
+    return chat_session
+
+
+def get_chat_session(db: Session, session_id: str) -> Optional[ChatSession]:
+    return db.get(ChatSession, session_id)
+
+
+def session_context(chat_session: ChatSession) -> Optional[Dict[str, str]]:
+    if not chat_session.context_json:
+        return None
+    try:
+        context = json.loads(chat_session.context_json)
+    except (TypeError, ValueError):
+        logger.warning("Could not parse context_json for chat session %s", chat_session.id)
+        return None
+    return context if isinstance(context, dict) else None
+
+
+def _unsummarized_turns(db: Session, chat_session: ChatSession) -> List[ChatTurn]:
+    return list(
+        db.exec(
+            select(ChatTurn)
+            .where(ChatTurn.session_id == chat_session.id)
+            .order_by(ChatTurn.id)
+            .offset(chat_session.summarized_turns)
+        ).all()
+    )
+
+
+def list_turns(db: Session, chat_session: ChatSession) -> List[ChatTurn]:
+    return list(db.exec(select(ChatTurn).where(ChatTurn.session_id == chat_session.id).order_by(ChatTurn.id)).all())
+
+
+def load_history(db: Session, chat_session: ChatSession) -> ChatHistory:
+    """Summary plus the recent turns that fit ``LLM_HISTORY_TOKEN_BUDGET``.
+
+    Turns that no longer fit and are not summarized yet are left out until
+    the background summary catches up, so the prompt never exceeds the budget.
+    """
+    _, recent = split_history(_unsummarized_turns(db, chat_session), settings.llm_history_token_budget)
+    return ChatHistory(summary=chat_session.summary, turns=_as_messages(recent))
+
+
+def record_exchange(db: Session, chat_session: ChatSession, message: str, reply: str) -> int:
+    """Store one user/assistant exchange; returns how many turns have fallen out of the verbatim window."""
+    db.add(ChatTurn(session_id=chat_session.id, role="user", content=message))
+    db.add(ChatTurn(session_id=chat_session.id, role="assistant", content=reply))
+    chat_session.updated_at = datetime.now(timezone.utc)
+    db.add(chat_session)
+    db.commit()
+    db.refresh(chat_session)
+
+    older, _ = split_history(_unsummarized_turns(db, chat_session), settings.llm_history_token_budget)
+    return len(older)
+
+
+async def summarize_session(session_id: str, summarizer: Summarizer) -> None:
+    """Fold turns that left the verbatim window into the session summary."""
+    with open_db_session() as db:
+        chat_session = get_chat_session(db, session_id)
+        if chat_session is None:
+            return
+        older, _ = split_history(_unsummarized_turns(db, chat_session), settings.llm_history_token_budget)
+        if not older:
+            return
+        previous_summary = chat_session.summary
+        folded_from = chat_session.summarized_turns
+        turns = _as_messages(older)
+
+    summary = await summarizer(previous_summary, turns)
+    if not summary:
+        logger.warning("Chat session summary was not generated for session %s", session_id)
+        return
+
+    with open_db_session() as db:
+        chat_session = get_chat_session(db, session_id)
+        if chat_session is None or chat_session.summarized_turns != folded_from:
+            return
+        chat_session.summary = summary.strip()[:_summary_max_chars()]
+        chat_session.summarized_turns = folded_from + len(turns)
+        db.add(chat_session)
+        db.commit()
+    logger.info(f"Summarized {len(turns)} turns of chat session {session_id}")
+
+
+def schedule_summary(session_id: str, overflow_turns: int, summarizer: Summarizer) -> bool:
+    """Start a background summary once enough turns left the window; at most one per session."""
+    if overflow_turns < max(1, settings.llm_summary_min_turns) or session_id in _summaries_in_flight:
+        return False
+
+    async def run() -> None:
+        try:
+            await summarize_session(session_id, summarizer)
+        except Exception as exc:
+            logger.warning("Chat session summary failed for session %s: %s", session_id, str(exc))
+        finally:
+            _summaries_in_flight.discard(session_id)
+
+    _summaries_in_flight.add(session_id)
+    task = asyncio.get_running_loop().create_task(run())
+    _summary_tasks.add(task)
+    task.add_done_callback(_summary_tasks.discard)
+    return True
+
+
+async def cancel_pending_summaries() -> None:
+    tasks = list(_summary_tasks)
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
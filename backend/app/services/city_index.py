@@ -0,0 +1,161 @@
+"""Immutable in-memory index of CityStats rows for zero-query cost lookups."""
+
+import threading
+import unicodedata
+from time import monotonic
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.logger import get_logger
+from app.models import CityStats
+
+logger = get_logger(__name__)
+
+
+class CityStatsEntry(NamedTuple):
+    """Read-only copy of a CityStats row exposing the same cost attributes."""
+
+    city: str
+    country: str
+    avg_accommodation_per_night: float
+    avg_food_per_day: float
+    avg_misc_per_day: float
+
+
+class CityStatsSnapshot(NamedTuple):
+    entries: Mapping[str, CityStatsEntry]
+    version: int
+    loaded_at: float
+
+
+def normalize_city_name(city: str) -> str:
+    """Case-fold, strip accents and collapse whitespace (``"  São  PAULO"`` -> ``"sao paulo"``)."""
+    decomposed = unicodedata.normalize("NFKD", city)
+    without_accents = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(without_accents.casefold().split())
+
+
+class CityStatsIndex:
+    """
+    Holds the whole CityStats table as an immutable dictionary.
+
+    Readers always see one complete snapshot: a reload builds a new mapping
+    and swaps the reference in a single assignment. The snapshot is rebuilt
+    when the version is bumped (any committed CityStats write in this process) or when
+    it is older than ``ttl_seconds`` (writes made by other replicas).
+    """
+
+    def __init__(self, ttl_seconds: float = 300) -> None:
+        self.ttl_seconds = max(0.0, ttl_seconds)
+        self._snapshot: Optional[CityStatsSnapshot] = None
+        self._version = 0
+        self._reload_lock = threading.Lock()
+        self.reloads = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def bump_version(self) -> None:
+        self._version += 1
+
+    def needs_reload(self) -> bool:
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.version != self._version:
+            return True
+        return self.ttl_seconds > 0 and monotonic() - snapshot.loaded_at >= self.ttl_seconds
+
+    def load(self, session: Session) -> CityStatsSnapshot:
+        """Rebuild the snapshot from the database and swap it in atomically."""
+        with self._reload_lock:
+            version = self._version
+            rows = session.exec(
+                select(
+                    CityStats.city,
+                    CityStats.country,
+                    CityStats.avg_accommodation_per_night,
+                    CityStats.avg_food_per_day,
+                    CityStats.avg_misc_per_day,
+                ).order_by(CityStats.id)
+            ).all()
+
+            entries: Dict[str, CityStatsEntry] = {}
+            for row in rows:
+                entry = CityStatsEntry(*row)
+                entries.setdefault(normalize_city_name(entry.city), entry)
+
+            snapshot = CityStatsSnapshot(
+                entries=MappingProxyType(entries),
+                version=version,
+                loaded_at=monotonic(),
+            )
+            self._snapshot = snapshot
+            self.reloads += 1
+
+        logger.info("CityStats index loaded (%s cities, version=%s)", len(entries), version)
+        return snapshot
+
+    def lookup(self, city: str) -> Optional[CityStatsEntry]:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        entry = snapshot.entries.get(normalize_city_name(city))
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def cities(self) -> List[str]:
+        """Display names of every indexed city."""
+        snapshot = self._snapshot
+        return [entry.city for entry in snapshot.entries.values()] if snapshot is not None else []
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "cities": len(snapshot.entries) if snapshot is not None else 0,
+            "snapshot_version": snapshot.version if snapshot is not None else None,
+            "version": self._version,
+            "age_seconds": round(monotonic() - snapshot.loaded_at, 1) if snapshot is not None else None,
+            "reloads": self.reloads,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+_city_index = CityStatsIndex(ttl_seconds=settings.city_stats_index_ttl_seconds)
+
+
+def get_city_stats_index() -> CityStatsIndex:
+    return _city_index
+
+
+_CITY_STATS_CHANGED = "city_stats_changed"
+
+
+def _track_city_stats_writes(session: OrmSession, flush_context) -> None:
+    if any(isinstance(obj, CityStats) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info[_CITY_STATS_CHANGED] = True
+
+
+def _bump_city_index_version(session: OrmSession) -> None:
+    # Only committed writes are visible to the reload, so bump after commit, not at flush.
+    if session.info.pop(_CITY_STATS_CHANGED, False):
+        _city_index.bump_version()
+
+
+def _forget_city_stats_writes(session: OrmSession) -> None:
+    session.info.pop(_CITY_STATS_CHANGED, None)
+
+
+event.listen(OrmSession, "after_flush", _track_city_stats_writes)
+event.listen(OrmSession, "after_commit", _bump_city_index_version)
+event.listen(OrmSession, "after_rollback", _forget_city_stats_writes)
@@ -0,0 +1,152 @@
+"""Local fast path for chat messages that can be answered from templates without the LLM."""
+
+import re
+import zlib
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+Responder = Callable[[str, Optional[Dict[str, str]]], Optional[str]]
+
+_TRAILER = r"[\s!.,?:)(*~\-]*"
+
+
+class LocalIntent(NamedTuple):
+    name: str
+    pattern: re.Pattern
+    responder: Responder
+
+
+class LocalAnswer(NamedTuple):
+    intent: str
+    reply: str
+
+
+def _pick(templates: List[str], message: str) -> str:
+    """Deterministic choice so the same message always gets the same wording."""
+    return templates[zlib.crc32(message.encode("utf-8")) % len(templates)]
+
+
+def _destination(context: Optional[Dict[str, str]]) -> str:
+    return (context or {}).get("destination", "").strip()
+
+
+def _gratitude_reply(message: str, context: Optional[Dict[str, str]]) -> str:
+    destination = _destination(context)
+    if destination:
+        return _pick([f"You're welcome! Enjoy {destination}.", f"Happy to help - have a great time in {destination}!"], message)
+    return _pick(["You're welcome!", "Happy to help!", "Anytime - enjoy your trip planning!"], message)
+
+
+def _farewell_reply(message: str, context: Optional[Dict[str, str]]) -> str:
+    destination = _destination(context)
+    if destination:
+        return f"Goodbye, and safe travels to {destination}!"
+    return _pick(["Goodbye, and safe travels!", "See you soon - happy travels!"], message)
+
+
+def _acknowledgement_reply(message: str, context: Optional[Dict[str, str]]) -> str:
+    return _pick(["Great! Let me know if you need anything else.", "Sounds good - ask me anytime."], message)
+
+
+def _greeting_reply(message: str, context: Optional[Dict[str, str]]) -> str:
+    destination = _destination(context)
+    if destination:
+        return f"Hi! How can I help with your trip to {destination}?"
+    return "Hi! Where are you thinking of travelling?"
+
+
+def _trip_budget_reply(message: str, context: Optional[Dict[str, str]]) -> Optional[str]:
+    budget = (context or {}).get("budget", "").strip()
+    if not budget:
+        return None
+    destination = _destination(context)
+    if destination:
+        return f"Your estimated budget for the {destination} trip is {budget}."
+    return f"Your estimated trip budget is {budget}."
+
+
+DEFAULT_INTENTS: List[LocalIntent] = [
+    LocalIntent(
+        "gratitude",
+        re.compile(
+            r"^(thanks?(\s+(?:you|a\s+lot|so\s+much|very\s+much))?|thank\s+you(\s+(?:so|very)\s+much)?|ty|cheers"
+            r"|appreciate\s+it|much\s+appreciated)" + _TRAILER + "$"
+        ),
+        _gratitude_reply,
+    ),
+    LocalIntent(
+        "farewell",
+        re.compile(r"^(bye|goodbye|bye\s+bye|see\s+(?:you|ya)(\s+later)?|good\s*night|later)" + _TRAILER + "$"),
+        _farewell_reply,
+    ),
+    LocalIntent(
+        "acknowledgement",
+        re.compile(
+            r"^(ok(ay)?|cool|great|got\s+it|awesome|perfect|noted|sure|sounds?\s+good|nice|wonderful|brilliant"
+            r"|excellent|no\s+worries|np|haha|lol|wow|good|alright|yep|yup|yeah)" + _TRAILER + "$"
+        ),
+        _acknowledgement_reply,
+    ),
+    LocalIntent(
+        "greeting",
+        re.compile(r"^(hi|hello|hey|hiya|good\s+(?:morning|afternoon|evening))(\s+there)?" + _TRAILER + "$"),
+        _greeting_reply,
+    ),
+    LocalIntent(
+        "trip_budget",
+        re.compile(
+            r"^(what(?:'s|\s+is)|how\s+much\s+is)\s+(?:my|the|our)\s+(?:total\s+|trip\s+)?(?:budget|cost)" + _TRAILER + "$"
+        ),
+        _trip_budget_reply,
+    ),
+]
+
+
+class IntentRouter:
+    """
+    First-match router over local intents.
+
+    A responder may return None to decline (for example when the context
+    lacks the data it needs), in which case matching continues and the
+    message ultimately goes to the LLM.
+    """
+
+    def __init__(self, intents: Optional[List[LocalIntent]] = None) -> None:
+        self._intents: List[LocalIntent] = list(DEFAULT_INTENTS if intents is None else intents)
+        self._requests = 0
+        self._hits: Dict[str, int] = {}
+
+    def register(self, name: str, pattern: str, responder: Responder) -> None:
+        self._intents.append(LocalIntent(name, re.compile(pattern), responder))
+
+    def route(self, message: str, context: Optional[Dict[str, str]] = None) -> Optional[LocalAnswer]:
+        self._requests += 1
+        normalized = " ".join(message.strip().lower().split())
+        for intent in self._intents:
+            if not intent.pattern.match(normalized):
+                continue
+            reply = intent.responder(normalized, context)
+            if reply:
+                self._hits[intent.name] = self._hits.get(intent.name, 0) + 1
+                return LocalAnswer(intent.name, reply)
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        hits = sum(self._hits.values())
+        return {
+            "intents": [intent.name for intent in self._intents],
+            "requests": self._requests,
+            "hits": hits,
+            "misses": self._requests - hits,
+            "hit_rate": round(hits / self._requests, 4) if self._requests else 0.0,
+            "hits_by_intent": dict(self._hits),
+        }
+
+
+_intent_router: Optional[IntentRouter] = None
+
+
+def get_intent_router() -> IntentRouter:
+    global _intent_router
+    if _intent_router is None:
+        _intent_router = IntentRouter()
+    return _intent_router
@@ -0,0 +1,223 @@
+"""Multi-city itinerary quoting with cheapest stop ordering."""
+
+import asyncio
+from datetime import date, timedelta
+from itertools import permutations
+from typing import Dict, List, Sequence, Tuple
+
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.logger import get_logger
+from app.schemas import AccommodationEstimate, TransportOption, TripRequest
+from app.services.pricing import get_transport_options, lookup_city_stats, resolve_daily_costs
+
+logger = get_logger(__name__)
+
+CostMatrix = List[List[float]]
+
+
+def tour_cost(costs: CostMatrix, order: Sequence[int]) -> float:
+    """Cost of leaving node 0, visiting ``order`` and returning to node 0."""
+    path = [0, *order, 0]
+    return sum(costs[a][b] for a, b in zip(path, path[1:]))
+
+
+def _held_karp(costs: CostMatrix) -> List[int]:
+    """Exact cheapest round trip from node 0 through every other node (O(2^n * n^2))."""
+    n = len(costs) - 1
+    if n <= 1:
+        return list(range(1, n + 1))
+
+    full = (1 << n) - 1
+    # best[(subset, last)] = (cost, previous) over stops 1..n, bit i-1 standing for stop i
+    best: Dict[Tuple[int, int], Tuple[float, int]] = {
+        (1 << (k - 1), k): (costs[0][k], 0) for k in range(1, n + 1)
+    }
+    for size in range(2, n + 1):
+        for subset in range(1, full + 1):
+            if bin(subset).count("1") != size:
+                continue
+            for last in range(1, n + 1):
+                bit = 1 << (last - 1)
+                if not subset & bit:
+                    continue
+                rest = subset ^ bit
+                candidates = (
+                    (best[(rest, prev)][0] + costs[prev][last], prev)
+                    for prev in range(1, n + 1)
+                    if rest & (1 << (prev - 1))
+                )
+                best[(subset, last)] = min(candidates)
+
+    _, last = min((best[(full, k)][0] + costs[k][0], k) for k in range(1, n + 1))
+    order: List[int] = []
+    subset = full
+    while last:
+        order.append(last)
+        previous = best[(subset, last)][1]
+        subset ^= 1 << (last - 1)
+        last = previous
+    return order[::-1]
+
+
+def _neighbours(order: List[int]):
+    """2-opt segment reversals, then or-opt moves of 1-3 consecutive stops (direction-preserving)."""
+    n = len(order)
+    for i in range(n - 1):
+        for j in range(i + 1, n):
+            yield order[:i] + order[i:j + 1][::-1] + order[j + 1:]
+    for length in (1, 2, 3):
+        for i in range(n - length + 1):
+            segment = order[i:i + length]
+            rest = order[:i] + order[i + length:]
+            for k in range(len(rest) + 1):
+                if k != i:
+                    yield rest[:k] + segment + rest[k:]
+
+
+def _nearest_neighbour_local_search(costs: CostMatrix) -> List[int]:
+    """Greedy nearest-neighbour tour improved by 2-opt and or-opt moves until no move helps."""
+    remaining = set(range(1, len(costs)))
+    order: List[int] = []
+    current = 0
+    while remaining:
+        current = min(remaining, key=lambda node: (costs[current][node], node))
+        order.append(current)
+        remaining.discard(current)
+
+    best_cost = tour_cost(costs, order)
+    improved = True
+    while improved:
+        improved = False
+        for candidate in _neighbours(order):
+            candidate_cost = tour_cost(costs, candidate)
+            if candidate_cost < best_cost - 1e-9:
+                order, best_cost = candidate, candidate_cost
+                improved = True
+                break
+    return order
+
+
+def solve_stop_order(costs: CostMatrix, exact_max_stops: int) -> Tuple[List[int], str]:
+    """Return the cheapest visiting order of nodes 1..n and the solver used."""
+    n = len(costs) - 1
+    if n <= 3:
+        order = min(permutations(range(1, n + 1)), key=lambda perm: tour_cost(costs, perm))
+        return list(order), "exact"
+    if n <= exact_max_stops:
+        return _held_karp(costs), "exact"
+    return _nearest_neighbour_local_search(costs), "heuristic"
+
+
+def _cheapest(options: List[TransportOption]) -> TransportOption:
+    return min(options, key=lambda option: option.price)
+
+
+async def estimate_itinerary(
+    origin: str,
+    stops: List[Tuple[str, int]],
+    start_date: date,
+    travelers: int,
+    session: Session,
+    optimize_order: bool = True,
+) -> dict:
+    """Quote a round trip from ``origin`` through every stop and back.
+
+    Transport for every ordered city pair is fetched concurrently once (through
+    the quote cache) priced on ``start_date``, and each leg uses its cheapest
+    option. Unless ``optimize_order`` is false, stops are reordered to minimise
+    total transport cost. Each stop is costed with the ``estimate_trip`` model
+    for its number of nights.
+
+    Args:
+        stops: (city, nights) pairs in the requested order
+
+    Returns:
+        Dictionary with order, legs, stops, transport_total, stay_total, total, solver
+
+    Raises:
+        ProviderException: If a transport lookup fails
+    """
+    cities = [origin] + [city for city, _ in stops]
+    n = len(cities)
+    semaphore = asyncio.Semaphore(max(1, settings.quote_batch_max_concurrency))
+
+    async def price_leg(a: int, b: int) -> List[TransportOption]:
+        async with semaphore:
+            return await get_transport_options(
+                TripRequest(
+                    origin=cities[a],
+                    destination=cities[b],
+                    start_date=start_date,
+                    end_date=start_date,
+                    travelers=travelers,
+                )
+            )
+
+    pairs = [(a, b) for a in range(n) for b in range(n) if a != b]
+    pair_options = dict(zip(pairs, await asyncio.gather(*(price_leg(a, b) for a, b in pairs))))
+    city_stats = await asyncio.gather(*(lookup_city_stats(city, session) for city, _ in stops))
+
+    costs: CostMatrix = [
+        [_cheapest(pair_options[(a, b)]).price if a != b else 0.0 for b in range(n)]
+        for a in range(n)
+    ]
+    if optimize_order:
+        order, solver = solve_stop_order(costs, settings.itinerary_exact_max_stops)
+    else:
+        order, solver = list(range(1, n)), "fixed"
+
+    legs = []
+    stop_estimates = []
+    current_date = start_date
+    stay_total = 0.0
+    path = [0, *order, 0]
+    for a, b in zip(path, path[1:]):
+        option = _cheapest(pair_options[(a, b)])
+        legs.append({
+            "origin": cities[a],
+            "destination": cities[b],
+            "departure_date": current_date,
+            "option": option,
+        })
+        if b == 0:
+            break
+
+        city, nights = stops[b - 1]
+        per_night, food_per_day, misc_per_day = resolve_daily_costs(city_stats[b - 1])
+        accommodation_total = per_night * nights
+        food_total = food_per_day * nights * travelers
+        misc_total = misc_per_day * nights * travelers
+        stay_total += accommodation_total + food_total + misc_total
+        stop_estimates.append({
+            "city": city,
+            "arrival_date": current_date,
+            "nights": nights,
+            "accommodation": AccommodationEstimate(
+                per_night=per_night,
+                nights=nights,
+                total=round(accommodation_total, 2),
+            ),
+            "food": round(food_total, 2),
+            "misc": round(misc_total, 2),
+        })
+        current_date = current_date + timedelta(days=nights)
+
+    transport_total = sum(leg["option"].price for leg in legs)
+    total = round(transport_total + stay_total, 2)
+
+    logger.info(
+        f"Itinerary estimate from {origin} via {len(stops)} stops: ${total} "
+        f"({len(pairs)} leg lookups, solver={solver}, order={[cities[i] for i in order]})"
+    )
+
+    return {
+        "order": [cities[i] for i in order],
+        "legs": legs,
+        "stops": stop_estimates,
+        "transport_total": round(transport_total, 2),
+        "stay_total": round(stay_total, 2),
+        "total": total,
+        "solver": solver,
+    }
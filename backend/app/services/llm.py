@@ -1,20 +1,42 @@
 """LLM service for chatbot responses."""
 
 import asyncio
+import json
 import re
+from contextlib import asynccontextmanager
 from time import perf_counter
-from typing import Dict, Optional, Any
+from typing import AsyncIterator, Callable, Dict, List, NamedTuple, Optional, Any, Tuple
 from uuid import uuid4
 
 import httpx
 from pydantic import BaseModel, ValidationError
 
+from app.core.admission import AdmissionRejectedError, FairScheduler
 from app.core.config import settings
+from app.core.http_pool import pool_connection_counts
+from app.core.lease_semaphore import InMemoryLeaseSemaphore, LeaseSemaphore, create_lease_semaphore
 from app.logger import get_logger
+from app.services.chat_cache import build_chat_cache_key, get_chat_response_cache
+from app.services.chat_sessions import ChatHistory
+from app.services.intent_router import LocalAnswer, get_intent_router
+from app.services.llm_metrics import get_generation_metrics
+from app.services.model_warmup import ModelKeeper, keep_alive_param
+from app.services.ollama_backends import OllamaBackend, get_ollama_backend_pool
+from app.services.prompt_prefix import get_prompt_prefix_tracker
 
 logger = get_logger(__name__)
 
-_llm_semaphore: Optional[asyncio.Semaphore] = None
+# Admission priority classes: lower values are served first.
+LLM_PRIORITY_TRIP = 0
+LLM_PRIORITY_CHAT = 1
+LLM_PRIORITY_BACKGROUND = 2
+
+REJECT_CLUSTER_BUSY = "cluster_busy"
+
+_llm_scheduler: Optional[FairScheduler] = None
+_cluster_semaphore: Optional[LeaseSemaphore] = None
+_model_keeper: Optional[ModelKeeper] = None
+_ollama_clients: Dict[str, httpx.AsyncClient] = {}
 
 _DEFAULT_CONTEXT_KEY_WHITELIST = {
     "origin",
@@ -29,6 +51,12 @@ _DEFAULT_CONTEXT_KEY_WHITELIST = {
     "misc_total",
 }
 
+_SUMMARY_SYSTEM_PROMPT = (
+    "You condense travel-planning conversations. Merge the existing summary and the new messages into one "
+    "short factual summary (max 120 words) of the user's plans, preferences, constraints and any answers "
+    "already given. Write plain sentences, no lists, no greetings."
+)
+
 _ITINERARY_INTENT_PATTERN = re.compile(r"\b(itinerary|day\s*-?\s*wise|daywise|day\s*\d+|plan|schedule)\b")
 _SINGLE_FAMOUS_FOOD_PATTERN = re.compile(
     r"\b(one|single|just\s+one|most\s+famous|famous)\b.*\b(dish|food|meal)\b|\b(dish|food|meal)\b.*\b(one|single|just\s+one|most\s+famous|famous)\b"
@@ -41,6 +69,51 @@ _CASUAL_MESSAGE_PATTERN = re.compile(
 )
 
 
+# Trip-length phrasing only ("5-day", "5 days in Rome", "for 5 days"), not "I fly out in 2 days".
+_REQUESTED_DAYS_PATTERN = re.compile(
+    r"\b(\d{1,2})\s*-\s*days?\b"
+    r"|\b(\d{1,2})\s*days?\s+(?:in|at|around|across|of|trip|itinerary|plan|stay|holiday|vacation|tour|visit)\b"
+    r"|\b(?:for|spend|spending)\s+(\d{1,2})\s*days?\b"
+)
+_REQUESTED_NIGHTS_PATTERN = re.compile(r"\b(\d{1,2})\s*-?\s*nights?\b")
+_REQUESTED_WEEKS_PATTERN = re.compile(r"\b(\d{1,2}|a|one|two|three|four)\s*-?\s*weeks?\b")
+_WEEK_COUNTS = {"a": 1, "one": 1, "two": 2, "three": 3, "four": 4}
+_MENTIONED_DAY_PATTERN = re.compile(r"\bday\s*(\d{1,2})\b")
+_MAX_PLANNED_DAYS = 30
+# Itineraries with no day count in the question or trip context are budgeted for this many days.
+_DEFAULT_ITINERARY_DAYS = 3
+
+INTENT_CASUAL = "casual"
+INTENT_SINGLE_DISH = "single_dish"
+INTENT_ITINERARY = "itinerary"
+INTENT_GENERAL = "general"
+INTENT_SUMMARY = "summary"
+
+# Output budgets for intents whose answer length is fixed by the style rule.
+_INTENT_MAX_TOKENS = {INTENT_CASUAL: 40, INTENT_SINGLE_DISH: 80}
+# Single-dish answers are often "**Dish**" and a blank line before the sentence, so only num_predict caps them.
+_INTENT_STOP_SEQUENCES: Dict[str, Tuple[str, ...]] = {INTENT_CASUAL: ("\n",)}
+
+
+class GenerationBudget(NamedTuple):
+    """Ollama generation options planned from the request intent."""
+
+    intent: str
+    num_predict: int
+    num_ctx: int
+    stop: Tuple[str, ...]
+
+    def options(self) -> Dict[str, Any]:
+        options: Dict[str, Any] = {"num_predict": self.num_predict, "num_ctx": self.num_ctx, "temperature": 0.3}
+        if self.stop:
+            options["stop"] = list(self.stop)
+        return options
+
+
+class FallbackReply(str):
+    """Canned reply used when the model could not be reached."""
+
+
 class OllamaMessage(BaseModel):
     content: str
 
@@ -49,12 +122,101 @@ class OllamaChatResponse(BaseModel):
     message: OllamaMessage
 
 
-def _get_llm_semaphore() -> asyncio.Semaphore:
-    global _llm_semaphore
-    if _llm_semaphore is None:
-        max_concurrency = max(1, int(getattr(settings, "llm_max_concurrent_requests", 2)))
-        _llm_semaphore = asyncio.Semaphore(max_concurrency)
-    return _llm_semaphore
+def get_llm_scheduler() -> FairScheduler:
+    global _llm_scheduler
+    if _llm_scheduler is None:
+        _llm_scheduler = FairScheduler(
+            slots=max(1, int(getattr(settings, "llm_max_concurrent_requests", 2))),
+            max_queue_depth=settings.llm_queue_max_depth,
+            max_queued_per_key=settings.llm_queue_max_per_user,
+            max_wait_seconds=max(1, int(getattr(settings, "llm_queue_wait_timeout_seconds", 20))),
+            initial_service_seconds=settings.llm_queue_initial_service_seconds,
+        )
+    return _llm_scheduler
+
+
+def get_cluster_semaphore() -> LeaseSemaphore:
+    global _cluster_semaphore
+    if _cluster_semaphore is None:
+        try:
+            _cluster_semaphore = create_lease_semaphore(
+                backend=settings.llm_cluster_limit_backend,
+                redis_url=settings.redis_url,
+                redis_key_prefix=settings.redis_llm_semaphore_prefix,
+                lease_seconds=settings.llm_cluster_lease_seconds,
+                redis_connect_timeout_seconds=settings.redis_connect_timeout_seconds,
+                redis_socket_timeout_seconds=settings.redis_socket_timeout_seconds,
+            )
+        except Exception as exc:
+            logger.warning(
+                "Failed to initialize LLM cluster limit backend '%s': %s. Using a process-local limit.",
+                settings.llm_cluster_limit_backend,
+                str(exc),
+            )
+            _cluster_semaphore = InMemoryLeaseSemaphore()
+    return _cluster_semaphore
+
+
+async def close_cluster_semaphore() -> None:
+    global _cluster_semaphore
+    semaphore = _cluster_semaphore
+    _cluster_semaphore = None
+    if semaphore is not None:
+        await semaphore.close()
+
+
+def get_model_keeper() -> ModelKeeper:
+    global _model_keeper
+    if _model_keeper is None:
+        _model_keeper = ModelKeeper.from_settings(get_ollama_backend_pool(), get_ollama_client)
+    return _model_keeper
+
+
+async def close_model_keeper() -> None:
+    global _model_keeper
+    keeper = _model_keeper
+    _model_keeper = None
+    if keeper is not None:
+        await keeper.close()
+
+
+def _cluster_limit(base_url: str) -> int:
+    limit = settings.llm_cluster_backend_limits.get(base_url.lower(), settings.llm_cluster_max_concurrent_requests)
+    return max(1, int(limit))
+
+
+def get_ollama_client(base_url: Optional[str] = None) -> httpx.AsyncClient:
+    """Return the long-lived keep-alive client for an Ollama backend, creating it on first use."""
+    key = (base_url or settings.ollama_base_url).rstrip("/")
+    client = _ollama_clients.get(key)
+    if client is None:
+        slots = max(1, int(getattr(settings, "llm_max_concurrent_requests", 2)))
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.llm_timeout_seconds),
+            limits=httpx.Limits(
+                # One connection per generation slot, plus headroom for health probes.
+                max_connections=slots + 2,
+                max_keepalive_connections=slots + 1,
+                keepalive_expiry=settings.llm_http_keepalive_expiry_seconds,
+            ),
+        )
+        _ollama_clients[key] = client
+    return client
+
+
+async def close_llm_clients() -> None:
+    clients = list(_ollama_clients.values())
+    _ollama_clients.clear()
+    for client in clients:
+        await client.aclose()
+
+
+def llm_client_stats() -> Dict[str, Any]:
+    stats: Dict[str, Any] = {}
+    for base_url, client in _ollama_clients.items():
+        open_connections, idle_connections = pool_connection_counts(client)
+        stats[base_url] = {"open_connections": open_connections, "idle_connections": idle_connections}
+    return stats
 
 
 def _is_retryable_http_status(status_code: int) -> bool:
@@ -100,22 +262,102 @@ def _sanitize_context(context: Optional[Dict[str, str]]) -> Optional[Dict[str, s
     return sanitized or None
 
 
-async def _request_ollama_chat(endpoint: str, body: Dict[str, Any], timeout: httpx.Timeout) -> Dict[str, Any]:
+def _is_backend_failure(exc: BaseException) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        status_code = exc.response.status_code if exc.response is not None else 0
+        return _is_retryable_http_status(status_code)
+    return isinstance(exc, httpx.RequestError)
+
+
+@asynccontextmanager
+async def _ollama_backend(
+    request_id: str,
+    tried: set,
+    prefix_key: Optional[str] = None,
+) -> AsyncIterator[OllamaBackend]:
+    """Route one attempt to the least loaded backend not yet tried, holding its cluster lease."""
+    pool = get_ollama_backend_pool()
+    pool.ensure_health_checks(get_ollama_client)
+    backend = pool.pick(exclude=tried, affinity_key=_affinity_key(prefix_key))
+    tried.add(backend.base_url)
+    lease = await _acquire_cluster_slot(request_id, backend.base_url)
+    pool.begin(backend)
+    try:
+        yield backend
+    except BaseException as exc:
+        if _is_backend_failure(exc):
+            pool.record_failure(backend, exc)
+        raise
+    else:
+        pool.record_success(backend)
+    finally:
+        pool.end(backend)
+        if lease is not None:
+            await get_cluster_semaphore().release(backend.base_url, lease)
+
+
+def _affinity_key(prefix_key: Optional[str]) -> Optional[str]:
+    return f"{settings.ollama_model}|{prefix_key}" if prefix_key else None
+
+
+def _record_prompt_eval(
+    request_id: str,
+    prefix_key: Optional[str],
+    backend_url: str,
+    body: Dict[str, Any],
+    payload: Dict[str, Any],
+) -> None:
+    """Log prompt-eval time Ollama saved by reusing the cached prefix of an earlier request."""
+    if not prefix_key:
+        return
+    prompt_chars = sum(len(message.get("content", "")) for message in body.get("messages", []))
+    saved = get_prompt_prefix_tracker().record(_affinity_key(prefix_key), backend_url, prompt_chars, payload)
+    if saved is not None and saved[0]:
+        logger.info(
+            "Prompt prefix reused",
+            extra={
+                "request_id": request_id,
+                "provider": "ollama",
+                "model": settings.ollama_model,
+                "backend": backend_url,
+                "prompt_eval_count": payload.get("prompt_eval_count"),
+                "saved_prompt_tokens": saved[0],
+                "saved_prompt_eval_ms": saved[1],
+            },
+        )
+
+
+async def _request_ollama_chat(
+    request_id: str,
+    body: Dict[str, Any],
+    timeout: httpx.Timeout,
+    prefix_key: Optional[str] = None,
+) -> Dict[str, Any]:
     retry_attempts = max(1, int(getattr(settings, "llm_retry_attempts", 2)))
     last_exception: Optional[Exception] = None
+    tried: set = set()
 
     for attempt in range(1, retry_attempts + 1):
+        backend_url = ""
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.post(endpoint, json=body)
+            async with _ollama_backend(request_id, tried, prefix_key) as backend:
+                backend_url = backend.base_url
+                response = await get_ollama_client(backend_url).post(
+                    f"{backend_url}/api/chat", json=body, timeout=timeout
+                )
                 response.raise_for_status()
-                return response.json()
+                payload = response.json()
+                if isinstance(payload, dict):
+                    get_model_keeper().record_load(payload, backend_url, "chat", request_id)
+                    _record_prompt_eval(request_id, prefix_key, backend_url, body, payload)
+                return payload
         except httpx.HTTPStatusError as exc:
             status_code = exc.response.status_code if exc.response is not None else 0
             if 400 <= status_code < 500:
                 logger.error(
-                    "Ollama returned non-retriable client error (status=%s): %s",
+                    "Ollama returned non-retriable client error (status=%s, backend=%s): %s",
                     status_code,
+                    backend_url,
                     str(exc),
                     exc_info=True,
                 )
@@ -127,8 +369,9 @@ async def _request_ollama_chat(endpoint: str, body: Dict[str, Any], timeout: htt
             if attempt < retry_attempts and _is_retryable_http_status(status_code):
                 backoff = _compute_backoff_seconds(attempt)
                 logger.warning(
-                    "Ollama server error (status=%s), retrying attempt %s/%s in %.2fs",
+                    "Ollama server error (status=%s, backend=%s), retrying attempt %s/%s in %.2fs",
                     status_code,
+                    backend_url,
                     attempt,
                     retry_attempts,
                     backoff,
@@ -141,7 +384,8 @@ async def _request_ollama_chat(endpoint: str, body: Dict[str, Any], timeout: htt
             if attempt < retry_attempts:
                 backoff = _compute_backoff_seconds(attempt)
                 logger.warning(
-                    "Ollama transient transport error, retrying attempt %s/%s in %.2fs: %s",
+                    "Ollama transient transport error (backend=%s), retrying attempt %s/%s in %.2fs: %s",
+                    backend_url,
                     attempt,
                     retry_attempts,
                     backoff,
@@ -158,7 +402,11 @@ async def _request_ollama_chat(endpoint: str, body: Dict[str, Any], timeout: htt
     raise RuntimeError("Ollama request failed without a specific exception")
 
 
-def _fallback_reply(context: Optional[Dict[str, str]] = None) -> str:
+def _fallback_reply(context: Optional[Dict[str, str]] = None) -> FallbackReply:
+    return FallbackReply(_fallback_text(context))
+
+
+def _fallback_text(context: Optional[Dict[str, str]] = None) -> str:
     destination = ""
     days = ""
 
@@ -187,27 +435,35 @@ def _fallback_reply(context: Optional[Dict[str, str]] = None) -> str:
     )
 
 
-def _build_response_style_instruction(message: str) -> str:
+def _detect_intent(message: str) -> str:
     normalized_message = message.strip().lower()
-
     if bool(_CASUAL_MESSAGE_PATTERN.match(normalized_message)):
+        return INTENT_CASUAL
+    if bool(_ITINERARY_INTENT_PATTERN.search(normalized_message)):
+        return INTENT_ITINERARY
+    if bool(_SINGLE_FAMOUS_FOOD_PATTERN.search(normalized_message)):
+        return INTENT_SINGLE_DISH
+    return INTENT_GENERAL
+
+
+def _build_response_style_instruction(message: str) -> str:
+    intent = _detect_intent(message)
+
+    if intent == INTENT_CASUAL:
         return (
             "Response style rule: The user sent a casual social message. "
             "Reply in one short, friendly sentence only (max 12 words). "
             "Do not provide travel advice, tips, lists, or itineraries."
         )
 
-    asks_for_itinerary = bool(_ITINERARY_INTENT_PATTERN.search(normalized_message))
-    asks_single_famous_food = bool(_SINGLE_FAMOUS_FOOD_PATTERN.search(normalized_message))
-
-    if asks_single_famous_food and not asks_for_itinerary:
+    if intent == INTENT_SINGLE_DISH:
         return (
             "Response style rule: User asked for one famous dish. "
             "Return exactly one dish name and one short sentence (max 20 words) about why it is famous. "
             "Do not provide a list, tips list, day-wise plan, or itinerary."
         )
 
-    if not asks_for_itinerary:
+    if intent == INTENT_GENERAL:
         return (
             "Response style rule: Do not provide day-wise itinerary unless the user explicitly asks for itinerary or day-wise planning."
         )
@@ -215,25 +471,82 @@ def _build_response_style_instruction(message: str) -> str:
     return ""
 
 
-def _build_user_content(message: str, context: Optional[Dict[str, str]] = None) -> str:
-    style_instruction = _build_response_style_instruction(message)
+def _requested_days(message: str, context: Optional[Dict[str, str]] = None) -> Optional[int]:
+    """Trip length asked for in the message ("5-day trip", "2 nights", "two weeks"), else the trip's ``days``."""
+    normalized_message = message.lower()
+    days: Optional[int] = None
+    match = _REQUESTED_DAYS_PATTERN.search(normalized_message)
+    if match:
+        days = int(next(group for group in match.groups() if group))
+    else:
+        match = _REQUESTED_NIGHTS_PATTERN.search(normalized_message)
+        if match:
+            days = int(match.group(1)) + 1
+        else:
+            match = _REQUESTED_WEEKS_PATTERN.search(normalized_message)
+            if match:
+                weeks = match.group(1)
+                days = 7 * (int(weeks) if weeks.isdigit() else _WEEK_COUNTS[weeks])
+    if days is None and context:
+        try:
+            days = int(str(context.get("days", "")).strip())
+        except ValueError:
+            days = None
+    if days is None or days < 1:
+        return None
+    return min(days, _MAX_PLANNED_DAYS)
+
+
+def _mentioned_days(message: str) -> List[int]:
+    """Day numbers the message refers to ("day 4")."""
+    return [int(number) for number in _MENTIONED_DAY_PATTERN.findall(message.lower())]
+
+
+def _plan_generation_budget(message: str, context: Optional[Dict[str, str]]) -> GenerationBudget:
+    """Output length and stop sequences for the intent of ``message``.
+
+    Short answers get a small ``num_predict`` (casual replies also stop at
+    the first line break), so they finish fast; itineraries get a budget that grows with the
+    number of requested days, and stop before a day past the last one unless
+    the message itself asks about such a day. ``num_ctx`` is always
+    ``LLM_NUM_CTX``: Ollama reloads the model, dropping its prompt cache,
+    whenever a request asks for a different window.
+    """
+    intent = _detect_intent(message)
+    days: Optional[int] = None
+    stop = _INTENT_STOP_SEQUENCES.get(intent, ())
+    if intent == INTENT_ITINERARY:
+        days = _requested_days(message, context)
+        planned_days = days or _DEFAULT_ITINERARY_DAYS
+        num_predict = min(
+            settings.llm_itinerary_base_tokens + settings.llm_itinerary_tokens_per_day * planned_days,
+            settings.llm_itinerary_max_tokens,
+        )
+        num_predict = max(num_predict, settings.llm_max_tokens)
+        if days is not None and all(day <= days for day in _mentioned_days(message)):
+            stop = (f"Day {days + 1}",)
+    else:
+        num_predict = min(_INTENT_MAX_TOKENS.get(intent, settings.llm_max_tokens), settings.llm_max_tokens)
+
+    return GenerationBudget(
+        intent=intent,
+        num_predict=num_predict,
+        num_ctx=settings.llm_num_ctx,
+        stop=stop,
+    )
 
-    # Casual messages (thanks, ok, cool, bye…) — skip context injection entirely
-    if bool(_CASUAL_MESSAGE_PATTERN.match(message.strip().lower())):
-        return "\n\n".join([style_instruction, f"User message: {message}"])
 
-    if not context:
-        if not style_instruction:
-            return message
-        return "\n\n".join([style_instruction, f"User question: {message}"])
+def _prompt_context(message: str, context: Optional[Dict[str, str]] = None) -> Optional[Dict[str, str]]:
+    """Context fields worth sending with ``message``, or None."""
+    # Casual messages (thanks, ok, cool, bye…) — skip context injection entirely
+    if not context or bool(_CASUAL_MESSAGE_PATTERN.match(message.strip().lower())):
+        return None
 
     safe_context = {k: v for k, v in context.items() if isinstance(v, str) and v.strip()}
     if not safe_context:
-        if not style_instruction:
-            return message
-        return "\n\n".join([style_instruction, f"User question: {message}"])
+        return None
 
-    if "one famous dish" in style_instruction.lower():
+    if "one famous dish" in _build_response_style_instruction(message).lower():
         reduced_context: Dict[str, str] = {}
         for key in ("destination", "origin", "budget"):
             value = safe_context.get(key)
@@ -242,17 +555,60 @@ def _build_user_content(message: str, context: Optional[Dict[str, str]] = None)
         if reduced_context:
             safe_context = reduced_context
 
+    return safe_context
+
+
+def _build_context_content(context: Dict[str, str]) -> str:
     lines = ["User trip context:"]
-    for key, value in safe_context.items():
+    for key, value in context.items():
         lines.append(f"- {key}: {value}")
-    if style_instruction:
-        lines.append("")
-        lines.append(style_instruction)
-    lines.append("")
-    lines.append(f"User question: {message}")
     return "\n".join(lines)
 
 
+def _build_user_content(message: str, context: Optional[Dict[str, str]] = None) -> str:
+    style_instruction = _build_response_style_instruction(message)
+
+    if bool(_CASUAL_MESSAGE_PATTERN.match(message.strip().lower())):
+        return "\n\n".join([style_instruction, f"User message: {message}"])
+
+    if not style_instruction and not _prompt_context(message, context):
+        return message
+    return "\n\n".join(part for part in (style_instruction, f"User question: {message}") if part)
+
+
+def _generation_log_fields(message: str, body: Dict[str, Any], payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Planned budget next to the tokens actually generated, for tuning budgets per intent."""
+    options = body.get("options", {})
+    return {
+        "intent": _detect_intent(message),
+        "num_predict": options.get("num_predict"),
+        "num_ctx": options.get("num_ctx"),
+        "prompt_eval_count": payload.get("prompt_eval_count"),
+        "eval_count": payload.get("eval_count"),
+        "truncated": payload.get("done_reason") == "length",
+    }
+
+
+def _record_generation_metrics(
+    intent: str,
+    endpoint: str,
+    payload: Dict[str, Any],
+    queue_wait_ms: float,
+    elapsed_ms: float,
+    ttft_ms: Optional[float] = None,
+) -> None:
+    """Add one finished generation to the per (model, intent, endpoint) timing histograms."""
+    get_generation_metrics().record(
+        settings.ollama_model,
+        intent,
+        endpoint,
+        payload if isinstance(payload, dict) else {},
+        queue_wait_ms=queue_wait_ms,
+        end_to_end_ms=round(queue_wait_ms + elapsed_ms, 2),
+        ttft_ms=round(queue_wait_ms + ttft_ms, 2) if ttft_ms is not None else None,
+    )
+
+
 def _extract_ollama_reply(payload: Dict[str, Any]) -> str:
     try:
         parsed = OllamaChatResponse.model_validate(payload)
@@ -261,28 +617,72 @@ def _extract_ollama_reply(payload: Dict[str, Any]) -> str:
     return parsed.message.content.strip()
 
 
-async def _generate_ollama_reply(request_id: str, message: str, context: Optional[Dict[str, str]] = None) -> str:
+def _build_history_messages(history: Optional[ChatHistory]) -> List[Dict[str, str]]:
+    if history is None:
+        return []
+    messages: List[Dict[str, str]] = []
+    if history.summary:
+        messages.append({"role": "system", "content": f"Summary of the earlier conversation: {history.summary}"})
+    messages.extend(history.turns)
+    return messages
+
+
+def _with_keep_alive(body: Dict[str, Any]) -> Dict[str, Any]:
+    keep_alive = keep_alive_param()
+    if keep_alive is not None:
+        body["keep_alive"] = keep_alive
+    return body
+
+
+def _build_ollama_body(
+    message: str,
+    context: Optional[Dict[str, str]],
+    stream: bool,
+    history: Optional[ChatHistory] = None,
+) -> Dict[str, Any]:
+    """Chat body laid out prefix-first: system prompt, trip context, history, then the question.
+
+    Everything before the question is identical across follow-ups on the same
+    trip, so Ollama can reuse its evaluated prompt cache instead of
+    re-evaluating the prefix. Generation options come from the budget planned
+    for the message's intent.
+    """
+    prompt_context = _prompt_context(message, context)
+    context_messages = (
+        [{"role": "system", "content": _build_context_content(prompt_context)}] if prompt_context else []
+    )
+    messages = [
+        {"role": "system", "content": settings.llm_system_prompt},
+        *context_messages,
+        *_build_history_messages(history),
+        {"role": "user", "content": _build_user_content(message, context)},
+    ]
+    return _with_keep_alive({
+        "model": settings.ollama_model,
+        "messages": messages,
+        "stream": stream,
+        "options": _plan_generation_budget(message, context).options(),
+    })
+
+
+async def _generate_ollama_reply(
+    request_id: str,
+    message: str,
+    context: Optional[Dict[str, str]] = None,
+    history: Optional[ChatHistory] = None,
+    prefix_key: Optional[str] = None,
+    timeout_seconds: Optional[float] = None,
+    endpoint: str = "chat",
+    queue_wait_ms: float = 0.0,
+) -> str:
     started_at = perf_counter()
     provider = "ollama"
-    user_content = _build_user_content(message, context)
-    endpoint = f"{settings.ollama_base_url.rstrip('/')}/api/chat"
-    body = {
-        "model": settings.ollama_model,
-        "messages": [
-            {"role": "system", "content": settings.llm_system_prompt},
-            {"role": "user", "content": user_content},
-        ],
-        "stream": False,
-        "options": {
-            "num_predict": settings.llm_max_tokens,
-            "temperature": 0.3,
-        },
-    }
+    body = _build_ollama_body(message, context, stream=False, history=history)
 
-    timeout = httpx.Timeout(settings.llm_timeout_seconds)
+    timeout = httpx.Timeout(timeout_seconds or settings.llm_timeout_seconds)
 
     try:
-        payload = await _request_ollama_chat(endpoint, body, timeout)
+        payload = await _request_ollama_chat(request_id, body, timeout, prefix_key)
     except httpx.TimeoutException as exc:
         elapsed_ms = round((perf_counter() - started_at) * 1000, 2)
         logger.warning(
@@ -402,29 +802,194 @@ async def _generate_ollama_reply(request_id: str, message: str, context: Optiona
             "provider": provider,
             "model": settings.ollama_model,
             "elapsed_ms": elapsed_ms,
+            **_generation_log_fields(message, body, payload),
         },
     )
+    _record_generation_metrics(_detect_intent(message), endpoint, payload, queue_wait_ms, elapsed_ms)
 
     return reply
 
 
+def _parse_stream_line(line: str) -> Tuple[str, bool, Dict[str, Any]]:
+    """Return (content delta, done flag, raw chunk) for one NDJSON line of an Ollama chat stream."""
+    if not line.strip():
+        return "", False, {}
+    try:
+        payload = json.loads(line)
+    except ValueError as exc:
+        raise ValueError("Failed to parse Ollama stream chunk") from exc
+    if not isinstance(payload, dict):
+        raise ValueError("Failed to parse Ollama stream chunk")
+    if payload.get("error"):
+        raise ValueError(f"Ollama stream error: {payload['error']}")
+    message = payload.get("message")
+    content = message.get("content", "") if isinstance(message, dict) else ""
+    return content if isinstance(content, str) else "", bool(payload.get("done")), payload
+
+
+async def _stream_ollama_reply(
+    request_id: str,
+    message: str,
+    context: Optional[Dict[str, str]] = None,
+    history: Optional[ChatHistory] = None,
+    prefix_key: Optional[str] = None,
+    endpoint: str = "chat",
+    queue_wait_ms: float = 0.0,
+) -> AsyncIterator[str]:
+    """Yield reply text deltas from Ollama's streaming chat API.
+
+    Failures before the first token are retried like the non-streaming path
+    and end in the fallback reply; once tokens were sent, a failure raises
+    RuntimeError because the partial answer cannot be retracted.
+    """
+    started_at = perf_counter()
+    provider = "ollama"
+    body = _build_ollama_body(message, context, stream=True, history=history)
+    timeout = httpx.Timeout(settings.llm_timeout_seconds)
+    retry_attempts = max(1, int(getattr(settings, "llm_retry_attempts", 2)))
+    first_token_ms: Optional[float] = None
+    chunks = 0
+    final_payload: Dict[str, Any] = {}
+    tried: set = set()
+
+    for attempt in range(1, retry_attempts + 1):
+        error_code = ""
+        retryable = True
+        backend_url = ""
+        try:
+            async with _ollama_backend(request_id, tried, prefix_key) as backend:
+                backend_url = backend.base_url
+                async with get_ollama_client(backend_url).stream(
+                    "POST", f"{backend_url}/api/chat", json=body, timeout=timeout
+                ) as response:
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        content, done, payload = _parse_stream_line(line)
+                        if first_token_ms is None:
+                            content = content.lstrip()
+                        if content:
+                            if first_token_ms is None:
+                                first_token_ms = round((perf_counter() - started_at) * 1000, 2)
+                                logger.info(
+                                    "LLM stream first token",
+                                    extra={
+                                        "request_id": request_id,
+                                        "provider": provider,
+                                        "model": settings.ollama_model,
+                                        "backend": backend_url,
+                                        "ttft_ms": first_token_ms,
+                                    },
+                                )
+                            chunks += 1
+                            yield content
+                        if done:
+                            # The final chunk carries the timings, including model load time.
+                            final_payload = payload
+                            get_model_keeper().record_load(payload, backend_url, "stream", request_id)
+                            _record_prompt_eval(request_id, prefix_key, backend_url, body, payload)
+                            break
+            break
+        except httpx.HTTPStatusError as exc:
+            status_code = exc.response.status_code if exc.response is not None else 0
+            if 400 <= status_code < 500:
+                logger.error(
+                    "Ollama returned non-retriable client error",
+                    extra={
+                        "request_id": request_id,
+                        "provider": provider,
+                        "model": settings.ollama_model,
+                        "status_code": status_code,
+                        "error_code": "LLM_CLIENT_ERROR",
+                        "error": str(exc),
+                    },
+                )
+                raise RuntimeError(
+                    f"LLM provider rejected the request (status={status_code})."
+                ) from exc
+            error_code, error = "LLM_SERVER_ERROR", exc
+        except httpx.TimeoutException as exc:
+            error_code, error = "LLM_TIMEOUT", exc
+        except httpx.ConnectError as exc:
+            error_code, error = "LLM_CONNECT_ERROR", exc
+        except httpx.RequestError as exc:
+            error_code, error = "LLM_TRANSPORT_ERROR", exc
+        except ValueError as exc:
+            error_code, error, retryable = "LLM_RESPONSE_PARSE_ERROR", exc, False
+
+        elapsed_ms = round((perf_counter() - started_at) * 1000, 2)
+        log_extra = {
+            "request_id": request_id,
+            "provider": provider,
+            "model": settings.ollama_model,
+            "backend": backend_url,
+            "error_code": error_code,
+            "elapsed_ms": elapsed_ms,
+            "error": str(error),
+        }
+        if first_token_ms is not None:
+            logger.warning("Ollama stream interrupted after first token", extra={**log_extra, "chunks": chunks})
+            raise RuntimeError("LLM response stream was interrupted.") from error
+        if retryable and attempt < retry_attempts:
+            backoff = _compute_backoff_seconds(attempt)
+            logger.warning(
+                "Ollama stream error before first token, retrying attempt %s/%s in %.2fs",
+                attempt,
+                retry_attempts,
+                backoff,
+                extra=log_extra,
+            )
+            await asyncio.sleep(backoff)
+            continue
+        logger.warning("Ollama stream failed, using fallback reply", extra=log_extra)
+        yield _fallback_reply(context)
+        return
+
+    elapsed_ms = round((perf_counter() - started_at) * 1000, 2)
+    if first_token_ms is None:
+        logger.warning(
+            "Ollama stream missing content, using fallback reply",
+            extra={
+                "request_id": request_id,
+                "provider": provider,
+                "model": settings.ollama_model,
+                "error_code": "LLM_EMPTY_RESPONSE",
+                "elapsed_ms": elapsed_ms,
+            },
+        )
+        yield _fallback_reply(context)
+        return
+
+    logger.info(
+        "LLM stream completed",
+        extra={
+            "request_id": request_id,
+            "provider": provider,
+            "model": settings.ollama_model,
+            "ttft_ms": first_token_ms,
+            "elapsed_ms": elapsed_ms,
+            "chunks": chunks,
+            **_generation_log_fields(message, body, final_payload),
+        },
+    )
+    _record_generation_metrics(
+        _detect_intent(message), endpoint, final_payload, queue_wait_ms, elapsed_ms, ttft_ms=first_token_ms
+    )
+
+
 def _get_provider_registry() -> Dict[str, Any]:
     return {
         "ollama": _generate_ollama_reply,
     }
 
 
-async def generate_chat_reply(message: str, context: Optional[Dict[str, str]] = None) -> str:
-    """Generate chatbot reply from configured LLM provider."""
-    request_id = str(uuid4())
-    started_at = perf_counter()
-    provider = settings.llm_provider.strip().lower()
-    safe_message = _sanitize_message(message)
-    safe_context = _sanitize_context(context)
+def _get_stream_provider_registry() -> Dict[str, Any]:
+    return {
+        "ollama": _stream_ollama_reply,
+    }
 
-    provider_registry = _get_provider_registry()
-    provider_handler = provider_registry.get(provider)
 
+def _resolve_provider_handler(request_id: str, started_at: float, registry: Dict[str, Any]) -> Callable:
+    provider_handler = registry.get(settings.llm_provider.strip().lower())
     if provider_handler is None:
         elapsed_ms = round((perf_counter() - started_at) * 1000, 2)
         logger.error(
@@ -436,29 +1001,281 @@ async def generate_chat_reply(message: str, context: Optional[Dict[str, str]] =
                 "elapsed_ms": elapsed_ms,
             },
         )
-        supported_providers = ", ".join(sorted(provider_registry.keys()))
+        supported_providers = ", ".join(sorted(registry.keys()))
         raise RuntimeError(
             f"Unsupported LLM provider '{settings.llm_provider}'. Supported providers: {supported_providers}."
         )
+    return provider_handler
 
-    semaphore = _get_llm_semaphore()
-    queue_timeout = max(1, int(getattr(settings, "llm_queue_wait_timeout_seconds", 20)))
 
+async def _acquire_llm_slot(request_id: str, user_key: str, priority: int) -> FairScheduler:
+    scheduler = get_llm_scheduler()
     try:
-        await asyncio.wait_for(semaphore.acquire(), timeout=queue_timeout)
-    except TimeoutError as exc:
+        await scheduler.acquire(user_key, priority)
+    except AdmissionRejectedError as exc:
         logger.warning(
-            "LLM queue wait timeout",
+            "LLM request rejected by admission queue",
             extra={
                 "request_id": request_id,
-                "provider": provider,
-                "error_code": "LLM_QUEUE_TIMEOUT",
+                "provider": settings.llm_provider.strip().lower(),
+                "error_code": "LLM_QUEUE_REJECTED",
+                "reason": exc.reason,
+                "priority": priority,
+                "queue_depth": scheduler.queue_depth,
+                "retry_after_seconds": round(exc.retry_after, 2),
+            },
+        )
+        raise
+    return scheduler
+
+
+async def _acquire_cluster_slot(request_id: str, base_url: str) -> Optional[str]:
+    if not settings.llm_cluster_limit_enabled:
+        return None
+
+    limit = _cluster_limit(base_url)
+    queue_timeout = max(1, int(getattr(settings, "llm_queue_wait_timeout_seconds", 20)))
+    token = await get_cluster_semaphore().acquire(base_url, limit, queue_timeout)
+    if token is None:
+        retry_after = get_llm_scheduler().service_seconds
+        logger.warning(
+            "LLM cluster concurrency limit reached",
+            extra={
+                "request_id": request_id,
+                "provider": settings.llm_provider.strip().lower(),
+                "error_code": "LLM_CLUSTER_BUSY",
+                "backend": base_url,
+                "cluster_limit": limit,
                 "queue_timeout_seconds": queue_timeout,
             },
         )
-        raise RuntimeError("LLM service is busy. Please retry in a few seconds.") from exc
+        raise AdmissionRejectedError(REJECT_CLUSTER_BUSY, retry_after=retry_after)
+    return token
+
 
+@asynccontextmanager
+async def _llm_slot(request_id: str, user_key: str, priority: int) -> AsyncIterator[float]:
+    """Hold a local scheduler slot, yielding the milliseconds spent queueing for it.
+
+    Cluster-wide leases are taken per backend attempt.
+    """
+    queued_at = perf_counter()
+    scheduler = await _acquire_llm_slot(request_id, user_key, priority)
+    slot_started_at = perf_counter()
     try:
-        return await provider_handler(request_id=request_id, message=safe_message, context=safe_context)
+        yield round((slot_started_at - queued_at) * 1000, 2)
     finally:
-        semaphore.release()
+        scheduler.release(perf_counter() - slot_started_at)
+
+
+def _route_locally(request_id: str, message: str, context: Optional[Dict[str, str]]) -> Optional[LocalAnswer]:
+    if not settings.llm_fast_path_enabled:
+        return None
+    answer = get_intent_router().route(message, context)
+    if answer is not None:
+        logger.info(
+            "LLM request answered locally",
+            extra={"request_id": request_id, "intent": answer.intent},
+        )
+    return answer
+
+
+def _chat_cache_key(
+    message: str,
+    context: Optional[Dict[str, str]],
+    history: Optional[ChatHistory] = None,
+) -> Optional[str]:
+    if not settings.chat_cache_enabled:
+        return None
+    return build_chat_cache_key(_build_ollama_body(message, context, stream=False, history=history))
+
+
+def _provider_known_down(request_id: str, started_at: float) -> bool:
+    """Whether the health snapshot says no Ollama backend can serve, so the request should not wait for one."""
+    if settings.llm_provider.strip().lower() != "ollama" or not get_ollama_backend_pool().provider_down():
+        return False
+    logger.warning(
+        "LLM provider known to be down, using fallback reply",
+        extra={
+            "request_id": request_id,
+            "provider": "ollama",
+            "model": settings.ollama_model,
+            "error_code": "LLM_PROVIDER_DOWN",
+            "elapsed_ms": round((perf_counter() - started_at) * 1000, 2),
+        },
+    )
+    return True
+
+
+def _log_cache_hit(request_id: str, started_at: float) -> None:
+    logger.info(
+        "LLM response served from cache",
+        extra={
+            "request_id": request_id,
+            "provider": settings.llm_provider.strip().lower(),
+            "model": settings.ollama_model,
+            "elapsed_ms": round((perf_counter() - started_at) * 1000, 2),
+        },
+    )
+
+
+async def generate_chat_reply(
+    message: str,
+    context: Optional[Dict[str, str]] = None,
+    user_key: str = "anonymous",
+    priority: int = LLM_PRIORITY_CHAT,
+    history: Optional[ChatHistory] = None,
+    prefix_key: Optional[str] = None,
+    timeout_seconds: Optional[float] = None,
+    endpoint: str = "chat",
+) -> str:
+    """Generate chatbot reply from configured LLM provider.
+
+    Messages the local intent router can answer (thanks, bye, ...) are
+    replied to from templates without queueing. ``history`` carries earlier
+    turns of a server-side chat session, and ``prefix_key`` (a saved trip or
+    session) routes follow-ups to the backend that already evaluated the
+    shared prompt prefix. ``timeout_seconds`` overrides
+    ``LLM_TIMEOUT_SECONDS`` for background jobs, and ``endpoint`` labels
+    the request's timing metrics. Otherwise ``user_key`` and ``priority``
+    place the request in the fair admission queue; AdmissionRejectedError is
+    raised when it cannot get a slot in time.
+    """
+    request_id = str(uuid4())
+    started_at = perf_counter()
+    safe_message = _sanitize_message(message)
+    safe_context = _sanitize_context(context)
+
+    local_answer = _route_locally(request_id, safe_message, safe_context)
+    if local_answer is not None:
+        return local_answer.reply
+
+    provider_handler = _resolve_provider_handler(request_id, started_at, _get_provider_registry())
+    cache_key = _chat_cache_key(safe_message, safe_context, history)
+    if cache_key is not None:
+        cached = await get_chat_response_cache().get(cache_key)
+        if cached is not None:
+            _log_cache_hit(request_id, started_at)
+            return cached
+
+    if _provider_known_down(request_id, started_at):
+        return _fallback_reply(safe_context)
+
+    async with _llm_slot(request_id, user_key, priority) as queue_wait_ms:
+        reply = await provider_handler(
+            request_id=request_id,
+            message=safe_message,
+            context=safe_context,
+            history=history,
+            prefix_key=prefix_key,
+            timeout_seconds=timeout_seconds,
+            endpoint=endpoint,
+            queue_wait_ms=queue_wait_ms,
+        )
+
+    if cache_key is not None and not isinstance(reply, FallbackReply):
+        await get_chat_response_cache().set(cache_key, reply)
+    return reply
+
+
+async def stream_chat_reply(
+    message: str,
+    context: Optional[Dict[str, str]] = None,
+    user_key: str = "anonymous",
+    priority: int = LLM_PRIORITY_CHAT,
+    history: Optional[ChatHistory] = None,
+    prefix_key: Optional[str] = None,
+    endpoint: str = "chat_stream",
+) -> AsyncIterator[str]:
+    """Stream a chatbot reply from the configured LLM provider as text deltas.
+
+    The LLM slot is held until the stream is exhausted or closed. A fallback
+    reply arrives as a single ``FallbackReply`` chunk.
+    """
+    request_id = str(uuid4())
+    started_at = perf_counter()
+    safe_message = _sanitize_message(message)
+    safe_context = _sanitize_context(context)
+
+    local_answer = _route_locally(request_id, safe_message, safe_context)
+    if local_answer is not None:
+        yield local_answer.reply
+        return
+
+    provider_handler = _resolve_provider_handler(request_id, started_at, _get_stream_provider_registry())
+    cache_key = _chat_cache_key(safe_message, safe_context, history)
+    if cache_key is not None:
+        cached = await get_chat_response_cache().get(cache_key)
+        if cached is not None:
+            _log_cache_hit(request_id, started_at)
+            yield cached
+            return
+
+    if _provider_known_down(request_id, started_at):
+        yield _fallback_reply(safe_context)
+        return
+
+    parts = []
+    cacheable = True
+
+    async with _llm_slot(request_id, user_key, priority) as queue_wait_ms:
+        async for chunk in provider_handler(
+            request_id=request_id,
+            message=safe_message,
+            context=safe_context,
+            history=history,
+            prefix_key=prefix_key,
+            endpoint=endpoint,
+            queue_wait_ms=queue_wait_ms,
+        ):
+            cacheable = cacheable and not isinstance(chunk, FallbackReply)
+            parts.append(chunk)
+            yield chunk
+
+    if cache_key is not None and cacheable:
+        await get_chat_response_cache().set(cache_key, "".join(parts).strip())
+
+
+async def summarize_conversation(previous_summary: str, turns: List[Dict[str, str]]) -> Optional[str]:
+    """Merge ``turns`` into ``previous_summary`` at background priority; None if the model is unavailable."""
+    request_id = str(uuid4())
+    max_chars = max(1, int(getattr(settings, "llm_max_message_chars", 2000)))
+    lines = [f"Existing summary: {previous_summary or '(none)'}", "", "New messages:"]
+    for turn in turns:
+        speaker = "User" if turn["role"] == "user" else "Assistant"
+        lines.append(f"{speaker}: {_truncate_text(turn['content'], max_chars)}")
+    body = _with_keep_alive({
+        "model": settings.ollama_model,
+        "messages": [
+            {"role": "system", "content": _SUMMARY_SYSTEM_PROMPT},
+            {"role": "user", "content": "\n".join(lines)},
+        ],
+        "stream": False,
+        "options": {
+            "num_predict": settings.llm_summary_max_tokens,
+            "num_ctx": settings.llm_num_ctx,
+            "temperature": 0.2,
+        },
+    })
+
+    if _provider_known_down(request_id, perf_counter()):
+        return None
+    try:
+        async with _llm_slot(request_id, "background:summary", LLM_PRIORITY_BACKGROUND) as queue_wait_ms:
+            started_at = perf_counter()
+            payload = await _request_ollama_chat(request_id, body, httpx.Timeout(settings.llm_timeout_seconds))
+    except (AdmissionRejectedError, httpx.HTTPError, RuntimeError, ValueError) as exc:
+        logger.warning(
+            "Conversation summary failed",
+            extra={
+                "request_id": request_id,
+                "provider": settings.llm_provider.strip().lower(),
+                "model": settings.ollama_model,
+                "error_code": "LLM_SUMMARY_FAILED",
+                "error": str(exc),
+            },
+        )
+        return None
+    elapsed_ms = round((perf_counter() - started_at) * 1000, 2)
+    _record_generation_metrics(INTENT_SUMMARY, "summary", payload, queue_wait_ms, elapsed_ms)
+    return _extract_ollama_reply(payload) or None
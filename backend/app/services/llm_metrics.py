@@ -0,0 +1,180 @@
+"""Histograms of Ollama generation timings and token counts, labeled by model, intent and endpoint."""
+
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Sequence, Tuple
+
+_NS_PER_MS = 1_000_000
+
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 20000, 30000, 60000, 120000)
+TOKEN_BUCKETS: Tuple[float, ...] = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+RATE_BUCKETS: Tuple[float, ...] = (1, 2, 5, 10, 20, 40, 80, 160, 320, 640)
+
+
+class Histogram:
+    """Fixed-bucket histogram; percentiles are the upper bound of the bucket holding them."""
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect_left(self.buckets, value)] += 1
+        self._count += 1
+        self._sum += value
+        self._max = max(self._max, value)
+
+    def _percentile(self, quantile: float) -> Optional[float]:
+        if not self._count:
+            return None
+        rank = quantile * self._count
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                return self.buckets[index] if index < len(self.buckets) else self._max
+        return self._max
+
+    def stats(self) -> Dict[str, Any]:
+        cumulative = 0
+        buckets: Dict[str, int] = {}
+        for bound, count in zip(self.buckets, self._counts):
+            cumulative += count
+            buckets[f"le_{bound:g}"] = cumulative
+        buckets["le_inf"] = self._count
+        return {
+            "count": self._count,
+            "sum": round(self._sum, 2),
+            "mean": round(self._sum / self._count, 2) if self._count else None,
+            "max": round(self._max, 2),
+            "p50": self._percentile(0.5),
+            "p95": self._percentile(0.95),
+            "buckets": buckets,
+        }
+
+
+class OllamaTimings(NamedTuple):
+    """Counters Ollama reports on the final ``/api/chat`` response, durations in milliseconds."""
+
+    load_ms: Optional[float]
+    prompt_eval_count: Optional[int]
+    prompt_eval_ms: Optional[float]
+    eval_count: Optional[int]
+    eval_ms: Optional[float]
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> "OllamaTimings":
+        def duration_ms(key: str) -> Optional[float]:
+            value = payload.get(key)
+            return round(value / _NS_PER_MS, 2) if isinstance(value, (int, float)) and value >= 0 else None
+
+        def count(key: str) -> Optional[int]:
+            value = payload.get(key)
+            return value if isinstance(value, int) and value >= 0 else None
+
+        return cls(
+            load_ms=duration_ms("load_duration"),
+            prompt_eval_count=count("prompt_eval_count"),
+            prompt_eval_ms=duration_ms("prompt_eval_duration"),
+            eval_count=count("eval_count"),
+            eval_ms=duration_ms("eval_duration"),
+        )
+
+
+def _tokens_per_second(tokens: Optional[int], duration_ms: Optional[float]) -> Optional[float]:
+    if not tokens or not duration_ms:
+        return None
+    return tokens / (duration_ms / 1000)
+
+
+class _Series:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.histograms: Dict[str, Histogram] = {
+            "queue_wait_ms": Histogram(LATENCY_BUCKETS_MS),
+            "end_to_end_ms": Histogram(LATENCY_BUCKETS_MS),
+            "ttft_ms": Histogram(LATENCY_BUCKETS_MS),
+            "load_ms": Histogram(LATENCY_BUCKETS_MS),
+            "prompt_eval_ms": Histogram(LATENCY_BUCKETS_MS),
+            "eval_ms": Histogram(LATENCY_BUCKETS_MS),
+            "prompt_tokens": Histogram(TOKEN_BUCKETS),
+            "output_tokens": Histogram(TOKEN_BUCKETS),
+            "prompt_tokens_per_second": Histogram(RATE_BUCKETS),
+            "output_tokens_per_second": Histogram(RATE_BUCKETS),
+        }
+
+    def observe(self, name: str, value: Optional[float]) -> None:
+        if value is not None:
+            self.histograms[name].observe(value)
+
+
+class GenerationMetrics:
+    """
+    Per (model, intent, endpoint) histograms of one generation's queue wait,
+    end-to-end and time-to-first-token latency, Ollama's load, prompt-eval and
+    eval durations, token counts and tokens per second.
+
+    At most ``max_series`` label combinations are kept; the least recently
+    updated one is dropped beyond that.
+    """
+
+    def __init__(self, max_series: int = 256) -> None:
+        self.max_series = max(1, max_series)
+        self._series: "OrderedDict[Tuple[str, str, str], _Series]" = OrderedDict()
+
+    def record(
+        self,
+        model: str,
+        intent: str,
+        endpoint: str,
+        payload: Dict[str, Any],
+        queue_wait_ms: float,
+        end_to_end_ms: float,
+        ttft_ms: Optional[float] = None,
+    ) -> OllamaTimings:
+        labels = (model, intent, endpoint)
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = _Series()
+            while len(self._series) > self.max_series:
+                self._series.popitem(last=False)
+        self._series.move_to_end(labels)
+
+        timings = OllamaTimings.from_payload(payload)
+        series.requests += 1
+        series.observe("queue_wait_ms", queue_wait_ms)
+        series.observe("end_to_end_ms", end_to_end_ms)
+        series.observe("ttft_ms", ttft_ms)
+        series.observe("load_ms", timings.load_ms)
+        series.observe("prompt_eval_ms", timings.prompt_eval_ms)
+        series.observe("eval_ms", timings.eval_ms)
+        series.observe("prompt_tokens", timings.prompt_eval_count)
+        series.observe("output_tokens", timings.eval_count)
+        series.observe("prompt_tokens_per_second", _tokens_per_second(timings.prompt_eval_count, timings.prompt_eval_ms))
+        series.observe("output_tokens_per_second", _tokens_per_second(timings.eval_count, timings.eval_ms))
+        return timings
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "series": [
+                {
+                    "labels": {"model": model, "intent": intent, "endpoint": endpoint},
+                    "requests": series.requests,
+                    **{name: histogram.stats() for name, histogram in series.histograms.items()},
+                }
+                for (model, intent, endpoint), series in self._series.items()
+            ]
+        }
+
+
+_generation_metrics: Optional[GenerationMetrics] = None
+
+
+def get_generation_metrics() -> GenerationMetrics:
+    global _generation_metrics
+    if _generation_metrics is None:
+        _generation_metrics = GenerationMetrics()
+    return _generation_metrics
@@ -0,0 +1,207 @@
+"""Ollama model warm-up, keep-alive and cold-start accounting."""
+
+import asyncio
+from time import monotonic, perf_counter
+from typing import Any, Dict, Optional, Union
+
+import httpx
+
+from app.core.config import settings
+from app.logger import get_logger
+from app.services.ollama_backends import ClientFactory, OllamaBackend, OllamaBackendPool, extract_model_names
+
+logger = get_logger(__name__)
+
+_NS_PER_MS = 1_000_000
+
+
+def keep_alive_param() -> Optional[Union[str, int]]:
+    """``OLLAMA_KEEP_ALIVE`` as Ollama expects it: bare numbers are seconds, anything else a duration string."""
+    value = settings.ollama_keep_alive
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+def load_duration_ms(payload: Dict[str, Any]) -> Optional[float]:
+    load_duration = payload.get("load_duration")
+    if not isinstance(load_duration, (int, float)):
+        return None
+    return round(load_duration / _NS_PER_MS, 2)
+
+
+class ModelKeeper:
+    """
+    Keeps the chat model resident on every Ollama backend.
+
+    ``start()`` loads the model with a one-token generation, then checks
+    ``/api/ps`` every ``interval_seconds`` and reloads it on backends that
+    served traffic within ``idle_seconds`` but have evicted it. Idle backends
+    are left alone so Ollama can free their memory. Every response carrying a
+    ``load_duration`` above the cold-start threshold is counted and logged.
+    """
+
+    def __init__(
+        self,
+        pool: OllamaBackendPool,
+        client_factory: ClientFactory,
+        interval_seconds: float = 60.0,
+        idle_seconds: float = 1800.0,
+        warmup_timeout_seconds: float = 120.0,
+        cold_start_threshold_ms: float = 1000.0,
+    ) -> None:
+        self.pool = pool
+        self.client_factory = client_factory
+        self.interval_seconds = max(0.0, interval_seconds)
+        self.idle_seconds = max(0.0, idle_seconds)
+        self.warmup_timeout_seconds = max(1.0, warmup_timeout_seconds)
+        self.cold_start_threshold_ms = max(0.0, cold_start_threshold_ms)
+        self._task: Optional[asyncio.Task] = None
+        self._warmups = 0
+        self._warmup_failures = 0
+        self._reloads = 0
+        self._cold_starts = 0
+        self._last_load_ms: Optional[float] = None
+
+    @classmethod
+    def from_settings(cls, pool: OllamaBackendPool, client_factory: ClientFactory) -> "ModelKeeper":
+        return cls(
+            pool=pool,
+            client_factory=client_factory,
+            interval_seconds=settings.ollama_keeper_interval_seconds,
+            idle_seconds=settings.ollama_keeper_idle_seconds,
+            warmup_timeout_seconds=settings.ollama_warmup_timeout_seconds,
+            cold_start_threshold_ms=settings.ollama_cold_start_threshold_ms,
+        )
+
+    def record_load(
+        self,
+        payload: Dict[str, Any],
+        backend_url: str,
+        source: str,
+        request_id: Optional[str] = None,
+    ) -> Optional[float]:
+        """Count and log a cold start when ``payload`` reports a slow model load."""
+        load_ms = load_duration_ms(payload)
+        if load_ms is None or load_ms < self.cold_start_threshold_ms:
+            return load_ms
+        self._cold_starts += 1
+        self._last_load_ms = load_ms
+        logger.warning(
+            "Ollama cold start",
+            extra={
+                "request_id": request_id,
+                "provider": "ollama",
+                "model": self.pool.model,
+                "backend": backend_url,
+                "source": source,
+                "load_ms": load_ms,
+            },
+        )
+        return load_ms
+
+    async def warm(self, backend: OllamaBackend, source: str = "warmup") -> bool:
+        """Load the model on ``backend`` with a one-token generation."""
+        body: Dict[str, Any] = {
+            "model": self.pool.model,
+            "prompt": "Hi",
+            "stream": False,
+            # Same window as chat requests, so the first chat does not reload the model.
+            "options": {"num_predict": 1, "num_ctx": settings.llm_num_ctx},
+        }
+        keep_alive = keep_alive_param()
+        if keep_alive is not None:
+            body["keep_alive"] = keep_alive
+
+        started_at = perf_counter()
+        try:
+            response = await self.client_factory(backend.base_url).post(
+                f"{backend.base_url}/api/generate",
+                json=body,
+                timeout=httpx.Timeout(self.warmup_timeout_seconds),
+            )
+            response.raise_for_status()
+            payload = response.json()
+        except (httpx.HTTPError, ValueError) as exc:
+            self._warmup_failures += 1
+            logger.warning("Ollama %s failed on %s: %s", source, backend.base_url, str(exc) or type(exc).__name__)
+            return False
+
+        self._warmups += 1
+        self.record_load(payload if isinstance(payload, dict) else {}, backend.base_url, source)
+        logger.info(
+            "Ollama model %s loaded on %s in %.2fms (%s)",
+            self.pool.model,
+            backend.base_url,
+            (perf_counter() - started_at) * 1000,
+            source,
+        )
+        return True
+
+    async def warm_all(self) -> None:
+        await asyncio.gather(*(self.warm(backend) for backend in self.pool.backends))
+
+    async def _is_loaded(self, backend: OllamaBackend) -> bool:
+        response = await self.client_factory(backend.base_url).get(
+            f"{backend.base_url}/api/ps",
+            timeout=httpx.Timeout(self.pool.health_check_timeout_seconds),
+        )
+        response.raise_for_status()
+        return self.pool.model in extract_model_names(response.json())
+
+    async def keep_warm(self) -> None:
+        """Reload the model on recently used backends that no longer have it in memory."""
+        now = monotonic()
+        for backend in self.pool.backends:
+            recently_used = backend.last_request_at is not None and now - backend.last_request_at <= self.idle_seconds
+            if not recently_used or not backend.available(now):
+                continue
+            try:
+                loaded = await self._is_loaded(backend)
+            except (httpx.HTTPError, ValueError) as exc:
+                logger.warning("Ollama /api/ps check failed on %s: %s", backend.base_url, str(exc))
+                continue
+            if not loaded:
+                self._reloads += 1
+                await self.warm(backend, source="reload")
+
+    async def _run(self) -> None:
+        await self.warm_all()
+        if self.interval_seconds <= 0:
+            return
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.keep_warm()
+            except Exception as exc:
+                logger.warning("Ollama model keeper failed: %s", str(exc))
+
+    def start(self) -> None:
+        """Warm every backend in the background, then keep the model loaded while there is traffic."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "keep_alive": settings.ollama_keep_alive or None,
+            "warmups": self._warmups,
+            "warmup_failures": self._warmup_failures,
+            "reloads": self._reloads,
+            "cold_starts": self._cold_starts,
+            "last_cold_start_load_ms": self._last_load_ms,
+        }
+
+    async def close(self) -> None:
+        task = self._task
+        self._task = None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
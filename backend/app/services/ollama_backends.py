@@ -0,0 +1,332 @@
+"""Pool of Ollama backends with least-outstanding-requests routing and a background-refreshed health snapshot."""
+
+import asyncio
+from collections import OrderedDict
+from time import monotonic, time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+ClientFactory = Callable[[str], httpx.AsyncClient]
+
+
+def extract_model_names(payload: Dict[str, Any]) -> List[str]:
+    models = payload.get("models")
+    if not isinstance(models, list):
+        return []
+
+    names: List[str] = []
+    for item in models:
+        if isinstance(item, dict):
+            name = item.get("name")
+            if isinstance(name, str) and name.strip():
+                names.append(name.strip())
+    return names
+
+
+def parse_backend_specs(specs: Iterable[str], default_capacity: int) -> Dict[str, int]:
+    """Parse ``url`` or ``url=capacity`` entries such as ``http://gpu-1:11434=4``."""
+    backends: Dict[str, int] = {}
+    for spec in specs:
+        url, _, raw_capacity = spec.strip().partition("=")
+        url = url.strip().rstrip("/")
+        if not url:
+            continue
+        try:
+            capacity = int(raw_capacity) if raw_capacity.strip() else default_capacity
+        except ValueError:
+            capacity = default_capacity
+        backends[url] = max(1, capacity)
+    return backends
+
+
+class OllamaBackend:
+    def __init__(self, base_url: str, capacity: int) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.capacity = max(1, capacity)
+        self.outstanding = 0
+        self.healthy = True
+        self.reachable = True
+        self.model_available = True
+        self.ejected_until = 0.0
+        self.consecutive_failures = 0
+        self.requests = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.last_checked_at: Optional[float] = None
+        self.last_request_at: Optional[float] = None
+        self.probe_latency_ms: Optional[float] = None
+        self.loaded_models: Optional[List[str]] = None
+
+    def available(self, now: float) -> bool:
+        return self.healthy and now >= self.ejected_until
+
+    def load(self) -> float:
+        return self.outstanding / self.capacity
+
+
+class OllamaBackendPool:
+    """
+    Routes each request to the available backend with the fewest outstanding
+    requests relative to its capacity.
+
+    A backend is ejected for ``eject_seconds`` after ``eject_after_failures``
+    consecutive request failures, and marked unhealthy while its ``/api/tags``
+    probe fails or lacks the configured model; a passing probe readmits it.
+    When every candidate is out, the least loaded one is used anyway rather
+    than failing outright.
+
+    The probes run in a background task every ``health_check_interval_seconds``
+    and keep a snapshot (reachability, models loaded per ``/api/ps``, probe
+    latency, last error) that health endpoints read without calling Ollama.
+    ``provider_down`` reports when the latest probes, all younger than
+    ``health_max_age_seconds``, found no usable backend.
+
+    Requests with an ``affinity_key`` (a saved trip, a chat session) stick
+    to the backend that served the key last while it is available and has a
+    free slot, so that backend's prompt cache for the shared prefix is reused.
+    """
+
+    def __init__(
+        self,
+        backends: Dict[str, int],
+        model: str,
+        eject_after_failures: int = 3,
+        eject_seconds: float = 30.0,
+        health_check_interval_seconds: float = 10.0,
+        health_check_timeout_seconds: float = 5.0,
+        health_max_age_seconds: float = 30.0,
+        max_affinity_keys: int = 1024,
+    ) -> None:
+        if not backends:
+            raise ValueError("At least one Ollama backend is required.")
+        self.backends = [OllamaBackend(url, capacity) for url, capacity in backends.items()]
+        self.model = model
+        self.eject_after_failures = max(1, eject_after_failures)
+        self.eject_seconds = max(0.0, eject_seconds)
+        self.health_check_interval_seconds = max(0.0, health_check_interval_seconds)
+        self.health_check_timeout_seconds = max(0.1, health_check_timeout_seconds)
+        self.health_max_age_seconds = max(0.0, health_max_age_seconds)
+        self.max_affinity_keys = max(1, max_affinity_keys)
+        self._affinity: "OrderedDict[str, OllamaBackend]" = OrderedDict()
+        self._affinity_hits = 0
+        self._health_task: Optional[asyncio.Task] = None
+        self._picks = 0
+
+    @classmethod
+    def from_settings(cls) -> "OllamaBackendPool":
+        default_capacity = max(1, int(getattr(settings, "llm_max_concurrent_requests", 2)))
+        backends = parse_backend_specs(settings.ollama_backends, default_capacity)
+        if not backends:
+            backends = {settings.ollama_base_url.rstrip("/"): default_capacity}
+        return cls(
+            backends=backends,
+            model=settings.ollama_model,
+            eject_after_failures=settings.ollama_eject_after_failures,
+            eject_seconds=settings.ollama_eject_seconds,
+            health_check_interval_seconds=settings.ollama_health_check_interval_seconds,
+            health_check_timeout_seconds=settings.ollama_health_check_timeout_seconds,
+            health_max_age_seconds=settings.ollama_health_max_age_seconds,
+        )
+
+    def pick(self, exclude: Iterable[str] = (), affinity_key: Optional[str] = None) -> OllamaBackend:
+        """Least loaded available backend, preferring ones not in ``exclude`` (already tried)."""
+        excluded = set(exclude)
+        now = monotonic()
+        if affinity_key is not None:
+            sticky = self._affinity.get(affinity_key)
+            if (
+                sticky is not None
+                and sticky.base_url not in excluded
+                and sticky.available(now)
+                and sticky.outstanding < sticky.capacity
+            ):
+                self._affinity.move_to_end(affinity_key)
+                self._affinity_hits += 1
+                return sticky
+
+        fresh = [backend for backend in self.backends if backend.base_url not in excluded]
+        candidates = (
+            [backend for backend in fresh if backend.available(now)]
+            or [backend for backend in self.backends if backend.available(now)]
+            or fresh
+            or self.backends
+        )
+        # Rotate the start so equally loaded backends share traffic.
+        self._picks += 1
+        offset = self._picks % len(candidates)
+        rotated = candidates[offset:] + candidates[:offset]
+        backend = min(rotated, key=lambda backend: (backend.outstanding >= backend.capacity, backend.load()))
+        if affinity_key is not None:
+            self._affinity[affinity_key] = backend
+            self._affinity.move_to_end(affinity_key)
+            while len(self._affinity) > self.max_affinity_keys:
+                self._affinity.popitem(last=False)
+        return backend
+
+    def affinity_stats(self) -> Dict[str, int]:
+        return {"keys": len(self._affinity), "hits": self._affinity_hits}
+
+    def begin(self, backend: OllamaBackend) -> None:
+        backend.outstanding += 1
+        backend.requests += 1
+        backend.last_request_at = monotonic()
+
+    def end(self, backend: OllamaBackend) -> None:
+        backend.outstanding = max(0, backend.outstanding - 1)
+
+    def record_success(self, backend: OllamaBackend) -> None:
+        backend.consecutive_failures = 0
+
+    def record_failure(self, backend: OllamaBackend, error: Exception) -> None:
+        backend.failures += 1
+        backend.consecutive_failures += 1
+        backend.last_error = str(error) or type(error).__name__
+        if backend.consecutive_failures >= self.eject_after_failures and len(self.backends) > 1:
+            backend.ejected_until = monotonic() + self.eject_seconds
+            logger.warning(
+                "Ejecting Ollama backend %s after %s consecutive failures: %s",
+                backend.base_url,
+                backend.consecutive_failures,
+                backend.last_error,
+            )
+
+    async def _loaded_models(self, backend: OllamaBackend, client: httpx.AsyncClient) -> Optional[List[str]]:
+        try:
+            response = await client.get(
+                f"{backend.base_url}/api/ps",
+                timeout=httpx.Timeout(self.health_check_timeout_seconds),
+            )
+            response.raise_for_status()
+            return extract_model_names(response.json())
+        except (httpx.HTTPError, ValueError):
+            return None
+
+    async def probe(self, backend: OllamaBackend, client: httpx.AsyncClient) -> None:
+        """Refresh one backend's health from its ``/api/tags`` and ``/api/ps`` endpoints."""
+        was_healthy = backend.available(monotonic())
+        started_at = monotonic()
+        try:
+            response = await client.get(
+                f"{backend.base_url}/api/tags",
+                timeout=httpx.Timeout(self.health_check_timeout_seconds),
+            )
+            response.raise_for_status()
+            names = extract_model_names(response.json())
+        except (httpx.HTTPError, ValueError) as exc:
+            backend.reachable = False
+            backend.model_available = False
+            backend.loaded_models = None
+            backend.last_error = str(exc) or type(exc).__name__
+        else:
+            backend.reachable = True
+            backend.model_available = self.model in names
+            if not backend.model_available:
+                backend.last_error = f"model '{self.model}' not available"
+        backend.probe_latency_ms = round((monotonic() - started_at) * 1000, 2)
+        if backend.reachable:
+            backend.loaded_models = await self._loaded_models(backend, client)
+
+        backend.last_checked_at = time()
+        backend.healthy = backend.reachable and backend.model_available
+        if backend.healthy:
+            backend.ejected_until = 0.0
+            backend.consecutive_failures = 0
+        if was_healthy != backend.healthy:
+            logger.warning(
+                "Ollama backend %s is now %s%s",
+                backend.base_url,
+                "healthy" if backend.healthy else "unhealthy",
+                "" if backend.healthy else f": {backend.last_error}",
+            )
+
+    async def check_all(self, client_factory: ClientFactory) -> None:
+        await asyncio.gather(*(self.probe(backend, client_factory(backend.base_url)) for backend in self.backends))
+
+    async def _health_loop(self, client_factory: ClientFactory) -> None:
+        while True:
+            try:
+                await self.check_all(client_factory)
+            except Exception as exc:
+                logger.warning("Ollama health check failed: %s", str(exc))
+            await asyncio.sleep(self.health_check_interval_seconds)
+
+    def start_health_checks(self, client_factory: ClientFactory) -> None:
+        """Start the background probes that keep the health snapshot current."""
+        if self._health_task is not None or self.health_check_interval_seconds <= 0:
+            return
+        self._health_task = asyncio.get_running_loop().create_task(self._health_loop(client_factory))
+
+    def ensure_health_checks(self, client_factory: ClientFactory) -> None:
+        """Start periodic probes once there is more than one backend to choose from."""
+        if len(self.backends) >= 2:
+            self.start_health_checks(client_factory)
+
+    @property
+    def checked_at(self) -> Optional[float]:
+        """Time of the oldest backend probe in the snapshot; None until every backend was probed."""
+        checked = [backend.last_checked_at for backend in self.backends]
+        if any(value is None for value in checked):
+            return None
+        return min(checked)
+
+    def snapshot_fresh(self) -> bool:
+        checked_at = self.checked_at
+        return checked_at is not None and time() - checked_at <= self.health_max_age_seconds
+
+    def provider_down(self) -> bool:
+        """Whether current probes found every backend unreachable or without the model."""
+        return self.snapshot_fresh() and not any(backend.healthy for backend in self.backends)
+
+    def stats(self) -> Dict[str, Any]:
+        now = monotonic()
+        return {
+            backend.base_url: {
+                "capacity": backend.capacity,
+                "outstanding": backend.outstanding,
+                "available": backend.available(now),
+                "reachable": backend.reachable,
+                "model_available": backend.model_available,
+                "requests": backend.requests,
+                "failures": backend.failures,
+                "consecutive_failures": backend.consecutive_failures,
+                "last_error": backend.last_error,
+                "last_checked_at": backend.last_checked_at,
+                "probe_latency_ms": backend.probe_latency_ms,
+                "loaded_models": backend.loaded_models,
+            }
+            for backend in self.backends
+        }
+
+    async def close(self) -> None:
+        task = self._health_task
+        self._health_task = None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+
+_backend_pool: Optional[OllamaBackendPool] = None
+
+
+def get_ollama_backend_pool() -> OllamaBackendPool:
+    global _backend_pool
+    if _backend_pool is None:
+        _backend_pool = OllamaBackendPool.from_settings()
+    return _backend_pool
+
+
+async def close_ollama_backend_pool() -> None:
+    global _backend_pool
+    pool = _backend_pool
+    _backend_pool = None
+    if pool is not None:
+        await pool.close()
@@ -0,0 +1,92 @@
+"""Flexible-dates price calendar: cheapest departure within a date window."""
+
+import asyncio
+from datetime import date, timedelta
+from typing import Dict, List
+
+import numpy as np
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.logger import get_logger
+from app.schemas import TripRequest
+from app.services.pricing import get_transport_options, lookup_city_stats, resolve_daily_costs
+
+logger = get_logger(__name__)
+
+
+async def estimate_price_calendar(
+    origin: str,
+    destination: str,
+    window_start: date,
+    window_end: date,
+    trip_days: int,
+    travelers: int,
+    session: Session,
+) -> List[dict]:
+    """Price a fixed-length trip for every departure date in a window.
+
+    Transport prices are fetched once per distinct quote-cache date bucket;
+    the accommodation/food/misc arithmetic of ``estimate_trip`` is then applied
+    to every candidate date in a single NumPy pass.
+
+    Returns:
+        One dict per start date with start_date, end_date, transport, accommodation, food, misc, total
+    """
+    start_dates = [window_start + timedelta(days=offset) for offset in range((window_end - window_start).days + 1)]
+    bucket_days = max(1, settings.quote_cache_date_bucket_days)
+
+    bucket_representatives: Dict[int, date] = {}
+    for start_date in start_dates:
+        bucket_representatives.setdefault(start_date.toordinal() // bucket_days, start_date)
+
+    buckets = list(bucket_representatives.keys())
+    option_lists = await asyncio.gather(
+        *(
+            get_transport_options(
+                TripRequest(
+                    origin=origin,
+                    destination=destination,
+                    start_date=bucket_representatives[bucket],
+                    end_date=bucket_representatives[bucket] + timedelta(days=trip_days),
+                    travelers=travelers,
+                )
+            )
+            for bucket in buckets
+        )
+    )
+    transport_by_bucket = {
+        bucket: sum(option.price for option in options)
+        for bucket, options in zip(buckets, option_lists)
+    }
+    stats = await lookup_city_stats(destination, session)
+    per_night, food_per_day, misc_per_day = resolve_daily_costs(stats)
+
+    # Same operation order as build_estimate so every float matches a single /quote call.
+    transport_total = np.array(
+        [transport_by_bucket[start_date.toordinal() // bucket_days] for start_date in start_dates],
+        dtype=np.float64,
+    )
+    days = np.full(len(start_dates), max(trip_days, 1), dtype=np.float64)
+    accommodation_total = per_night * days
+    food_total = food_per_day * days * travelers
+    misc_total = misc_per_day * days * travelers
+    total = transport_total + accommodation_total + food_total + misc_total
+
+    logger.info(
+        f"Price calendar for {origin} -> {destination}: {len(start_dates)} start dates, "
+        f"{len(buckets)} provider lookups"
+    )
+
+    return [
+        {
+            "start_date": start_date,
+            "end_date": start_date + timedelta(days=trip_days),
+            "transport": round(float(transport_total[i]), 2),
+            "accommodation": round(float(accommodation_total[i]), 2),
+            "food": round(float(food_total[i]), 2),
+            "misc": round(float(misc_total[i]), 2),
+            "total": round(float(total[i]), 2),
+        }
+        for i, start_date in enumerate(start_dates)
+    ]
@@ -1,19 +1,25 @@
 """Pricing service for trip cost estimation."""
 
+import asyncio
 from datetime import date
-from typing import List, Optional
-from sqlmodel import Session, select
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from sqlmodel import Session
 
 from app.schemas import TripRequest, TransportOption, AccommodationEstimate
-from app.models import CityStats
-from app.providers.mock_provider import MockProvider
-from app.providers.rome2rio_provider import Rome2RioProvider
+from app.services.city_index import CityStatsEntry, get_city_stats_index, normalize_city_name
+from app.providers.registry import get_provider_registry
+from app.services.quote_cache import build_quote_key, get_quote_cache
+from app.core.circuit_breaker import CircuitOpenError
+from app.core.singleflight import SingleFlight
 from app.exceptions import ProviderException, DatabaseException
 from app.logger import get_logger
 from app.core.config import settings
 
 logger = get_logger(__name__)
 
+_transport_flight = SingleFlight("transport_options")
+_city_stats_flight = SingleFlight("city_stats")
+
 
 async def get_transport_options(
     trip_request: TripRequest,
@@ -30,23 +36,34 @@ async def get_transport_options(
         ProviderException: If transport provider fails
     """
     try:
-        if settings.rome2rio_api_key:
-            logger.info("Using Rome2Rio provider for transport costs")
-            provider = Rome2RioProvider(
-                api_key=settings.rome2rio_api_key,
-                timeout=settings.provider_timeout_seconds,
+        registry = get_provider_registry()
+        provider = registry.primary_provider()
+        provider_name = registry.primary_name()
+        logger.info(f"Using '{provider_name}' provider for transport costs")
+
+        async def fetch_prices():
+            return await provider.get_prices(
+                trip_request.origin,
+                trip_request.destination,
+                trip_request.start_date,
+                trip_request.end_date,
+                trip_request.travelers,
             )
+
+        cache = get_quote_cache() if settings.quote_cache_enabled else None
+        if cache is not None:
+            quote_key = cache.build_key(provider_name, trip_request)
+            load_prices = lambda: cache.get_or_fetch(quote_key, provider_name, fetch_prices)
         else:
-            logger.info("No ROME2RIO_API_KEY set — using MockProvider")
-            provider = MockProvider()
+            quote_key = build_quote_key(provider_name, trip_request, date_bucket_days=1)
+            load_prices = fetch_prices
 
-        price_infos = await provider.get_prices(
-            trip_request.origin,
-            trip_request.destination,
-            trip_request.start_date,
-            trip_request.end_date,
-            trip_request.travelers,
-        )
+        try:
+            price_infos = await _transport_flight.do(quote_key, load_prices)
+        except CircuitOpenError as e:
+            logger.warning(f"{str(e)}; serving estimated transport prices")
+            cached = cache.last_known_good(quote_key) if cache is not None else None
+            price_infos = await _estimated_price_infos(trip_request, cached)
         
         options = [
             TransportOption(
@@ -55,6 +72,8 @@ async def get_transport_options(
                 price=info["price"],
                 currency=info.get("currency", "USD"),
                 notes=info.get("notes"),
+                partial=bool(info.get("partial", False)),
+                estimated=bool(info.get("estimated", False)),
             )
             for info in price_infos
         ]
@@ -71,22 +90,45 @@ async def get_transport_options(
         raise ProviderException("transport-provider", str(e))
 
 
-def get_city_stats(city: str, session: Session) -> Optional[CityStats]:
-    """Get city statistics from database.
+async def _estimated_price_infos(
+    trip_request: TripRequest,
+    cached: Optional[List[Dict[str, Any]]],
+) -> List[Dict[str, Any]]:
+    """Fallback prices while the provider's circuit is open: the last cached quote, else the mock provider."""
+    if cached:
+        price_infos = cached
+    else:
+        price_infos = await get_provider_registry().get("mock").get_prices(
+            trip_request.origin,
+            trip_request.destination,
+            trip_request.start_date,
+            trip_request.end_date,
+            trip_request.travelers,
+        )
+    return [{**info, "estimated": True} for info in price_infos]
+
+
+def get_city_stats(city: str, session: Session) -> Optional[CityStatsEntry]:
+    """Get city statistics from the in-memory CityStats index.
+    
+    The session is only used when the index snapshot is missing or stale;
+    otherwise the lookup makes no database round-trip.
     
     Args:
-        city: City name to look up
+        city: City name to look up (case- and accent-insensitive)
         session: Database session
         
     Returns:
-        CityStats object if found, None otherwise
+        CityStatsEntry if found, None otherwise
         
     Raises:
-        DatabaseException: If database query fails
+        DatabaseException: If reloading the index fails
     """
     try:
-        statement = select(CityStats).where(CityStats.city.ilike(city))
-        result = session.exec(statement).first()
+        index = get_city_stats_index()
+        if index.needs_reload():
+            index.load(session)
+        result = index.lookup(city)
         
         if result:
             logger.debug(f"Found stats for city: {city}")
@@ -99,6 +141,102 @@ def get_city_stats(city: str, session: Session) -> Optional[CityStats]:
         raise DatabaseException(f"Failed to fetch city stats for '{city}'")
 
 
+async def lookup_city_stats(city: str, session: Session) -> Optional[CityStatsEntry]:
+    """Look up city statistics without blocking the event loop.
+    
+    Reads come straight from the index snapshot; a stale snapshot is
+    reloaded once in a worker thread, coalesced across concurrent quotes.
+    """
+    index = get_city_stats_index()
+    if index.needs_reload():
+        await _city_stats_flight.do(
+            "reload",
+            lambda: asyncio.to_thread(get_city_stats, city, session),
+        )
+    return index.lookup(city)
+
+
+def get_singleflight_stats() -> Dict[str, Any]:
+    return {
+        "transport_options": _transport_flight.stats(),
+        "city_stats": _city_stats_flight.stats(),
+    }
+
+
+def resolve_daily_costs(stats: Optional[CityStatsEntry]) -> Tuple[float, float, float]:
+    """Return (accommodation per night, food per day, misc per day) for a city, falling back to defaults."""
+    if stats:
+        return stats.avg_accommodation_per_night, stats.avg_food_per_day, stats.avg_misc_per_day
+    return (
+        settings.default_accommodation_per_night,
+        settings.default_food_per_day,
+        settings.default_misc_per_day,
+    )
+
+
+def build_estimate(
+    trip_request: TripRequest,
+    transport_options: List[TransportOption],
+    stats: Optional[CityStatsEntry],
+) -> dict:
+    """Apply the trip cost model to already-fetched transport options and city stats."""
+    # Calculate trip duration
+    days = max((trip_request.end_date - trip_request.start_date).days, 1)
+    per_night, food_per_day, misc_per_day = resolve_daily_costs(stats)
+    
+    # Calculate costs
+    nights = days
+    accommodation_total = per_night * nights
+    food_total = food_per_day * days * trip_request.travelers
+    misc_total = misc_per_day * days * trip_request.travelers
+    transport_total = sum(opt.price for opt in transport_options)
+    
+    total = round(
+        transport_total + accommodation_total + food_total + misc_total, 2
+    )
+    
+    accommodation = AccommodationEstimate(
+        per_night=per_night,
+        nights=nights,
+        total=round(accommodation_total, 2),
+    )
+    
+    logger.info(
+        f"Trip estimate for {trip_request.origin} -> {trip_request.destination}: "
+        f"${total} ({days} days, {trip_request.travelers} travelers, "
+        f"{len(transport_options)} transport options)"
+    )
+    
+    return {
+        "trip_days": days,
+        "transport_options": transport_options,
+        "accommodation": accommodation,
+        "food": round(food_total, 2),
+        "misc": round(misc_total, 2),
+        "total": total,
+    }
+
+
+async def _estimate_with(
+    trip_request: TripRequest,
+    load_transport_options: Callable[[TripRequest], Awaitable[List[TransportOption]]],
+    load_city_stats: Callable[[str], Awaitable[Optional[CityStatsEntry]]],
+) -> dict:
+    try:
+        # Get transport options
+        transport_options = await load_transport_options(trip_request)
+        
+        # Get city statistics or use defaults
+        stats = await load_city_stats(trip_request.destination)
+        
+        return build_estimate(trip_request, transport_options, stats)
+    except (ProviderException, DatabaseException):
+        raise
+    except Exception as e:
+        logger.error(f"Error estimating trip: {str(e)}", exc_info=True)
+        raise DatabaseException("Failed to estimate trip cost")
+
+
 async def estimate_trip(
     trip_request: TripRequest,
     session: Session,
@@ -116,58 +254,53 @@ async def estimate_trip(
         ProviderException: If transport provider fails
         DatabaseException: If database query fails
     """
-    try:
-        # Calculate trip duration
-        days = max((trip_request.end_date - trip_request.start_date).days, 1)
-        
-        # Get transport options
-        transport_options = await get_transport_options(trip_request)
-        
-        # Get city statistics or use defaults
-        stats = get_city_stats(trip_request.destination, session)
-        
-        if stats:
-            per_night = stats.avg_accommodation_per_night
-            food_per_day = stats.avg_food_per_day
-            misc_per_day = stats.avg_misc_per_day
-        else:
-            per_night = settings.default_accommodation_per_night
-            food_per_day = settings.default_food_per_day
-            misc_per_day = settings.default_misc_per_day
-        
-        # Calculate costs
-        nights = days
-        accommodation_total = per_night * nights
-        food_total = food_per_day * days * trip_request.travelers
-        misc_total = misc_per_day * days * trip_request.travelers
-        transport_total = sum(opt.price for opt in transport_options)
-        
-        total = round(
-            transport_total + accommodation_total + food_total + misc_total, 2
-        )
-        
-        accommodation = AccommodationEstimate(
-            per_night=per_night,
-            nights=nights,
-            total=round(accommodation_total, 2),
-        )
-        
-        logger.info(
-            f"Trip estimate for {trip_request.origin} -> {trip_request.destination}: "
-            f"${total} ({days} days, {trip_request.travelers} travelers, "
-            f"{len(transport_options)} transport options)"
-        )
-        
-        return {
-            "trip_days": days,
-            "transport_options": transport_options,
-            "accommodation": accommodation,
-            "food": round(food_total, 2),
-            "misc": round(misc_total, 2),
-            "total": total,
-        }
-    except (ProviderException, DatabaseException):
-        raise
-    except Exception as e:
-        logger.error(f"Error estimating trip: {str(e)}", exc_info=True)
-        raise DatabaseException("Failed to estimate trip cost")
+    return await _estimate_with(
+        trip_request,
+        get_transport_options,
+        lambda city: lookup_city_stats(city, session),
+    )
+
+
+async def estimate_trips(
+    trip_requests: List[TripRequest],
+    session: Session,
+    max_concurrency: int = 8,
+) -> List[Union[dict, Exception]]:
+    """Estimate many trips at once with the same semantics as ``estimate_trip``.
+    
+    Provider calls run concurrently (at most ``max_concurrency`` at a time) and
+    identical routes or destination cities inside the batch are fetched once.
+    
+    Returns:
+        One entry per request, in order: the estimate dict or the raised exception
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    transport_tasks: Dict[str, asyncio.Task] = {}
+    city_tasks: Dict[str, asyncio.Task] = {}
+
+    async def fetch_bounded(trip_request: TripRequest) -> List[TransportOption]:
+        async with semaphore:
+            return await get_transport_options(trip_request)
+
+    def load_transport_options(trip_request: TripRequest) -> Awaitable[List[TransportOption]]:
+        key = build_quote_key("batch", trip_request, date_bucket_days=1)
+        if key not in transport_tasks:
+            transport_tasks[key] = asyncio.ensure_future(fetch_bounded(trip_request))
+        return transport_tasks[key]
+
+    def load_city_stats(city: str) -> Awaitable[Optional[CityStatsEntry]]:
+        key = normalize_city_name(city)
+        if key not in city_tasks:
+            city_tasks[key] = asyncio.ensure_future(lookup_city_stats(city, session))
+        return city_tasks[key]
+
+    results = await asyncio.gather(
+        *(_estimate_with(request, load_transport_options, load_city_stats) for request in trip_requests),
+        return_exceptions=True,
+    )
+
+    logger.info(
+        f"Batch estimate: {len(trip_requests)} trips, {len(transport_tasks)} distinct routes, "
+        f"{len(city_tasks)} distinct destinations"
+    )
+    return list(results)
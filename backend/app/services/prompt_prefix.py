@@ -0,0 +1,90 @@
+"""Measures how much prompt evaluation Ollama skips by reusing a cached prompt prefix."""
+
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+_NS_PER_MS = 1_000_000
+
+
+class _PrefixBaseline(NamedTuple):
+    tokens_per_char: float
+    ms_per_token: float
+
+
+class PromptPrefixTracker:
+    """
+    Per (prefix key, backend) prompt-eval accounting.
+
+    The first request for a key on a backend evaluates the whole prompt and
+    calibrates tokens per character and milliseconds per token. For later
+    requests the full prompt length is estimated from that ratio; whatever
+    Ollama did not have to evaluate (``prompt_eval_count`` below the estimate)
+    came from its prompt cache and is counted as saved.
+    """
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max(1, max_entries)
+        self._baselines: "OrderedDict[Tuple[str, str], _PrefixBaseline]" = OrderedDict()
+        self._requests = 0
+        self._followups = 0
+        self._reused = 0
+        self._prompt_eval_ms = 0.0
+        self._saved_tokens = 0
+        self._saved_ms = 0.0
+
+    def record(
+        self,
+        key: str,
+        backend_url: str,
+        prompt_chars: int,
+        payload: Dict[str, Any],
+    ) -> Optional[Tuple[int, float]]:
+        """Account one response; returns (saved tokens, saved ms) for follow-ups, None otherwise."""
+        evaluated = payload.get("prompt_eval_count")
+        duration_ns = payload.get("prompt_eval_duration")
+        if not isinstance(evaluated, int) or evaluated <= 0 or prompt_chars <= 0:
+            return None
+        duration_ms = duration_ns / _NS_PER_MS if isinstance(duration_ns, (int, float)) else 0.0
+        self._requests += 1
+        self._prompt_eval_ms += duration_ms
+
+        entry = (key, backend_url)
+        baseline = self._baselines.get(entry)
+        if baseline is None:
+            self._baselines[entry] = _PrefixBaseline(evaluated / prompt_chars, duration_ms / evaluated)
+            while len(self._baselines) > self.max_entries:
+                self._baselines.popitem(last=False)
+            return None
+
+        self._baselines.move_to_end(entry)
+        self._followups += 1
+        expected = round(prompt_chars * baseline.tokens_per_char)
+        saved_tokens = max(0, expected - evaluated)
+        saved_ms = round(saved_tokens * baseline.ms_per_token, 2)
+        if saved_tokens:
+            self._reused += 1
+            self._saved_tokens += saved_tokens
+            self._saved_ms += saved_ms
+        return saved_tokens, saved_ms
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tracked_prefixes": len(self._baselines),
+            "requests": self._requests,
+            "followups": self._followups,
+            "reused": self._reused,
+            "reuse_rate": round(self._reused / self._followups, 4) if self._followups else 0.0,
+            "prompt_eval_ms": round(self._prompt_eval_ms, 2),
+            "saved_prompt_tokens": self._saved_tokens,
+            "saved_prompt_eval_ms": round(self._saved_ms, 2),
+        }
+
+
+_prefix_tracker: Optional[PromptPrefixTracker] = None
+
+
+def get_prompt_prefix_tracker() -> PromptPrefixTracker:
+    global _prefix_tracker
+    if _prefix_tracker is None:
+        _prefix_tracker = PromptPrefixTracker()
+    return _prefix_tracker
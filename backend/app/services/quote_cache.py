@@ -0,0 +1,270 @@
+"""Two-tier (in-process LRU + Redis) cache for transport provider quotes."""
+
+import asyncio
+from time import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from app.core.circuit_breaker import CircuitOpenError
+from app.core.cache import LRUCache, RedisJSONCache, cache_stats, create_redis_cache
+from app.core.config import settings
+from app.logger import get_logger
+from app.schemas import TripRequest
+
+logger = get_logger(__name__)
+
+PriceFetcher = Callable[[], Awaitable[List[Dict[str, Any]]]]
+
+
+def build_quote_key(provider_name: str, trip_request: TripRequest, date_bucket_days: int) -> str:
+    """Normalize a trip request into a provider quote key."""
+    origin = trip_request.origin.strip().lower()
+    destination = trip_request.destination.strip().lower()
+    days = max((trip_request.end_date - trip_request.start_date).days, 1)
+    date_bucket = trip_request.start_date.toordinal() // max(1, date_bucket_days)
+    return f"{provider_name}|{origin}|{destination}|{trip_request.travelers}|{days}|{date_bucket}"
+
+
+class CachedProviderFailure(Exception):
+    """Raised when a recent provider failure is served from the negative cache."""
+
+
+class TransportQuoteCache:
+    """
+    Caches provider price lists keyed by normalized route, travelers, trip
+    length and start-date bucket.
+
+    Entries stay fresh for the provider's TTL and may then be served stale
+    for ``stale_while_revalidate_seconds`` while a single background task
+    refreshes them. Provider failures are cached briefly so an outage does
+    not turn every quote into an upstream call.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        default_ttl_seconds: float = 900,
+        provider_ttls: Optional[Dict[str, float]] = None,
+        negative_ttl_seconds: float = 30,
+        stale_while_revalidate_seconds: float = 300,
+        date_bucket_days: int = 7,
+        redis_cache: Optional[RedisJSONCache] = None,
+        last_good_ttl_seconds: float = 86400,
+    ) -> None:
+        self.default_ttl_seconds = max(0.0, default_ttl_seconds)
+        self.provider_ttls = dict(provider_ttls or {})
+        self.negative_ttl_seconds = max(0.0, negative_ttl_seconds)
+        self.stale_while_revalidate_seconds = max(0.0, stale_while_revalidate_seconds)
+        self.date_bucket_days = max(1, date_bucket_days)
+        self._l1 = LRUCache(max_entries)
+        self._l2 = redis_cache
+        # Last successful price list per key, kept well past stale_until as a fallback while a circuit is open.
+        self.last_good_ttl_seconds = max(0.0, last_good_ttl_seconds)
+        self._last_good = LRUCache(max_entries)
+        self._refreshing: Set[str] = set()
+        self._refresh_tasks: Set[asyncio.Task] = set()
+        self._counters: Dict[str, int] = {
+            "l1_hits": 0,
+            "l2_hits": 0,
+            "misses": 0,
+            "stale_hits": 0,
+            "negative_hits": 0,
+            "refreshes": 0,
+            "refresh_failures": 0,
+        }
+
+    @classmethod
+    def from_settings(cls) -> "TransportQuoteCache":
+        redis_cache: Optional[RedisJSONCache] = None
+        try:
+            redis_cache = create_redis_cache(
+                backend=settings.quote_cache_backend,
+                redis_url=settings.redis_url,
+                key_prefix=settings.redis_quote_cache_prefix,
+                connect_timeout_seconds=settings.redis_connect_timeout_seconds,
+                socket_timeout_seconds=settings.redis_socket_timeout_seconds,
+            )
+        except Exception as exc:
+            logger.warning(
+                "Failed to initialize quote cache backend '%s': %s. Using in-process cache only.",
+                settings.quote_cache_backend,
+                str(exc),
+            )
+
+        return cls(
+            max_entries=settings.quote_cache_max_entries,
+            default_ttl_seconds=settings.quote_cache_ttl_seconds,
+            provider_ttls=settings.quote_cache_provider_ttls,
+            negative_ttl_seconds=settings.quote_cache_negative_ttl_seconds,
+            stale_while_revalidate_seconds=settings.quote_cache_stale_while_revalidate_seconds,
+            date_bucket_days=settings.quote_cache_date_bucket_days,
+            redis_cache=redis_cache,
+            last_good_ttl_seconds=settings.quote_cache_last_good_ttl_seconds,
+        )
+
+    def build_key(self, provider_name: str, trip_request: TripRequest) -> str:
+        return build_quote_key(provider_name, trip_request, self.date_bucket_days)
+
+    def ttl_for(self, provider_name: str) -> float:
+        return self.provider_ttls.get(provider_name, self.default_ttl_seconds)
+
+    async def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        envelope = self._l1.get(key)
+        if envelope is not None:
+            self._counters["l1_hits"] += 1
+            return envelope
+
+        if self._l2 is None:
+            return None
+
+        envelope = await self._l2.get(key)
+        if not isinstance(envelope, dict):
+            return None
+
+        remaining = float(envelope.get("stale_until", 0)) - time()
+        if remaining <= 0:
+            return None
+        self._counters["l2_hits"] += 1
+        self._l1.set(key, envelope, ttl_seconds=remaining)
+        return envelope
+
+    async def _write(self, key: str, envelope: Dict[str, Any]) -> None:
+        ttl_seconds = float(envelope["stale_until"]) - time()
+        if ttl_seconds <= 0:
+            return
+        self._l1.set(key, envelope, ttl_seconds=ttl_seconds)
+        if self._l2 is not None:
+            await self._l2.set(key, envelope, ttl_seconds)
+
+    async def _store_success(self, key: str, provider_name: str, price_infos: List[Dict[str, Any]]) -> None:
+        now = time()
+        if any(info.get("partial") for info in price_infos):
+            # Incomplete fan-out results are only kept briefly so the next quote retries every provider.
+            fresh_until = now + self.negative_ttl_seconds
+            stale_until = fresh_until
+        else:
+            if self.last_good_ttl_seconds > 0:
+                self._last_good.set(key, price_infos, ttl_seconds=self.last_good_ttl_seconds)
+            fresh_until = now + self.ttl_for(provider_name)
+            stale_until = fresh_until + self.stale_while_revalidate_seconds
+        await self._write(
+            key,
+            {
+                "status": "ok",
+                "data": price_infos,
+                "fresh_until": fresh_until,
+                "stale_until": stale_until,
+            },
+        )
+
+    async def _store_failure(self, key: str, error: Exception) -> None:
+        if self.negative_ttl_seconds <= 0:
+            return
+        expires_at = time() + self.negative_ttl_seconds
+        await self._write(
+            key,
+            {
+                "status": "error",
+                "error": str(error) or error.__class__.__name__,
+                "fresh_until": expires_at,
+                "stale_until": expires_at,
+            },
+        )
+
+    async def _refresh(self, key: str, provider_name: str, fetch: PriceFetcher) -> None:
+        try:
+            price_infos = await fetch()
+        except Exception as exc:
+            self._counters["refresh_failures"] += 1
+            logger.warning("Background quote refresh failed for '%s': %s", key, str(exc))
+        else:
+            await self._store_success(key, provider_name, price_infos)
+        finally:
+            self._refreshing.discard(key)
+
+    def _schedule_refresh(self, key: str, provider_name: str, fetch: PriceFetcher) -> None:
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        self._counters["refreshes"] += 1
+        task = asyncio.create_task(self._refresh(key, provider_name, fetch))
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    async def get_or_fetch(self, key: str, provider_name: str, fetch: PriceFetcher) -> List[Dict[str, Any]]:
+        """Return cached prices for ``key`` or call ``fetch`` and cache the outcome."""
+        envelope = await self._read(key)
+        now = time()
+
+        if envelope is not None:
+            if envelope.get("status") == "error":
+                if now < float(envelope["fresh_until"]):
+                    self._counters["negative_hits"] += 1
+                    raise CachedProviderFailure(envelope.get("error", "provider failure"))
+            elif now < float(envelope["fresh_until"]):
+                return envelope["data"]
+            elif now < float(envelope["stale_until"]):
+                self._counters["stale_hits"] += 1
+                self._schedule_refresh(key, provider_name, fetch)
+                return envelope["data"]
+
+        self._counters["misses"] += 1
+        try:
+            price_infos = await fetch()
+        except CircuitOpenError:
+            # Nothing was attempted upstream, so there is no failure to remember.
+            raise
+        except Exception as exc:
+            await self._store_failure(key, exc)
+            raise
+
+        await self._store_success(key, provider_name, price_infos)
+        return price_infos
+
+    def last_known_good(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Return the most recent successful price list for ``key``, however old."""
+        return self._last_good.get(key)
+
+    async def invalidate(self, key: str) -> None:
+        self._l1.delete(key)
+        if self._l2 is not None:
+            await self._l2.delete(key)
+
+    def clear(self) -> None:
+        self._l1.clear()
+        self._last_good.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return cache_stats(
+            self._l1,
+            {
+                **self._counters,
+                "l2_enabled": self._l2 is not None,
+                "l2_errors": self._l2.errors if self._l2 is not None else 0,
+                "refreshing": len(self._refreshing),
+                "last_good_entries": len(self._last_good),
+            },
+        )
+
+    async def close(self) -> None:
+        for task in list(self._refresh_tasks):
+            task.cancel()
+        if self._l2 is not None:
+            await self._l2.close()
+
+
+_quote_cache: Optional[TransportQuoteCache] = None
+
+
+def get_quote_cache() -> TransportQuoteCache:
+    global _quote_cache
+    if _quote_cache is None:
+        _quote_cache = TransportQuoteCache.from_settings()
+    return _quote_cache
+
+
+async def close_quote_cache() -> None:
+    global _quote_cache
+    cache = _quote_cache
+    _quote_cache = None
+    if cache is not None:
+        await cache.close()
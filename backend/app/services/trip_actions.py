@@ -0,0 +1,208 @@
+"""Saved-trip AI actions: trusted trip context, action prompts and background pre-generation."""
+
+import hashlib
+import json
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlmodel import Session, col, delete, select
+
+from app.core.config import settings
+from app.logger import get_logger
+from app.models import ChatJob, SavedTrip
+from app.services.chat_jobs import (
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JOB_SUCCEEDED,
+    JobQueueFullError,
+    create_chat_job,
+    delete_chat_jobs,
+    finish_chat_job,
+    get_chat_job_pool,
+    wait_for_chat_job,
+)
+from app.services.llm import LLM_PRIORITY_BACKGROUND
+
+logger = get_logger(__name__)
+
+# Actions users almost always open right after saving a trip.
+PREGENERATED_ACTIONS = ("improve_itinerary", "reduce_budget_15", "family_friendly")
+
+
+def build_trip_context(trip: SavedTrip) -> Dict[str, str]:
+    trip_days = (trip.end_date - trip.start_date).days + 1
+    context: Dict[str, str] = {
+        "origin": trip.origin,
+        "destination": trip.destination,
+        "start_date": trip.start_date.isoformat(),
+        "end_date": trip.end_date.isoformat(),
+        "days": str(max(trip_days, 1)),
+        "travelers": str(trip.travelers),
+        "transport_type": trip.transport_type,
+        "budget": f"{trip.total:.2f}",
+    }
+
+    try:
+        breakdown = json.loads(trip.breakdown_json)
+        if isinstance(breakdown, dict):
+            context["food_total"] = str(breakdown.get("food", ""))
+            context["misc_total"] = str(breakdown.get("misc", ""))
+    except (TypeError, ValueError):
+        logger.warning("Could not parse trip breakdown_json for trip_id=%s", trip.id)
+
+    return context
+
+
+def build_trip_action_message(action: str, question: Optional[str], context: Dict[str, str]) -> str:
+    destination = context.get("destination", "this destination")
+    days = context.get("days", "")
+    budget = context.get("budget", "")
+    transport_type = context.get("transport_type", "any")
+
+    if question:
+        return question
+
+    if action == "improve_itinerary":
+        return (
+            f"Improve my itinerary for {destination} in {days} day(s). "
+            "Give a day-wise plan with morning, afternoon, and evening suggestions."
+        )
+
+    if action == "reduce_budget_15":
+        target_budget_text = ""
+        try:
+            target_budget = round(float(budget) * 0.85, 2)
+            target_budget_text = f"Target total budget: {target_budget}. "
+        except (TypeError, ValueError):
+            target_budget_text = ""
+        return (
+            f"Reduce this trip budget by 15% while keeping good experience quality. {target_budget_text}"
+            f"Current preferred transport: {transport_type}."
+        )
+
+    if action == "family_friendly":
+        return (
+            f"Create a family-friendly version of this {days}-day {destination} trip. "
+            "Include kid-friendly attractions, rest breaks, and practical transport advice."
+        )
+
+    return (
+        f"Using this saved-trip context for {destination} ({days} day(s)), "
+        "give practical recommendations for planning and execution."
+    )
+
+
+def trip_content_hash(context: Dict[str, str]) -> str:
+    """Identifies what a pre-generated reply was written for: trip context, model and system prompt."""
+    material = {"context": context, "model": settings.ollama_model, "system_prompt": settings.llm_system_prompt}
+    encoded = json.dumps(material, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _pregenerated_jobs(db: Session, trip_id: int) -> List[ChatJob]:
+    return list(
+        db.exec(select(ChatJob).where(ChatJob.trip_id == trip_id).where(col(ChatJob.content_hash).is_not(None))).all()
+    )
+
+
+def _needs_retry(job: ChatJob) -> bool:
+    return job.status == JOB_FAILED or job.fallback
+
+
+def find_trip_action_job(db: Session, trip: SavedTrip, action: str, content_hash: str) -> Optional[ChatJob]:
+    return db.exec(
+        select(ChatJob)
+        .where(ChatJob.trip_id == trip.id)
+        .where(ChatJob.user_id == trip.user_id)
+        .where(ChatJob.action == action)
+        .where(ChatJob.content_hash == content_hash)
+    ).first()
+
+
+def drop_stale_trip_actions(db: Session, trip: SavedTrip, content_hash: Optional[str] = None) -> int:
+    """Delete pre-generated replies written for other trip content (all of them when ``content_hash`` is None).
+
+    Failed and fallback replies count as stale too, so they are generated again.
+    """
+    stale = [
+        job for job in _pregenerated_jobs(db, trip.id) if job.content_hash != content_hash or _needs_retry(job)
+    ]
+    for job in stale:
+        db.delete(job)
+    if stale:
+        db.commit()
+        logger.info(f"Dropped {len(stale)} stale pre-generated replies for trip {trip.id}")
+    return len(stale)
+
+
+def prepare_trip_action_jobs(db: Session, trip: SavedTrip) -> List[str]:
+    """Drop replies for older trip content and create jobs for the actions not yet pre-generated.
+
+    Returns the new job IDs; hand them to ``submit_trip_action_jobs`` once
+    the response is sent.
+    """
+    context = build_trip_context(trip)
+    content_hash = trip_content_hash(context)
+    drop_stale_trip_actions(db, trip, content_hash)
+    if not settings.chat_pregenerate_trip_actions:
+        return []
+
+    existing = {job.action for job in _pregenerated_jobs(db, trip.id)}
+    job_ids: List[str] = []
+    for action in PREGENERATED_ACTIONS:
+        if action in existing:
+            continue
+        job = create_chat_job(
+            db,
+            trip.user_id,
+            build_trip_action_message(action, None, context),
+            context,
+            LLM_PRIORITY_BACKGROUND,
+            trip_id=trip.id,
+            action=action,
+            content_hash=content_hash,
+        )
+        job_ids.append(job.id)
+    return job_ids
+
+
+async def submit_trip_action_jobs(job_ids: List[str]) -> None:
+    """Queue pre-generation jobs; jobs that do not fit the queue are dropped and will be generated on demand."""
+    pool = get_chat_job_pool()
+    for index, job_id in enumerate(job_ids):
+        try:
+            pool.submit(job_id)
+        except JobQueueFullError:
+            skipped = job_ids[index:]
+            logger.warning(f"Chat job queue full, skipping pre-generation of {len(skipped)} trip actions")
+            delete_chat_jobs(skipped)
+            return
+
+
+async def pregenerated_reply(db: Session, trip: SavedTrip, action: str, wait_seconds: float) -> Optional[str]:
+    """Reply pre-generated for the trip's current content, waiting up to ``wait_seconds`` if it is being generated."""
+    job = find_trip_action_job(db, trip, action, trip_content_hash(build_trip_context(trip)))
+    if job is None:
+        return None
+    if job.status == JOB_RUNNING:
+        job = await wait_for_chat_job(job.id, wait_seconds) or job
+    if job.status != JOB_SUCCEEDED or job.fallback or not job.reply:
+        return None
+    return job.reply
+
+
+def store_trip_action_reply(db: Session, trip: SavedTrip, action: str, reply: str) -> None:
+    """Record an on-demand reply in the still-queued pre-generation job so it is not generated twice."""
+    job = find_trip_action_job(db, trip, action, trip_content_hash(build_trip_context(trip)))
+    if job is None or job.status != JOB_QUEUED:
+        return
+    finish_chat_job(db, job, status=JOB_SUCCEEDED, reply=reply)
+
+
+def _delete_trip_chat_jobs(mapper, connection, target: SavedTrip) -> None:
+    # ChatJob.trip_id has no foreign key; drop the deleted trip's jobs and pre-generated replies with it.
+    connection.execute(delete(ChatJob).where(col(ChatJob.trip_id) == target.id))
+
+
+event.listen(SavedTrip, "after_delete", _delete_trip_chat_jobs)
@@ -0,0 +1,94 @@
+"""Benchmark: one /quote/calendar request vs. one /quote request per departure date.
+
+Run from the backend directory:
+    python -m benchmarks.bench_price_calendar [window_days] [repeats]
+"""
+
+import datetime
+import sys
+from time import perf_counter
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+
+from app.db.session import get_session
+from app.main import app
+from app.seed import SAMPLE_CITIES
+from app.models import CityStats
+from app.services.quote_cache import get_quote_cache
+
+
+def _build_client() -> TestClient:
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        for entry in SAMPLE_CITIES:
+            session.add(CityStats(**entry))
+        session.commit()
+
+    def get_session_override():
+        with Session(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_session_override
+    return TestClient(app)
+
+
+def run(window_days: int = 60, repeats: int = 5, trip_days: int = 5) -> None:
+    client = _build_client()
+    window_start = datetime.date.today() + datetime.timedelta(days=7)
+    start_dates = [window_start + datetime.timedelta(days=offset) for offset in range(window_days)]
+
+    n_calls_seconds = []
+    calendar_seconds = []
+    for _ in range(repeats):
+        get_quote_cache().clear()
+        started = perf_counter()
+        totals = []
+        for start_date in start_dates:
+            response = client.post(
+                "/api/v1/quote",
+                json={
+                    "origin": "Berlin",
+                    "destination": "Paris",
+                    "start_date": start_date.isoformat(),
+                    "end_date": (start_date + datetime.timedelta(days=trip_days)).isoformat(),
+                    "travelers": 2,
+                },
+            )
+            totals.append(response.json()["breakdown"]["total"])
+        n_calls_seconds.append(perf_counter() - started)
+
+        get_quote_cache().clear()
+        started = perf_counter()
+        response = client.post(
+            "/api/v1/quote/calendar",
+            json={
+                "origin": "Berlin",
+                "destination": "Paris",
+                "window_start": start_dates[0].isoformat(),
+                "window_end": start_dates[-1].isoformat(),
+                "trip_days": trip_days,
+                "travelers": 2,
+            },
+        )
+        calendar_seconds.append(perf_counter() - started)
+        assert [entry["total"] for entry in response.json()["entries"]] == totals
+
+    app.dependency_overrides.clear()
+    best_n_calls = min(n_calls_seconds)
+    best_calendar = min(calendar_seconds)
+    print(f"window={window_days} dates, repeats={repeats}")
+    print(f"{f'{window_days} x POST /quote':<26}: {best_n_calls * 1000:8.1f} ms")
+    print(f"{'1 x POST /quote/calendar':<26}: {best_calendar * 1000:8.1f} ms")
+    print(f"{'speedup':<26}: {best_n_calls / best_calendar:8.1f}x")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    run(*args)
@@ -0,0 +1,151 @@
+"""Tests for the fair, priority-aware LLM admission scheduler."""
+
+import asyncio
+
+import pytest
+
+from app.core.admission import (
+    REJECT_QUEUE_FULL,
+    REJECT_TIMEOUT,
+    REJECT_USER_QUEUE_FULL,
+    REJECT_WAIT_TOO_LONG,
+    AdmissionRejectedError,
+    FairScheduler,
+)
+
+
+async def _enqueue(scheduler: FairScheduler, key: str, priority: int, served: list) -> asyncio.Task:
+    async def run():
+        await scheduler.acquire(key, priority)
+        served.append(key)
+
+    task = asyncio.create_task(run())
+    await asyncio.sleep(0)
+    return task
+
+
+@pytest.mark.asyncio
+async def test_scheduler_serves_users_round_robin_within_a_priority():
+    scheduler = FairScheduler(slots=1, max_queue_depth=10, max_queued_per_key=5, max_wait_seconds=60)
+    await scheduler.acquire("holder")
+    served: list = []
+
+    tasks = [await _enqueue(scheduler, "alice", 1, served) for _ in range(3)]
+    tasks.append(await _enqueue(scheduler, "bob", 1, served))
+
+    for _ in tasks:
+        scheduler.release()
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+
+    assert served == ["alice", "bob", "alice", "alice"]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_serves_higher_priority_first():
+    scheduler = FairScheduler(slots=1, max_queue_depth=10, max_wait_seconds=5)
+    await scheduler.acquire("holder")
+    served: list = []
+
+    chat = await _enqueue(scheduler, "anonymous", 1, served)
+    trip = await _enqueue(scheduler, "user:1", 0, served)
+    assert scheduler.stats()["queue_depth_by_priority"] == {"0": 1, "1": 1}
+
+    for _ in range(2):
+        scheduler.release()
+        await asyncio.sleep(0)
+    await asyncio.gather(chat, trip)
+
+    assert served == ["user:1", "anonymous"]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_rejects_early_when_queue_or_user_share_is_full():
+    scheduler = FairScheduler(slots=1, max_queue_depth=2, max_queued_per_key=1, max_wait_seconds=60)
+    await scheduler.acquire("holder")
+    served: list = []
+    queued = [await _enqueue(scheduler, "alice", 1, served)]
+
+    with pytest.raises(AdmissionRejectedError) as user_full:
+        await scheduler.acquire("alice", 1)
+    assert user_full.value.reason == REJECT_USER_QUEUE_FULL
+
+    queued.append(await _enqueue(scheduler, "bob", 1, served))
+    with pytest.raises(AdmissionRejectedError) as queue_full:
+        await scheduler.acquire("carol", 1)
+    assert queue_full.value.reason == REJECT_QUEUE_FULL
+    assert queue_full.value.retry_after > 0
+
+    for _ in queued:
+        scheduler.release()
+        await asyncio.sleep(0)
+    await asyncio.gather(*queued)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_retry_after_follows_observed_service_time():
+    scheduler = FairScheduler(slots=2, max_queue_depth=10, max_wait_seconds=10, ewma_alpha=1.0)
+    await scheduler.acquire("a")
+    await scheduler.acquire("b")
+    scheduler.release(service_seconds=8.0)
+    await scheduler.acquire("b")
+    served: list = []
+    queued = [await _enqueue(scheduler, f"user{i}", 1, served) for i in range(2)]
+
+    # Two requests ahead on two slots of ~8s each: the third waits (2 + 1) / 2 * 8 = 12s.
+    with pytest.raises(AdmissionRejectedError) as rejected:
+        await scheduler.acquire("late", 1)
+    assert rejected.value.reason == REJECT_WAIT_TOO_LONG
+    assert rejected.value.retry_after == pytest.approx(12.0)
+    assert rejected.value.retry_after_header == "12"
+
+    for _ in queued:
+        scheduler.release()
+        await asyncio.sleep(0)
+    await asyncio.gather(*queued)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_times_out_waiters_and_frees_their_place():
+    scheduler = FairScheduler(slots=1, max_queue_depth=10, max_wait_seconds=0.05, initial_service_seconds=0)
+    await scheduler.acquire("holder")
+
+    with pytest.raises(AdmissionRejectedError) as rejected:
+        await scheduler.acquire("alice", 1)
+
+    assert rejected.value.reason == REJECT_TIMEOUT
+    assert scheduler.queue_depth == 0
+    scheduler.release()
+    assert scheduler.in_use == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_returns_slot_when_cancelled_waiter_was_already_granted():
+    scheduler = FairScheduler(slots=1, max_queue_depth=10, max_wait_seconds=5)
+    await scheduler.acquire("holder")
+    waiter = asyncio.create_task(scheduler.acquire("alice", 1))
+    await asyncio.sleep(0)
+
+    scheduler.release()
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert scheduler.in_use == 0
+    assert scheduler.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_stats_report_utilization_and_waits():
+    scheduler = FairScheduler(slots=2, max_queue_depth=4, max_wait_seconds=5)
+
+    async with scheduler.slot("alice"):
+        stats = scheduler.stats()
+        assert stats["in_use"] == 1
+        assert stats["utilization"] == 0.5
+        assert stats["admitted"] == 1
+
+    stats = scheduler.stats()
+    assert stats["in_use"] == 0
+    assert stats["queue_depth"] == 0
+    assert stats["avg_wait_seconds"] == 0.0
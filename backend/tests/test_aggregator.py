@@ -0,0 +1,140 @@
+"""Tests for the concurrent multi-provider fan-out."""
+
+import asyncio
+import datetime
+
+import pytest
+
+from app.core.circuit_breaker import STATE_OPEN, CircuitBreaker
+from app.providers.aggregator import AggregatorProvider
+from app.providers.base import BaseProvider
+from app.providers.guarded import CircuitBreakerProvider
+from app.providers.registry import ProviderRegistry
+
+
+class StaticProvider(BaseProvider):
+    def __init__(self, options, delay: float = 0.0, error: Exception = None):
+        self.options = options
+        self.delay = delay
+        self.error = error
+
+    async def get_prices(self, origin, destination, start_date, end_date, travelers):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return [dict(option) for option in self.options]
+
+
+def _option(provider: str, transport_type: str, price: float) -> dict:
+    return {"provider": provider, "transport_type": transport_type, "price": price, "currency": "USD"}
+
+
+async def _quote(aggregator: AggregatorProvider):
+    start = datetime.date.today() + datetime.timedelta(days=10)
+    return await aggregator.get_prices("Berlin", "Paris", start, start + datetime.timedelta(days=3), 2)
+
+
+@pytest.mark.asyncio
+async def test_merges_cheapest_option_per_transport_type():
+    aggregator = AggregatorProvider(
+        providers={
+            "a": StaticProvider([_option("A Air", "flight", 300.0), _option("A Rail", "train", 90.0)]),
+            "b": StaticProvider([_option("B Air", "flight", 250.0), _option("B Bus", "bus", 40.0)]),
+        },
+        deadline_seconds=1.0,
+    )
+
+    options = await _quote(aggregator)
+
+    by_type = {option["transport_type"]: option for option in options}
+    assert by_type["flight"]["provider"] == "B Air"
+    assert by_type["train"]["price"] == 90.0
+    assert by_type["bus"]["price"] == 40.0
+    assert all(option["partial"] is False for option in options)
+
+
+@pytest.mark.asyncio
+async def test_slow_or_failing_providers_yield_partial_results():
+    aggregator = AggregatorProvider(
+        providers={
+            "fast": StaticProvider([_option("Fast Air", "flight", 300.0)]),
+            "slow": StaticProvider([_option("Slow Air", "flight", 100.0)], delay=5.0),
+            "broken": StaticProvider([], error=RuntimeError("boom")),
+        },
+        deadline_seconds=0.2,
+        timeouts={"slow": 0.1},
+    )
+
+    options = await _quote(aggregator)
+
+    assert [option["provider"] for option in options] == ["Fast Air"]
+    assert options[0]["partial"] is True
+
+
+@pytest.mark.asyncio
+async def test_raises_when_no_provider_answers():
+    aggregator = AggregatorProvider(
+        providers={
+            "slow": StaticProvider([_option("Slow Air", "flight", 100.0)], delay=5.0),
+            "broken": StaticProvider([], error=RuntimeError("boom")),
+        },
+        deadline_seconds=0.05,
+    )
+
+    with pytest.raises(RuntimeError) as exc_info:
+        await _quote(aggregator)
+
+    assert "broken: boom" in str(exc_info.value)
+    assert "slow: deadline exceeded" in str(exc_info.value)
+
+
+def test_registry_builds_aggregate_for_multiple_providers():
+    registry = ProviderRegistry(rome2rio_api_key="key", fanout_providers=["rome2rio", "mock"])
+    registry.start()
+
+    assert registry.primary_name() == "aggregate"
+    assert isinstance(registry.primary_provider(), AggregatorProvider)
+    assert set(registry.primary_provider().providers) == {"rome2rio", "mock"}
+
+
+def test_registry_skips_fanout_when_only_one_provider_is_usable():
+    registry = ProviderRegistry(rome2rio_api_key="", fanout_providers=["rome2rio", "mock"])
+    registry.start()
+
+    assert registry.primary_name() == "mock"
+
+
+@pytest.mark.asyncio
+async def test_timed_out_calls_open_the_providers_circuit_breaker():
+    breaker = CircuitBreaker("slow", window_size=4, min_calls=4, failure_rate_threshold=0.5, open_seconds=60)
+    aggregator = AggregatorProvider(
+        providers={
+            "fast": StaticProvider([_option("Fast Air", "flight", 300.0)]),
+            "slow": CircuitBreakerProvider(StaticProvider([_option("Slow Air", "flight", 100.0)], delay=5.0), breaker),
+        },
+        deadline_seconds=0.1,
+        timeouts={"slow": 0.02},
+    )
+
+    for _ in range(4):
+        options = await _quote(aggregator)
+        assert options[0]["partial"] is True
+
+    assert breaker.state == STATE_OPEN
+
+
+@pytest.mark.asyncio
+async def test_calls_past_the_overall_deadline_count_as_failures():
+    breaker = CircuitBreaker("slow", min_calls=1, open_seconds=60)
+    aggregator = AggregatorProvider(
+        providers={
+            "fast": StaticProvider([_option("Fast Air", "flight", 300.0)]),
+            "slow": CircuitBreakerProvider(StaticProvider([_option("Slow Air", "flight", 100.0)], delay=5.0), breaker),
+        },
+        deadline_seconds=0.05,
+    )
+
+    await _quote(aggregator)
+
+    assert breaker.state == STATE_OPEN
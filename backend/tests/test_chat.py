@@ -10,18 +10,46 @@ from sqlmodel import Session, SQLModel, create_engine
 from sqlmodel.pool import StaticPool
 
 from app.auth.security import get_current_user
+from app.core.admission import AdmissionRejectedError
 from app.core.config import settings
 from app.db.session import get_session
 from app.main import app
 from app.models import SavedTrip, User
-from app.services.llm import _extract_ollama_reply, generate_chat_reply
+from app.services.llm import (
+    LLM_PRIORITY_CHAT,
+    LLM_PRIORITY_TRIP,
+    FallbackReply,
+    _extract_ollama_reply,
+    generate_chat_reply,
+    stream_chat_reply,
+)
 
 
 client = TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def reset_chat_cache(monkeypatch):
+    monkeypatch.setattr("app.services.chat_cache._chat_cache", None)
+
+
+@pytest.fixture(autouse=True)
+def reset_ollama_clients(monkeypatch):
+    monkeypatch.setattr("app.services.llm._ollama_clients", {})
+
+
+@pytest.fixture(autouse=True)
+def reset_llm_scheduler(monkeypatch):
+    monkeypatch.setattr("app.services.llm._llm_scheduler", None)
+
+
+@pytest.fixture(autouse=True)
+def reset_ollama_backend_pool(monkeypatch):
+    monkeypatch.setattr("app.services.ollama_backends._backend_pool", None)
+
+
 def test_chat_endpoint_returns_reply(monkeypatch):
-    async def fake_generate_chat_reply(message: str, context):
+    async def fake_generate_chat_reply(message: str, context, **kwargs):
         assert "Tokyo" in message
         assert context == {"destination": "Tokyo", "days": "5"}
         return "Test reply"
@@ -50,6 +78,20 @@ def test_chat_endpoint_validation_error():
     assert response.status_code == 422
 
 
+def test_chat_endpoint_busy_returns_503_with_retry_after(monkeypatch):
+    async def fake_generate_chat_reply(message: str, context, **kwargs):
+        assert kwargs["priority"] == LLM_PRIORITY_CHAT
+        assert kwargs["user_key"].startswith("ip:")
+        raise AdmissionRejectedError("wait_too_long", retry_after=7.2)
+
+    monkeypatch.setattr("app.api.v1.chat.generate_chat_reply", fake_generate_chat_reply)
+
+    response = client.post("/api/v1/chat", json={"message": "Tokyo tips"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "8"
+
+
 def test_chat_endpoint_unsupported_provider_returns_503(monkeypatch):
     original_provider = settings.llm_provider
     monkeypatch.setattr(settings, "llm_provider", "unsupported-provider")
@@ -228,11 +270,12 @@ async def test_generate_chat_reply_applies_guardrails(monkeypatch):
     monkeypatch.setattr(settings, "llm_provider", original_provider)
 
     assert reply == "Guardrails ok"
-    user_message = captured["body"]["messages"][1]["content"]
+    context_message = captured["body"]["messages"][1]["content"]
+    user_message = captured["body"]["messages"][-1]["content"]
     assert "User question: this messa" in user_message
-    assert "destination: tokyo-" in user_message
-    assert "days: 123456" in user_message
-    assert "ignored" not in user_message
+    assert "destination: tokyo-" in context_message
+    assert "days: 123456" in context_message
+    assert "ignored" not in context_message + user_message
 
 
 def test_chat_health_endpoint(monkeypatch):
@@ -261,6 +304,282 @@ def test_extract_ollama_reply_rejects_invalid_payload_shape():
     assert _extract_ollama_reply({"not_message": {"content": "hello"}}) == ""
 
 
+def _parse_sse(text: str):
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class FakeStreamResponse:
+    def __init__(self, lines, status_code=200, error=None):
+        self.lines = lines
+        self.status_code = status_code
+        self.error = error
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            request = httpx.Request("POST", "http://localhost:11434/api/chat")
+            raise httpx.HTTPStatusError("error", request=request, response=self)
+
+    async def aiter_lines(self):
+        for line in self.lines:
+            yield line
+        if self.error is not None:
+            raise self.error
+
+
+def _stream_lines(*tokens):
+    lines = [json.dumps({"message": {"content": token}, "done": False}) for token in tokens]
+    lines.append(json.dumps({"message": {"content": ""}, "done": True}))
+    return lines
+
+
+def test_chat_stream_endpoint_emits_sse_tokens(monkeypatch):
+    async def fake_stream_chat_reply(message: str, context, **kwargs):
+        assert context == {"destination": "Tokyo", "days": "5"}
+        for token in ("Visit ", "Asakusa", "."):
+            yield token
+
+    monkeypatch.setattr("app.api.v1.chat.stream_chat_reply", fake_stream_chat_reply)
+
+    response = client.post(
+        "/api/v1/chat/stream",
+        json={"message": "Tokyo tips", "context": {"destination": "Tokyo", "days": "5"}},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert _parse_sse(response.text) == [
+        ("token", {"content": "Visit "}),
+        ("token", {"content": "Asakusa"}),
+        ("token", {"content": "."}),
+        ("done", {"fallback": False}),
+    ]
+
+
+def test_chat_stream_endpoint_unsupported_provider_returns_503(monkeypatch):
+    monkeypatch.setattr(settings, "llm_provider", "unsupported-provider")
+
+    response = client.post("/api/v1/chat/stream", json={"message": "Plan me a Rome trip"})
+
+    assert response.status_code == 503
+    assert "Unsupported LLM provider" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_stream_chat_reply_retries_before_first_token(monkeypatch):
+    monkeypatch.setattr(settings, "llm_provider", "ollama")
+    monkeypatch.setattr(settings, "llm_retry_attempts", 2)
+    calls = {"count": 0, "body": None}
+
+    class FakeAsyncClient:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, exc_type, exc, tb):
+            return False
+
+        def stream(self, method, url, json=None, **kwargs):
+            calls["count"] += 1
+            calls["body"] = json
+            if calls["count"] == 1:
+                return FakeStreamResponse([], status_code=503)
+            return FakeStreamResponse(_stream_lines("  Hello", " there"))
+
+    async def fake_sleep(_seconds: float):
+        return None
+
+    monkeypatch.setattr("app.services.llm.httpx.AsyncClient", FakeAsyncClient)
+    monkeypatch.setattr("app.services.llm.asyncio.sleep", fake_sleep)
+
+    chunks = [chunk async for chunk in stream_chat_reply("Trip help", {"destination": "Lisbon", "days": "3"})]
+
+    assert calls["count"] == 2
+    assert calls["body"]["stream"] is True
+    assert chunks == ["Hello", " there"]
+
+
+@pytest.mark.asyncio
+async def test_stream_chat_reply_falls_back_when_unreachable(monkeypatch):
+    monkeypatch.setattr(settings, "llm_provider", "ollama")
+    monkeypatch.setattr(settings, "llm_retry_attempts", 1)
+
+    class FakeAsyncClient:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, exc_type, exc, tb):
+            return False
+
+        def stream(self, *args, **kwargs):
+            raise httpx.ConnectError("refused")
+
+    monkeypatch.setattr("app.services.llm.httpx.AsyncClient", FakeAsyncClient)
+
+    chunks = [chunk async for chunk in stream_chat_reply("Trip help", {"destination": "Lisbon", "days": "3"})]
+
+    assert len(chunks) == 1
+    assert isinstance(chunks[0], FallbackReply)
+    assert "trouble reaching the AI model" in chunks[0]
+
+
+@pytest.mark.asyncio
+async def test_stream_chat_reply_does_not_retry_after_first_token(monkeypatch):
+    monkeypatch.setattr(settings, "llm_provider", "ollama")
+    monkeypatch.setattr(settings, "llm_retry_attempts", 3)
+    calls = {"count": 0}
+
+    class FakeAsyncClient:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, exc_type, exc, tb):
+            return False
+
+        def stream(self, *args, **kwargs):
+            calls["count"] += 1
+            return FakeStreamResponse(_stream_lines("Day 1")[:1], error=httpx.ReadTimeout("stalled"))
+
+    monkeypatch.setattr("app.services.llm.httpx.AsyncClient", FakeAsyncClient)
+
+    received = []
+    with pytest.raises(RuntimeError):
+        async for chunk in stream_chat_reply("Plan", None):
+            received.append(chunk)
+
+    assert calls["count"] == 1
+    assert received == ["Day 1"]
+
+
+def _counting_ollama_client(calls, reply="Cached answer", error=None):
+    class FakeResponse:
+        status_code = 200
+
+        def raise_for_status(self):
+            return None
+
+        def json(self):
+            return {"message": {"content": reply}}
+
+    class FakeAsyncClient:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, exc_type, exc, tb):
+            return False
+
+        async def post(self, *args, **kwargs):
+            calls["count"] += 1
+            if error is not None:
+                raise error
+            return FakeResponse()
+
+    return FakeAsyncClient
+
+
+@pytest.mark.asyncio
+async def test_generate_chat_reply_serves_repeated_prompt_from_cache(monkeypatch):
+    monkeypatch.setattr(settings, "llm_provider", "ollama")
+    calls = {"count": 0}
+    monkeypatch.setattr("app.services.llm.httpx.AsyncClient", _counting_ollama_client(calls))
+
+    first = await generate_chat_reply("Best month for Kyoto?", {"destination": "Kyoto", "days": "4"})
+    second = await generate_chat_reply("  Best month for Kyoto?  ", {"destination": "Kyoto", "days": "4"})
+    changed_context = await generate_chat_reply("Best month for Kyoto?", {"destination": "Kyoto", "days": "6"})
+
+    assert first == second == changed_context == "Cached answer"
+    assert calls["count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_generate_chat_reply_never_caches_fallback(monkeypatch):
+    monkeypatch.setattr(settings, "llm_provider", "ollama")
+    monkeypatch.setattr(settings, "llm_retry_attempts", 1)
+    calls = {"count": 0}
+    monkeypatch.setattr(
+        "app.services.llm.httpx.AsyncClient",
+        _counting_ollama_client(calls, error=httpx.ConnectError("refused")),
+    )
+
+    first = await generate_chat_reply("Trip help", {"destination": "Lisbon", "days": "3"})
+    second = await generate_chat_reply("Trip help", {"destination": "Lisbon", "days": "3"})
+
+    assert isinstance(first, FallbackReply)
+    assert isinstance(second, FallbackReply)
+    assert calls["count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_ollama_client_is_reused_across_requests_retries_and_health(monkeypatch):
+    from app.api.v1.chat import _get_chat_provider_health
+
+    monkeypatch.setattr(settings, "llm_provider", "ollama")
+    monkeypatch.setattr(settings, "llm_retry_attempts", 2)
+    created = {"count": 0, "limits": None}
+    calls = {"post": 0}
+
+    class FakeResponse:
+        status_code = 200
+
+        def __init__(self, payload):
+            self.payload = payload
+
+        def raise_for_status(self):
+            return None
+
+        def json(self):
+            return self.payload
+
+    class FakeAsyncClient:
+        def __init__(self, *args, **kwargs):
+            created["count"] += 1
+            created["limits"] = kwargs.get("limits")
+
+        async def post(self, *args, **kwargs):
+            calls["post"] += 1
+            if calls["post"] == 1:
+                raise httpx.ConnectError("cold")
+            return FakeResponse({"message": {"content": f"answer {calls['post']}"}})
+
+        async def get(self, *args, **kwargs):
+            return FakeResponse({"models": [{"name": settings.ollama_model}]})
+
+    async def fake_sleep(_seconds: float):
+        return None
+
+    monkeypatch.setattr("app.services.llm.httpx.AsyncClient", FakeAsyncClient)
+    monkeypatch.setattr("app.services.llm.asyncio.sleep", fake_sleep)
+
+    await generate_chat_reply("First question", None)
+    await generate_chat_reply("Second question", None)
+    health = await _get_chat_provider_health()
+
+    assert calls["post"] == 3
+    assert health["model_available"] is True
+    assert created["count"] == 1
+    assert created["limits"].max_keepalive_connections == settings.llm_max_concurrent_requests + 1
+
+
 @pytest.fixture(name="session")
 def session_fixture():
     engine = create_engine(
@@ -327,7 +646,8 @@ def authed_client_fixture(session: Session):
 def test_chat_from_trip_endpoint_success(monkeypatch, authed_client):
     client, trip_id = authed_client
 
-    async def fake_generate_chat_reply(message: str, context):
+    async def fake_generate_chat_reply(message: str, context, **kwargs):
+        assert kwargs["priority"] == LLM_PRIORITY_TRIP
         assert "itinerary" in message.lower()
         assert context["destination"] == "Tokyo"
         assert context["transport_type"] == "flight"
@@ -0,0 +1,67 @@
+"""Tests for the exact-match chat reply cache."""
+
+import pytest
+
+from app.services.chat_cache import ChatResponseCache, build_chat_cache_key
+
+
+class FakeRedisCache:
+    def __init__(self):
+        self.values = {}
+        self.errors = 0
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ttl_seconds):
+        self.values[key] = value
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+
+    async def close(self):
+        return None
+
+
+def _body(content="User question: hi", model="llama3.1:8b", num_predict=220):
+    return {
+        "model": model,
+        "messages": [{"role": "system", "content": "system"}, {"role": "user", "content": content}],
+        "stream": False,
+        "options": {"num_predict": num_predict, "temperature": 0.3},
+    }
+
+
+def test_cache_key_covers_model_content_and_options_but_not_stream_flag():
+    key = build_chat_cache_key(_body())
+
+    assert key == build_chat_cache_key({**_body(), "stream": True})
+    assert key != build_chat_cache_key(_body(content="User question: hello"))
+    assert key != build_chat_cache_key(_body(model="qwen2.5:3b"))
+    assert key != build_chat_cache_key(_body(num_predict=400))
+
+
+@pytest.mark.asyncio
+async def test_replicas_share_replies_through_redis_tier():
+    shared = FakeRedisCache()
+    replica_a = ChatResponseCache(redis_cache=shared)
+    replica_b = ChatResponseCache(redis_cache=shared)
+
+    await replica_a.set("k", "Visit in April.")
+
+    assert await replica_b.get("k") == "Visit in April."
+    assert await replica_b.get("k") == "Visit in April."
+    assert replica_b.stats()["l2_hits"] == 1
+    assert replica_b.stats()["l1_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_lru_bound_evicts_oldest_reply():
+    cache = ChatResponseCache(max_entries=2)
+
+    for key in ("a", "b", "c"):
+        await cache.set(key, f"reply {key}")
+
+    assert await cache.get("a") is None
+    assert await cache.get("c") == "reply c"
+    assert cache.stats()["evictions"] == 1
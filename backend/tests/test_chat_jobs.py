@@ -0,0 +1,236 @@
+"""Tests for background chat jobs."""
+
+import asyncio
+import json
+from datetime import date, datetime, timedelta, timezone
+
+import httpx
+import pytest
+import pytest_asyncio
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+
+from app.auth.security import get_current_user
+from app.core.admission import AdmissionRejectedError
+from app.core.config import settings
+from app.db.session import get_session
+from app.main import app
+from app.models import ChatJob, SavedTrip, User
+from app.services import chat_jobs
+from app.services.chat_jobs import ChatJobWorkerPool, run_chat_job
+from app.services.llm import LLM_PRIORITY_TRIP
+
+
+@pytest.fixture(name="engine")
+def engine_fixture(monkeypatch):
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr(chat_jobs, "engine", engine)
+    return engine
+
+
+@pytest.fixture(name="users")
+def users_fixture(engine):
+    now = datetime.now(timezone.utc)
+    with Session(engine) as session:
+        owner = User(email="owner@example.com", hashed_password="hashed", created_at=now)
+        other = User(email="other@example.com", hashed_password="hashed", created_at=now)
+        session.add(owner)
+        session.add(other)
+        session.commit()
+        session.refresh(owner)
+        session.refresh(other)
+        trip = SavedTrip(
+            user_id=owner.id,
+            origin="Berlin",
+            destination="Tokyo",
+            start_date=date(2026, 4, 1),
+            end_date=date(2026, 4, 12),
+            travelers=2,
+            transport_type="flight",
+            breakdown_json=json.dumps({"food": 300.0, "misc": 120.0}),
+            total=2400.0,
+            created_at=now,
+        )
+        session.add(trip)
+        session.commit()
+        session.refresh(trip)
+        session.refresh(owner)
+        session.refresh(other)
+        return owner, other, trip.id
+
+
+@pytest_asyncio.fixture(name="jobs")
+async def jobs_fixture(engine, users, monkeypatch):
+    runs = []
+    release = asyncio.Event()
+    release.set()
+
+    async def fake_runner(job):
+        runs.append(job)
+        await release.wait()
+        return f"Plan for {json.loads(job.context_json or '{}').get('destination', 'you')}"
+
+    pool = ChatJobWorkerPool(fake_runner, workers=1, max_pending=2)
+    monkeypatch.setattr("app.services.chat_jobs._job_pool", pool)
+    owner, other, trip_id = users
+    current = {"user": owner}
+
+    def get_session_override():
+        with Session(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_current_user] = lambda: current["user"]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client, pool, runs, release, current, other, trip_id
+    app.dependency_overrides.clear()
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_trip_job_returns_immediately_and_long_poll_gets_reply(jobs):
+    client, _, runs, _, _, _, trip_id = jobs
+
+    created = await client.post("/api/v1/chat/jobs", json={"trip_id": trip_id, "action": "improve_itinerary"})
+    assert created.status_code == 202
+    assert created.json()["status"] == "queued"
+    job_id = created.json()["job_id"]
+
+    result = await client.get(f"/api/v1/chat/jobs/{job_id}", params={"wait": 2})
+
+    data = result.json()
+    assert data["status"] == "succeeded"
+    assert data["reply"] == "Plan for Tokyo"
+    assert data["action"] == "improve_itinerary"
+    assert runs[0].priority == LLM_PRIORITY_TRIP
+    assert "12 day(s)" in runs[0].message
+
+
+@pytest.mark.asyncio
+async def test_job_results_are_private_and_validated(jobs):
+    client, _, _, _, current, other, _ = jobs
+
+    assert (await client.post("/api/v1/chat/jobs", json={"action": "general"})).status_code == 422
+    job_id = (await client.post("/api/v1/chat/jobs", json={"message": "Best month for Kyoto?"})).json()["job_id"]
+
+    current["user"] = other
+    assert (await client.get(f"/api/v1/chat/jobs/{job_id}")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_full_job_queue_returns_503(jobs):
+    client, pool, runs, release, _, _, _ = jobs
+    release.clear()
+
+    statuses = []
+    for index in range(4):
+        response = await client.post("/api/v1/chat/jobs", json={"message": f"Question {index}"})
+        statuses.append(response.status_code)
+        await asyncio.sleep(0)
+
+    assert statuses == [202, 202, 202, 503]
+    assert "Retry-After" in response.headers
+    release.set()
+
+
+@pytest.mark.asyncio
+async def test_abandoned_job_is_reported_failed(jobs, engine):
+    client, _, _, _, current, _, _ = jobs
+    with Session(engine) as session:
+        job = ChatJob(
+            user_id=current["user"].id,
+            message="Plan",
+            status="running",
+            created_at=datetime.now(timezone.utc) - timedelta(seconds=4 * settings.llm_job_timeout_seconds),
+            started_at=datetime.now(timezone.utc) - timedelta(seconds=3 * settings.llm_job_timeout_seconds),
+        )
+        session.add(job)
+        session.commit()
+        job_id = job.id
+
+    data = (await client.get(f"/api/v1/chat/jobs/{job_id}")).json()
+
+    assert data["status"] == "failed"
+    assert data["error"] == "Job did not finish in time."
+
+
+@pytest.mark.asyncio
+async def test_jobs_with_a_live_heartbeat_are_not_expired(jobs, engine, monkeypatch):
+    client, pool, runs, release, current, _, _ = jobs
+    monkeypatch.setattr(settings, "llm_job_heartbeat_seconds", 0.05)
+    release.clear()
+    now = datetime.now(timezone.utc)
+    long_ago = now - timedelta(seconds=3 * settings.llm_job_timeout_seconds)
+    with Session(engine) as session:
+        running = ChatJob(
+            user_id=current["user"].id,
+            message="Plan",
+            status="running",
+            created_at=long_ago,
+            started_at=now,
+            claimed_by="replica-b",
+            heartbeat_at=now,
+        )
+        elsewhere = ChatJob(
+            user_id=current["user"].id, message="Plan", created_at=long_ago, claimed_by="replica-b", heartbeat_at=now
+        )
+        queued = ChatJob(user_id=current["user"].id, message="Plan", created_at=long_ago)
+        lost = ChatJob(
+            user_id=current["user"].id, message="Plan", created_at=long_ago, claimed_by="replica-c", heartbeat_at=long_ago
+        )
+        session.add_all([running, elsewhere, queued, lost])
+        session.commit()
+        running_id, elsewhere_id, queued_id, lost_id = running.id, elsewhere.id, queued.id, lost.id
+
+    busy = (await client.post("/api/v1/chat/jobs", json={"message": "Busy"})).json()["job_id"]
+    await asyncio.sleep(0)
+    pool.submit(queued_id)
+    await asyncio.sleep(0.3)
+    # replica-b is alive and keeps refreshing its jobs; this pool's own loop refreshed ``queued``.
+    with Session(engine) as session:
+        for job_id in (running_id, elsewhere_id):
+            session.get(ChatJob, job_id).heartbeat_at = datetime.now(timezone.utc)
+        session.commit()
+    monkeypatch.setattr("app.services.chat_jobs._job_pool", None)
+
+    assert (await client.get(f"/api/v1/chat/jobs/{running_id}")).json()["status"] == "running"
+    assert (await client.get(f"/api/v1/chat/jobs/{elsewhere_id}")).json()["status"] == "queued"
+    assert (await client.get(f"/api/v1/chat/jobs/{queued_id}")).json()["status"] == "queued"
+    assert (await client.get(f"/api/v1/chat/jobs/{lost_id}")).json()["status"] == "failed"
+    with Session(engine) as session:
+        claimed = session.get(ChatJob, queued_id)
+        assert claimed.claimed_by == pool.owner
+        assert chat_jobs._as_utc(claimed.heartbeat_at) > now + timedelta(seconds=0.1)
+
+    monkeypatch.setattr("app.services.chat_jobs._job_pool", pool)
+    release.set()
+    data = (await client.get(f"/api/v1/chat/jobs/{queued_id}", params={"wait": 2})).json()
+    assert data["status"] == "succeeded"
+    assert [job.id for job in runs] == [busy, queued_id]
+
+
+@pytest.mark.asyncio
+async def test_run_chat_job_waits_out_busy_queue_with_longer_budget(monkeypatch):
+    calls = []
+
+    async def fake_generate_chat_reply(message, context, **kwargs):
+        calls.append(kwargs)
+        if len(calls) == 1:
+            raise AdmissionRejectedError(reason="queue_full", retry_after=0.01)
+        return "Done"
+
+    monkeypatch.setattr("app.services.chat_jobs.generate_chat_reply", fake_generate_chat_reply)
+    monkeypatch.setattr("app.services.chat_jobs._POLL_INTERVAL_SECONDS", 0.01)
+
+    job = ChatJob(id="job1", user_id=1, message="Plan 14 days", trip_id=3, priority=LLM_PRIORITY_TRIP)
+
+    assert await run_chat_job(job) == "Done"
+    assert len(calls) == 2
+    assert calls[-1]["timeout_seconds"] == settings.llm_job_timeout_seconds
+    assert calls[-1]["prefix_key"] == "trip:3"
@@ -0,0 +1,201 @@
+"""Tests for server-side chat sessions and history compaction."""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+
+from app.auth.security import get_optional_current_user
+from app.core.config import settings
+from app.db.session import get_session
+from app.main import app
+from app.models import ChatTurn, User
+from app.services import chat_sessions
+from app.services.chat_sessions import (
+    create_chat_session,
+    estimate_tokens,
+    get_chat_session,
+    load_history,
+    record_exchange,
+    split_history,
+    summarize_session,
+)
+from app.services.llm import _build_ollama_body
+
+
+@pytest.fixture(name="engine")
+def engine_fixture(monkeypatch):
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr(chat_sessions, "engine", engine)
+    monkeypatch.setattr(chat_sessions, "_summaries_in_flight", set())
+    monkeypatch.setattr(settings, "llm_history_token_budget", 60)
+    monkeypatch.setattr(settings, "llm_summary_min_turns", 2)
+    return engine
+
+
+@pytest.fixture(name="session_client")
+def session_client_fixture(engine):
+    def get_session_override():
+        with Session(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_session_override
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def _turns(*contents):
+    return [ChatTurn(session_id="s", role="user", content=content) for content in contents]
+
+
+def test_split_history_keeps_newest_turns_within_budget():
+    turns = _turns("a" * 80, "b" * 40, "c" * 40)
+
+    older, recent = split_history(turns, budget_tokens=2 * estimate_tokens("b" * 40))
+
+    assert [turn.content[0] for turn in older] == ["a"]
+    assert [turn.content[0] for turn in recent] == ["b", "c"]
+    assert split_history(turns, budget_tokens=0) == (turns, [])
+
+
+def test_history_stays_within_budget_as_the_conversation_grows(engine):
+    with Session(engine) as db:
+        chat_session = create_chat_session(db, {"destination": "Lisbon"})
+        overflow = 0
+        for index in range(10):
+            overflow = record_exchange(db, chat_session, f"question {index} " + "x" * 40, f"answer {index} " + "y" * 40)
+
+        history = load_history(db, chat_session)
+
+    assert overflow > 0
+    assert history.turns[-1]["content"].startswith("answer 9")
+    assert sum(estimate_tokens(turn["content"]) for turn in history.turns) <= settings.llm_history_token_budget
+
+
+@pytest.mark.asyncio
+async def test_summary_folds_older_turns_and_shrinks_the_prompt(engine):
+    seen = {}
+
+    async def fake_summarizer(previous_summary, turns):
+        seen["previous"] = previous_summary
+        seen["turns"] = turns
+        return "User is planning 4 days in Lisbon on a tight budget."
+
+    with Session(engine) as db:
+        chat_session = create_chat_session(db)
+        for index in range(6):
+            record_exchange(db, chat_session, f"question {index} " + "x" * 40, f"answer {index} " + "y" * 40)
+        session_id = chat_session.id
+
+    await summarize_session(session_id, fake_summarizer)
+
+    with Session(engine) as db:
+        chat_session = get_chat_session(db, session_id)
+        history = load_history(db, chat_session)
+
+    assert seen["previous"] == ""
+    assert seen["turns"][0]["content"].startswith("question 0")
+    assert chat_session.summarized_turns == len(seen["turns"])
+    assert history.summary.startswith("User is planning")
+
+    body = _build_ollama_body("What next?", None, stream=False, history=history)
+    roles = [message["role"] for message in body["messages"]]
+    assert roles[:2] == ["system", "system"]
+    assert "Summary of the earlier conversation" in body["messages"][1]["content"]
+    assert len(body["messages"]) == 3 + len(history.turns)
+
+
+def test_chat_endpoint_continues_session_with_history(session_client, monkeypatch):
+    calls = []
+
+    async def fake_generate_chat_reply(message, context, **kwargs):
+        calls.append((message, context, kwargs["history"]))
+        return f"reply to {message}"
+
+    async def fake_summarizer(previous_summary, turns):
+        return "summary"
+
+    monkeypatch.setattr("app.api.v1.chat.generate_chat_reply", fake_generate_chat_reply)
+    monkeypatch.setattr("app.api.v1.chat.summarize_conversation", fake_summarizer)
+
+    created = session_client.post("/api/v1/chat/sessions", json={"context": {"destination": "Porto"}})
+    assert created.status_code == 201
+    session_id = created.json()["session_id"]
+
+    first = session_client.post("/api/v1/chat", json={"message": "Plan day 1", "session_id": session_id})
+    second = session_client.post("/api/v1/chat", json={"message": "And day 2?", "session_id": session_id})
+
+    assert first.json()["session_id"] == session_id
+    assert second.json()["reply"] == "reply to And day 2?"
+    assert calls[0][1] == {"destination": "Porto"}
+    assert calls[0][2].turns == []
+    assert calls[1][2].turns == [
+        {"role": "user", "content": "Plan day 1"},
+        {"role": "assistant", "content": "reply to Plan day 1"},
+    ]
+
+    detail = session_client.get(f"/api/v1/chat/sessions/{session_id}").json()
+    assert [turn["role"] for turn in detail["turns"]] == ["user", "assistant", "user", "assistant"]
+
+
+def test_chat_endpoint_unknown_session_returns_404(session_client):
+    response = session_client.post("/api/v1/chat", json={"message": "Hi there", "session_id": "missing"})
+
+    assert response.status_code == 404
+    assert session_client.get("/api/v1/chat/sessions/missing").status_code == 404
+
+
+def test_signed_in_sessions_are_private_to_their_owner(session_client, monkeypatch):
+    async def fake_generate_chat_reply(message, context, **kwargs):
+        return f"reply to {message}"
+
+    monkeypatch.setattr("app.api.v1.chat.generate_chat_reply", fake_generate_chat_reply)
+    owner = User(id=1, email="owner@example.com", hashed_password="hashed")
+    other = User(id=2, email="other@example.com", hashed_password="hashed")
+    current = {"user": owner}
+    app.dependency_overrides[get_optional_current_user] = lambda: current["user"]
+
+    session_id = session_client.post("/api/v1/chat/sessions", json={}).json()["session_id"]
+    assert session_client.get(f"/api/v1/chat/sessions/{session_id}").status_code == 200
+
+    for intruder in (other, None):
+        current["user"] = intruder
+        assert session_client.get(f"/api/v1/chat/sessions/{session_id}").status_code == 404
+        continued = session_client.post("/api/v1/chat", json={"message": "Hi there", "session_id": session_id})
+        assert continued.status_code == 404
+
+    current["user"] = owner
+    assert session_client.get(f"/api/v1/chat/sessions/{session_id}").json()["turns"] == []
+
+
+@pytest.mark.asyncio
+async def test_schedule_summary_runs_once_per_session(engine):
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_summarizer(previous_summary, turns):
+        started.set()
+        await release.wait()
+        return "summary"
+
+    with Session(engine) as db:
+        chat_session = create_chat_session(db)
+        for index in range(6):
+            overflow = record_exchange(db, chat_session, "x" * 60, "y" * 60)
+        session_id = chat_session.id
+
+    assert chat_sessions.schedule_summary(session_id, overflow, slow_summarizer) is True
+    assert chat_sessions.schedule_summary(session_id, overflow, slow_summarizer) is False
+    await started.wait()
+    release.set()
+    await asyncio.gather(*chat_sessions._summary_tasks)
+
+    with Session(engine) as db:
+        assert get_chat_session(db, session_id).summary == "summary"
@@ -0,0 +1,179 @@
+"""Tests for provider circuit breakers and estimated-price fallback."""
+
+import asyncio
+import datetime
+
+import httpx
+import pytest
+
+from app.core.circuit_breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    InMemoryBreakerStateStore,
+)
+from app.exceptions import ProviderException
+from app.providers.guarded import CircuitBreakerProvider
+from app.providers.registry import ProviderRegistry
+from app.schemas import TripRequest
+from app.services import pricing
+from app.services.quote_cache import TransportQuoteCache
+
+
+def _trip() -> TripRequest:
+    start = datetime.date.today() + datetime.timedelta(days=10)
+    return TripRequest(
+        origin="Berlin",
+        destination="Paris",
+        start_date=start,
+        end_date=start + datetime.timedelta(days=3),
+        travelers=2,
+    )
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_on_error_rate_and_recovers_through_half_open():
+    breaker = CircuitBreaker("rome2rio", window_size=4, min_calls=4, failure_rate_threshold=0.5, open_seconds=0.05)
+
+    for success in (True, False, True, False):
+        await breaker.allow_request()
+        await breaker.record(success, 0.01)
+
+    assert breaker.state == STATE_OPEN
+    with pytest.raises(CircuitOpenError):
+        await breaker.allow_request()
+
+    await asyncio.sleep(0.06)
+    assert breaker.state == STATE_HALF_OPEN
+    await breaker.allow_request()
+    with pytest.raises(CircuitOpenError):
+        await breaker.allow_request()
+
+    await breaker.record(True, 0.01)
+    assert breaker.state == STATE_CLOSED
+    assert breaker.stats()["opened"] == 1
+    assert breaker.stats()["rejected"] == 2
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_on_slow_calls():
+    breaker = CircuitBreaker("rome2rio", min_calls=2, slow_call_seconds=1.0, slow_call_rate_threshold=1.0)
+
+    await breaker.record(True, 2.0)
+    assert breaker.state == STATE_CLOSED
+    await breaker.record(True, 3.0)
+
+    assert breaker.state == STATE_OPEN
+
+
+@pytest.mark.asyncio
+async def test_open_state_is_shared_through_store():
+    store = InMemoryBreakerStateStore()
+    replica_a = CircuitBreaker("rome2rio", min_calls=1, store=store)
+    replica_b = CircuitBreaker("rome2rio", min_calls=1, store=store, shared_check_interval_seconds=0)
+
+    await replica_a.record(False, 0.01)
+
+    with pytest.raises(CircuitOpenError):
+        await replica_b.allow_request()
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_serves_last_cached_price_as_estimated(monkeypatch):
+    upstream = {"healthy": True}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if not upstream["healthy"]:
+            return httpx.Response(500, json={"error": "down"})
+        return httpx.Response(
+            200,
+            json={"routes": [{"name": "Fly", "indicativePrice": {"price": 120.0, "currency": "USD"}}]},
+        )
+
+    registry = ProviderRegistry(
+        rome2rio_api_key="test-key",
+        transport=httpx.MockTransport(handler),
+        breaker_options={"min_calls": 2, "failure_rate_threshold": 0.5, "open_seconds": 60},
+    )
+    registry.start()
+    cache = TransportQuoteCache(default_ttl_seconds=0, stale_while_revalidate_seconds=0, negative_ttl_seconds=0)
+    monkeypatch.setattr(pricing, "get_provider_registry", lambda: registry)
+    monkeypatch.setattr(pricing, "get_quote_cache", lambda: cache)
+    monkeypatch.setattr(pricing.settings, "quote_cache_enabled", True)
+
+    first = await pricing.get_transport_options(_trip())
+    assert [option.estimated for option in first] == [False]
+
+    upstream["healthy"] = False
+    with pytest.raises(ProviderException):
+        await pricing.get_transport_options(_trip())
+    assert registry.breaker_stats()["rome2rio"]["state"] == STATE_OPEN
+
+    estimated = await pricing.get_transport_options(_trip())
+    assert [(option.price, option.estimated) for option in estimated] == [(first[0].price, True)]
+
+    await registry.close()
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_without_cached_price_uses_mock_provider(monkeypatch):
+    registry = ProviderRegistry(
+        rome2rio_api_key="test-key",
+        transport=httpx.MockTransport(lambda request: httpx.Response(503)),
+        breaker_options={"min_calls": 1, "open_seconds": 60},
+    )
+    registry.start()
+    monkeypatch.setattr(pricing, "get_provider_registry", lambda: registry)
+    monkeypatch.setattr(pricing.settings, "quote_cache_enabled", False)
+
+    with pytest.raises(ProviderException):
+        await pricing.get_transport_options(_trip())
+
+    estimated = await pricing.get_transport_options(_trip())
+    mock_prices = await registry.get("mock").get_prices(
+        "Berlin", "Paris", _trip().start_date, _trip().end_date, 2
+    )
+
+    assert [option.price for option in estimated] == [info["price"] for info in mock_prices]
+    assert all(option.estimated for option in estimated)
+
+    await registry.close()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_calls_are_not_recorded_as_failures():
+    class HangingProvider:
+        name = "rome2rio"
+
+        async def get_prices(self, *args):
+            await asyncio.sleep(60)
+
+    breaker = CircuitBreaker("rome2rio", min_calls=1, open_seconds=0)
+    provider = CircuitBreakerProvider(HangingProvider(), breaker)
+    trip = _trip()
+
+    for _ in range(3):
+        task = asyncio.create_task(
+            provider.get_prices(trip.origin, trip.destination, trip.start_date, trip.end_date, trip.travelers)
+        )
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    assert breaker.state == STATE_CLOSED
+    assert breaker.stats()["window_calls"] == 0
+
+    await breaker.record(False, 0.01)
+    task = asyncio.create_task(
+        provider.get_prices(trip.origin, trip.destination, trip.start_date, trip.end_date, trip.travelers)
+    )
+    await asyncio.sleep(0)
+    assert breaker.state == STATE_HALF_OPEN
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    await breaker.allow_request()
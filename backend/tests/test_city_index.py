@@ -0,0 +1,130 @@
+"""Tests for the in-memory CityStats index."""
+
+import pytest
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+
+from app.models import CityStats
+from app.services.city_index import CityStatsIndex, get_city_stats_index, normalize_city_name
+from app.services.pricing import get_city_stats
+
+
+@pytest.fixture(name="session")
+def session_fixture():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(
+            CityStats(
+                city="São Paulo",
+                country="Brazil",
+                avg_accommodation_per_night=80.0,
+                avg_food_per_day=25.0,
+                avg_misc_per_day=10.0,
+            )
+        )
+        session.add(
+            CityStats(
+                city="Zürich",
+                country="Switzerland",
+                avg_accommodation_per_night=210.0,
+                avg_food_per_day=70.0,
+                avg_misc_per_day=30.0,
+            )
+        )
+        session.commit()
+        yield session
+
+
+class NoQuerySession:
+    def exec(self, *args, **kwargs):
+        raise AssertionError("index lookups must not hit the database")
+
+
+def test_normalize_city_name_folds_case_accents_and_spaces():
+    assert normalize_city_name("  São   PAULO ") == "sao paulo"
+    assert normalize_city_name("Zürich") == normalize_city_name("zurich")
+    assert normalize_city_name("STRASSE") == normalize_city_name("straße")
+
+
+def test_index_lookup_is_case_and_accent_insensitive(session: Session):
+    index = CityStatsIndex(ttl_seconds=300)
+    index.load(session)
+
+    assert index.lookup("sao paulo").avg_accommodation_per_night == 80.0
+    assert index.lookup("ZURICH").country == "Switzerland"
+    assert index.lookup("Atlantis") is None
+
+
+def test_reload_swaps_snapshot_without_mutating_previous(session: Session):
+    index = CityStatsIndex(ttl_seconds=300)
+    first = index.load(session)
+
+    session.add(
+        CityStats(
+            city="Lima",
+            country="Peru",
+            avg_accommodation_per_night=60.0,
+            avg_food_per_day=20.0,
+            avg_misc_per_day=8.0,
+        )
+    )
+    session.commit()
+    second = index.load(session)
+
+    assert "lima" not in first.entries
+    assert "lima" in second.entries
+    with pytest.raises(TypeError):
+        first.entries["lima"] = second.entries["lima"]
+
+
+def test_city_writes_bump_version_and_ttl_expires(session: Session, monkeypatch):
+    index = CityStatsIndex(ttl_seconds=60)
+    index.load(session)
+    assert index.needs_reload() is False
+
+    index.bump_version()
+    assert index.needs_reload() is True
+
+    index.load(session)
+    clock = {"now": index._snapshot.loaded_at + 61}
+    monkeypatch.setattr("app.services.city_index.monotonic", lambda: clock["now"])
+    assert index.needs_reload() is True
+
+
+def test_get_city_stats_reads_fresh_index_without_queries(session: Session):
+    get_city_stats(city="Zurich", session=session)
+
+    entry = get_city_stats("zürich", NoQuerySession())
+
+    assert entry is not None
+    assert entry.avg_food_per_day == 70.0
+    assert get_city_stats_index().needs_reload() is False
+
+
+def test_version_bumps_on_commit_not_flush(session: Session):
+    index = get_city_stats_index()
+    start = index.version
+
+    lima = CityStats(
+        city="Lima",
+        country="Peru",
+        avg_accommodation_per_night=60.0,
+        avg_food_per_day=20.0,
+        avg_misc_per_day=8.0,
+    )
+    session.add(lima)
+    session.flush()
+    assert index.version == start
+
+    session.rollback()
+    session.commit()
+    assert index.version == start
+
+    session.add(lima)
+    session.commit()
+    assert index.version == start + 1
@@ -0,0 +1,90 @@
+"""Tests for intent-based generation budgets."""
+
+import pytest
+
+from app.core.config import settings
+from app.services import llm
+
+TRIP_CONTEXT = {"destination": "Tokyo", "days": "12", "budget": "2400.00"}
+
+
+def _options(message, context=None):
+    return llm._build_ollama_body(message, context, stream=False)["options"]
+
+
+@pytest.fixture(autouse=True)
+def budget_settings(monkeypatch):
+    monkeypatch.setattr(settings, "llm_max_tokens", 220)
+    monkeypatch.setattr(settings, "llm_itinerary_base_tokens", 200)
+    monkeypatch.setattr(settings, "llm_itinerary_tokens_per_day", 120)
+    monkeypatch.setattr(settings, "llm_itinerary_max_tokens", 2400)
+    monkeypatch.setattr(settings, "llm_num_ctx", 8192)
+
+
+def test_short_answers_get_small_budgets():
+    dish = _options("What is one famous dish in Tokyo?", TRIP_CONTEXT)
+    general = _options("Is Tokyo safe at night?", TRIP_CONTEXT)
+
+    assert dish["num_predict"] == 80
+    assert "stop" not in dish
+    assert general["num_predict"] == 220
+    assert "stop" not in general
+
+
+def test_itinerary_budget_grows_with_requested_days():
+    weekend = _options("Plan a 2-day itinerary", TRIP_CONTEXT)
+    from_trip = _options("Improve my itinerary for Tokyo", TRIP_CONTEXT)
+    two_weeks = _options("Give me a day-wise plan for two weeks")
+    month = _options("Plan a 30-day itinerary")
+
+    assert weekend["num_predict"] == 440
+    assert weekend["stop"] == ["Day 3"]
+    assert from_trip["num_predict"] == 200 + 120 * 12
+    assert two_weeks["num_predict"] == 200 + 120 * 14
+    assert two_weeks["stop"] == ["Day 15"]
+    assert month["num_predict"] == 2400
+
+
+def test_stop_sequence_follows_the_itinerary_length():
+    rome = _options("Plan a 2 night stay in Rome")
+    paris = _options("I fly out in 2 days, plan my 5-day Paris trip")
+    rome_days = _options("Plan 4 days in Rome")
+
+    assert rome["stop"] == ["Day 4"]
+    assert paris["stop"] == ["Day 6"]
+    assert paris["num_predict"] == 200 + 120 * 5
+    assert rome_days["stop"] == ["Day 5"]
+
+
+def test_no_stop_sequence_for_a_day_the_message_asks_about():
+    context = dict(TRIP_CONTEXT, days="3")
+
+    day_four = _options("What can I do on day 4?", context)
+    day_two = _options("What can I do on day 2?", context)
+
+    assert "stop" not in day_four
+    assert day_two["stop"] == ["Day 4"]
+
+
+def test_every_request_sends_the_same_context_window():
+    bodies = [
+        _options("Thanks!"),
+        _options("What is one famous dish in Tokyo?", TRIP_CONTEXT),
+        _options("Plan a 30-day itinerary"),
+        _options("Improve my itinerary for Tokyo " + "with lots of detail " * 2000, TRIP_CONTEXT),
+    ]
+
+    assert {options["num_ctx"] for options in bodies} == {8192}
+
+
+def test_completion_log_reports_tokens_per_intent():
+    body = llm._build_ollama_body("Plan a 3-day itinerary", TRIP_CONTEXT, stream=False)
+
+    fields = llm._generation_log_fields(
+        "Plan a 3-day itinerary", body, {"eval_count": 560, "prompt_eval_count": 90, "done_reason": "length"}
+    )
+
+    assert fields["intent"] == llm.INTENT_ITINERARY
+    assert fields["num_predict"] == 560
+    assert fields["eval_count"] == 560
+    assert fields["truncated"] is True
@@ -0,0 +1,79 @@
+"""Tests for the local chat fast path."""
+
+import pytest
+
+from app.core.config import settings
+from app.services import llm
+from app.services.intent_router import IntentRouter
+
+
+@pytest.fixture(autouse=True)
+def reset_intent_router(monkeypatch):
+    monkeypatch.setattr("app.services.intent_router._intent_router", None)
+
+
+@pytest.mark.parametrize(
+    "message,intent",
+    [
+        ("Thanks!", "gratitude"),
+        ("thank you so much", "gratitude"),
+        ("Bye bye", "farewell"),
+        ("ok.", "acknowledgement"),
+        ("Sounds good!!", "acknowledgement"),
+        ("Hello there", "greeting"),
+    ],
+)
+def test_router_matches_casual_messages(message, intent):
+    answer = IntentRouter().route(message, {"destination": "Lisbon"})
+
+    assert answer is not None
+    assert answer.intent == intent
+    assert answer.reply
+
+
+@pytest.mark.parametrize(
+    "message",
+    ["Thanks, what should I eat in Rome?", "ok so plan day 2", "Is it good to visit Kyoto in June?"],
+)
+def test_router_leaves_real_questions_to_the_llm(message):
+    assert IntentRouter().route(message, None) is None
+
+
+def test_router_declines_budget_question_without_budget_in_context():
+    router = IntentRouter()
+
+    assert router.route("What's my budget?", None) is None
+    answer = router.route("What's my budget?", {"destination": "Lisbon", "budget": "1250.00"})
+    assert answer.reply == "Your estimated budget for the Lisbon trip is 1250.00."
+
+
+def test_router_accepts_custom_intents_and_reports_hit_rate():
+    router = IntentRouter()
+    router.register("visa", r"^do i need a visa\??$", lambda message, context: "Check your government's travel advice.")
+
+    assert router.route("Do I need a visa?", None).intent == "visa"
+    assert router.route("thanks", None).intent == "gratitude"
+    assert router.route("Plan 3 days in Porto", None) is None
+
+    stats = router.stats()
+    assert stats["requests"] == 3
+    assert stats["hits"] == 2
+    assert stats["hit_rate"] == pytest.approx(0.6667)
+    assert stats["hits_by_intent"] == {"visa": 1, "gratitude": 1}
+
+
+@pytest.mark.asyncio
+async def test_casual_message_never_reaches_queue_or_provider(monkeypatch):
+    monkeypatch.setattr(settings, "llm_fast_path_enabled", True)
+
+    async def fail_acquire(*args, **kwargs):
+        raise AssertionError("fast-path messages must not queue for the LLM")
+
+    monkeypatch.setattr("app.services.llm._acquire_llm_slot", fail_acquire)
+
+    reply = await llm.generate_chat_reply("Thanks a lot!", {"destination": "Lisbon"})
+    chunks = [chunk async for chunk in llm.stream_chat_reply("bye", None)]
+
+    assert "Lisbon" in reply
+    assert len(chunks) == 1
+    assert llm.get_intent_router().stats()["hits"] == 2
@@ -0,0 +1,50 @@
+"""Tests for the itinerary stop-order solvers."""
+
+import math
+import random
+from itertools import permutations
+
+from app.services.itinerary import solve_stop_order, tour_cost
+
+
+def _random_costs(n: int, seed: int):
+    rng = random.Random(seed)
+    return [[0.0 if a == b else round(rng.uniform(20, 400), 2) for b in range(n + 1)] for a in range(n + 1)]
+
+
+def _distance_costs(n: int, seed: int):
+    """Prices growing with distance between random points, like real route prices."""
+    rng = random.Random(seed)
+    points = [(rng.uniform(0, 100), rng.uniform(0, 100)) for _ in range(n + 1)]
+    return [[0.0 if a == b else round(20 + 3 * math.dist(points[a], points[b]), 2) for b in range(n + 1)] for a in range(n + 1)]
+
+
+def _brute_force(costs):
+    n = len(costs) - 1
+    return min(tour_cost(costs, perm) for perm in permutations(range(1, n + 1)))
+
+
+def test_exact_solver_matches_brute_force():
+    for seed in range(5):
+        costs = _random_costs(7, seed)
+
+        order, solver = solve_stop_order(costs, exact_max_stops=10)
+
+        assert solver == "exact"
+        assert sorted(order) == list(range(1, 8))
+        assert tour_cost(costs, order) == _brute_force(costs)
+
+
+def test_heuristic_solver_returns_valid_near_optimal_tour():
+    for seed in range(5):
+        costs = _distance_costs(8, seed)
+
+        order, solver = solve_stop_order(costs, exact_max_stops=4)
+
+        assert solver == "heuristic"
+        assert sorted(order) == list(range(1, 9))
+        assert tour_cost(costs, order) <= 1.02 * _brute_force(costs)
+
+
+def test_single_stop():
+    assert solve_stop_order([[0.0, 10.0], [12.0, 0.0]], exact_max_stops=10) == ([1], "exact")
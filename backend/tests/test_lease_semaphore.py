@@ -0,0 +1,149 @@
+"""Tests for the cluster-wide LLM concurrency limit."""
+
+import asyncio
+
+import pytest
+
+from app.core import lease_semaphore
+from app.core.admission import AdmissionRejectedError
+from app.core.config import settings
+from app.core.lease_semaphore import InMemoryLeaseSemaphore, RedisLeaseSemaphore
+from app.services import llm
+
+
+class FakeLeaseRedis:
+    """Evaluates the acquire/renew scripts against in-process sorted sets."""
+
+    def __init__(self) -> None:
+        self.now_ms = 0
+        self.zsets = {}
+
+    async def eval(self, script, _numkeys, key, *args):
+        zset = self.zsets.setdefault(key, {})
+        if script == lease_semaphore._ACQUIRE_SCRIPT:
+            limit, lease_ms, token = int(args[0]), int(args[1]), args[2]
+            for member, expires in list(zset.items()):
+                if expires <= self.now_ms:
+                    del zset[member]
+            if len(zset) < limit:
+                zset[token] = self.now_ms + lease_ms
+                return 1
+            return 0
+        lease_ms, token = int(args[0]), args[1]
+        if zset.get(token, -1) > self.now_ms:
+            zset[token] = self.now_ms + lease_ms
+            return 1
+        return 0
+
+    async def zrem(self, key, token):
+        self.zsets.get(key, {}).pop(token, None)
+
+    async def aclose(self):
+        return None
+
+
+def _redis_semaphore(client, lease_seconds: float = 30) -> RedisLeaseSemaphore:
+    semaphore = RedisLeaseSemaphore(
+        redis_url="redis://localhost:6379/0",
+        key_prefix="test:llm_sem",
+        lease_seconds=lease_seconds,
+        connect_timeout_seconds=0.1,
+        socket_timeout_seconds=0.1,
+        poll_interval_seconds=0.01,
+    )
+    semaphore._client = client
+    return semaphore
+
+
+@pytest.mark.asyncio
+async def test_in_memory_lease_semaphore_limits_and_wakes_waiters():
+    semaphore = InMemoryLeaseSemaphore()
+    first = await semaphore.acquire("ollama", 1, timeout=1)
+    assert first is not None
+    assert await semaphore.acquire("ollama", 1, timeout=0.01) is None
+
+    waiter = asyncio.create_task(semaphore.acquire("ollama", 1, timeout=1))
+    await asyncio.sleep(0)
+    await semaphore.release("ollama", first)
+
+    assert await waiter is not None
+    assert semaphore.stats()["held"] == {"ollama": 1}
+
+
+@pytest.mark.asyncio
+async def test_redis_lease_semaphore_limit_is_shared_by_replicas():
+    shared = FakeLeaseRedis()
+    replica_a = _redis_semaphore(shared)
+    replica_b = _redis_semaphore(shared)
+
+    token = await replica_a.acquire("http://gpu:11434", 1, timeout=1)
+    assert token is not None
+    assert await replica_b.acquire("http://gpu:11434", 1, timeout=0.03) is None
+
+    await replica_a.release("http://gpu:11434", token)
+    assert await replica_b.acquire("http://gpu:11434", 1, timeout=0.03) is not None
+    assert replica_b.stats()["timeouts"] == 1
+
+    await replica_a.close()
+    await replica_b.close()
+
+
+@pytest.mark.asyncio
+async def test_redis_lease_of_crashed_worker_expires():
+    shared = FakeLeaseRedis()
+    crashed = _redis_semaphore(shared, lease_seconds=5)
+    survivor = _redis_semaphore(shared, lease_seconds=5)
+
+    assert await crashed.acquire("ollama", 1, timeout=1) is not None
+    for renewal in crashed._renewals.values():
+        renewal.cancel()  # the worker died: nobody renews or releases its lease
+
+    assert await survivor.acquire("ollama", 1, timeout=0.03) is None
+    shared.now_ms += 5001
+    assert await survivor.acquire("ollama", 1, timeout=0.03) is not None
+
+    await survivor.close()
+
+
+@pytest.mark.asyncio
+async def test_redis_lease_semaphore_falls_back_to_local_limit_when_unreachable():
+    semaphore = RedisLeaseSemaphore(
+        redis_url="redis://127.0.0.1:1/0",
+        key_prefix="test:llm_sem",
+        lease_seconds=30,
+        connect_timeout_seconds=0.1,
+        socket_timeout_seconds=0.1,
+    )
+
+    token = await semaphore.acquire("ollama", 1, timeout=0.2)
+    assert token is not None
+    assert await semaphore.acquire("ollama", 1, timeout=0.05) is None
+
+    await semaphore.release("ollama", token)
+    assert await semaphore.acquire("ollama", 1, timeout=0.05) is not None
+    stats = semaphore.stats()
+    assert stats["fallbacks"] == 2
+    assert stats["errors"] >= 2
+
+    await semaphore.close()
+
+
+@pytest.mark.asyncio
+async def test_generate_chat_reply_respects_per_backend_cluster_limit(monkeypatch):
+    monkeypatch.setattr(settings, "llm_cluster_limit_enabled", True)
+    monkeypatch.setattr(settings, "llm_cluster_backend_limits", {settings.ollama_base_url.rstrip("/").lower(): 1.0})
+    monkeypatch.setattr(settings, "llm_queue_wait_timeout_seconds", 1)
+    monkeypatch.setattr(settings, "chat_cache_enabled", False)
+    monkeypatch.setattr("app.services.llm._llm_scheduler", None)
+    semaphore = InMemoryLeaseSemaphore()
+    monkeypatch.setattr("app.services.llm._cluster_semaphore", semaphore)
+
+    # Another replica holds the only cluster-wide permit for this backend.
+    other_replica = await semaphore.acquire(settings.ollama_base_url.rstrip("/"), 1, timeout=1)
+
+    with pytest.raises(AdmissionRejectedError) as rejected:
+        await llm.generate_chat_reply("Trip help", None)
+
+    assert rejected.value.reason == llm.REJECT_CLUSTER_BUSY
+    assert llm.get_llm_scheduler().in_use == 0
+    await semaphore.release(settings.ollama_base_url.rstrip("/"), other_replica)
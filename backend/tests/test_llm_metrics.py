@@ -0,0 +1,92 @@
+"""Tests for Ollama generation timing and token histograms."""
+
+import pytest
+
+from app.core.config import settings
+from app.services import llm
+from app.services.llm_metrics import GenerationMetrics, Histogram, OllamaTimings
+from app.services.ollama_backends import OllamaBackendPool
+
+GPU_A = "http://gpu-a:11434"
+
+TIMED_PAYLOAD = {
+    "message": {"content": "Day 1: Alfama."},
+    "load_duration": 5_000_000,
+    "prompt_eval_count": 400,
+    "prompt_eval_duration": 200_000_000,
+    "eval_count": 120,
+    "eval_duration": 3_000_000_000,
+}
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        return None
+
+    def json(self):
+        return self.payload
+
+
+class FakeClient:
+    async def post(self, url, json=None, **kwargs):
+        return FakeResponse(TIMED_PAYLOAD)
+
+
+def test_histogram_reports_cumulative_buckets_and_percentiles():
+    histogram = Histogram((10, 100, 1000))
+    for value in (5, 50, 60, 70, 5000):
+        histogram.observe(value)
+
+    stats = histogram.stats()
+
+    assert stats["buckets"] == {"le_10": 1, "le_100": 4, "le_1000": 4, "le_inf": 5}
+    assert stats["p50"] == 100
+    assert stats["p95"] == 5000
+    assert stats["mean"] == 1037.0
+
+
+def test_ollama_timings_are_parsed_to_milliseconds():
+    timings = OllamaTimings.from_payload({**TIMED_PAYLOAD, "load_duration": "n/a"})
+
+    assert timings.load_ms is None
+    assert timings.prompt_eval_ms == 200.0
+    assert timings.eval_count == 120
+    assert timings.eval_ms == 3000.0
+
+
+def test_series_are_labeled_and_bounded():
+    metrics = GenerationMetrics(max_series=2)
+    metrics.record("m", "general", "chat", TIMED_PAYLOAD, queue_wait_ms=10, end_to_end_ms=3300)
+    metrics.record("m", "itinerary", "from_trip", TIMED_PAYLOAD, queue_wait_ms=0, end_to_end_ms=3200)
+    metrics.record("m", "summary", "summary", TIMED_PAYLOAD, queue_wait_ms=0, end_to_end_ms=3200)
+
+    labels = [series["labels"]["intent"] for series in metrics.stats()["series"]]
+
+    assert labels == ["itinerary", "summary"]
+
+
+@pytest.mark.asyncio
+async def test_generation_records_timings_under_intent_and_endpoint(monkeypatch):
+    metrics = GenerationMetrics()
+    pool = OllamaBackendPool({GPU_A: 2}, model=settings.ollama_model, health_check_interval_seconds=0)
+    monkeypatch.setattr("app.services.llm_metrics._generation_metrics", metrics)
+    monkeypatch.setattr("app.services.ollama_backends._backend_pool", pool)
+    monkeypatch.setattr("app.services.llm._llm_scheduler", None)
+    monkeypatch.setattr("app.services.llm.get_ollama_client", lambda base_url: FakeClient())
+    monkeypatch.setattr(settings, "llm_provider", "ollama")
+    monkeypatch.setattr(settings, "chat_cache_enabled", False)
+    monkeypatch.setattr(settings, "llm_fast_path_enabled", False)
+
+    await llm.generate_chat_reply("Plan a 2-day itinerary", {"destination": "Lisbon"}, endpoint="from_trip")
+
+    [series] = metrics.stats()["series"]
+    assert series["labels"] == {"model": settings.ollama_model, "intent": "itinerary", "endpoint": "from_trip"}
+    assert series["requests"] == 1
+    assert series["output_tokens"]["sum"] == 120
+    assert series["output_tokens_per_second"]["mean"] == 40.0
+    assert series["prompt_tokens_per_second"]["mean"] == 2000.0
+    assert series["end_to_end_ms"]["count"] == 1
+    assert series["ttft_ms"]["count"] == 0
@@ -0,0 +1,35 @@
+"""Tests for deterministic MockProvider pricing."""
+
+import datetime
+import random
+
+import pytest
+
+from app.providers.mock_provider import MockProvider
+from app.seed import SAMPLE_CITIES
+
+
+def _reference_prices(origin, destination, days, travelers):
+    """The original per-call MockProvider formula."""
+    key = (origin + "-" + destination).lower()
+    score = sum(ord(c) for c in key) % 300
+    price_per_person = (50 + score * 0.5) * (1 + days * 0.02)
+    return [
+        round(price_per_person * multiplier * travelers, 2)
+        for multiplier in (1.0, 0.6, 0.4)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_prices_matches_original_formula():
+    cities = [entry["city"] for entry in SAMPLE_CITIES] + ["São Paulo", "ZÜRICH", "new york", "Atlantis"]
+    provider = MockProvider()
+    start = datetime.date.today() + datetime.timedelta(days=5)
+
+    rng = random.Random(7)
+    for _ in range(300):
+        origin, destination = rng.choice(cities), rng.choice(cities)
+        days, travelers = rng.randint(1, 30), rng.randint(1, 10)
+        options = await provider.get_prices(origin, destination, start, start + datetime.timedelta(days=days), travelers)
+
+        assert [option["price"] for option in options] == _reference_prices(origin, destination, days, travelers)
@@ -0,0 +1,133 @@
+"""Tests for Ollama model warm-up, keep-alive and cold-start logging."""
+
+import pytest
+
+from app.core.config import settings
+from app.services import llm
+from app.services.chat_cache import build_chat_cache_key
+from app.services.model_warmup import ModelKeeper
+from app.services.ollama_backends import OllamaBackendPool
+
+GPU_A = "http://gpu-a:11434"
+GPU_B = "http://gpu-b:11434"
+
+COLD_LOAD_NS = 4_200_000_000
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        return None
+
+    def json(self):
+        return self.payload
+
+
+class FakeOllama:
+    """Per-URL fake clients recording calls; ``loaded`` lists backends that have the model in memory."""
+
+    def __init__(self, loaded=()):
+        self.loaded = set(loaded)
+        self.calls = []
+
+    def client(self, base_url: str):
+        fake = self
+
+        class Client:
+            async def get(self, url, **kwargs):
+                fake.calls.append(("GET", url))
+                models = [{"name": settings.ollama_model}] if base_url in fake.loaded else []
+                return FakeResponse({"models": models})
+
+            async def post(self, url, json=None, **kwargs):
+                fake.calls.append(("POST", url, json))
+                cold = base_url not in fake.loaded
+                fake.loaded.add(base_url)
+                return FakeResponse(
+                    {
+                        "message": {"content": "Here is your plan."},
+                        "response": "Hi",
+                        "load_duration": COLD_LOAD_NS if cold else 1_000_000,
+                    }
+                )
+
+        return Client()
+
+
+@pytest.fixture(autouse=True)
+def keep_alive(monkeypatch):
+    monkeypatch.setattr(settings, "ollama_keep_alive", "30m")
+
+
+def _keeper(fake: FakeOllama, *urls: str) -> ModelKeeper:
+    pool = OllamaBackendPool({url: 1 for url in urls}, model=settings.ollama_model)
+    return ModelKeeper(pool, fake.client, interval_seconds=0, idle_seconds=60)
+
+
+@pytest.mark.asyncio
+async def test_warm_all_loads_the_model_and_logs_cold_start(caplog):
+    fake = FakeOllama()
+    keeper = _keeper(fake, GPU_A, GPU_B)
+
+    with caplog.at_level("WARNING"):
+        await keeper.warm_all()
+
+    posts = [call for call in fake.calls if call[0] == "POST"]
+    assert [call[1] for call in posts] == [f"{GPU_A}/api/generate", f"{GPU_B}/api/generate"]
+    assert posts[0][2]["keep_alive"] == "30m"
+    assert posts[0][2]["options"] == {"num_predict": 1, "num_ctx": settings.llm_num_ctx}
+    stats = keeper.stats()
+    assert stats["warmups"] == 2
+    assert stats["cold_starts"] == 2
+    assert stats["last_cold_start_load_ms"] == 4200.0
+    assert "Ollama cold start" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_keep_warm_reloads_only_recently_used_backends():
+    fake = FakeOllama(loaded={GPU_B})
+    keeper = _keeper(fake, GPU_A, GPU_B)
+    a, b = keeper.pool.backends
+
+    await keeper.keep_warm()
+    assert fake.calls == []  # no traffic yet
+
+    keeper.pool.begin(a)
+    keeper.pool.begin(b)
+    await keeper.keep_warm()
+
+    assert ("POST", f"{GPU_A}/api/generate") in [call[:2] for call in fake.calls]
+    assert ("POST", f"{GPU_B}/api/generate") not in [call[:2] for call in fake.calls]
+    assert keeper.stats()["reloads"] == 1
+
+
+def test_chat_body_sends_keep_alive_without_changing_the_cache_key(monkeypatch):
+    body = llm._build_ollama_body("Plan Rome", None, stream=False)
+    assert body["keep_alive"] == "30m"
+
+    monkeypatch.setattr(settings, "ollama_keep_alive", "-1")
+    forever = llm._build_ollama_body("Plan Rome", None, stream=False)
+    assert forever["keep_alive"] == -1
+    assert build_chat_cache_key(forever) == build_chat_cache_key(body)
+
+
+@pytest.mark.asyncio
+async def test_chat_request_records_cold_start_from_load_duration(monkeypatch):
+    fake = FakeOllama()
+    pool = OllamaBackendPool({GPU_A: 2}, model=settings.ollama_model)
+    keeper = ModelKeeper(pool, fake.client)
+    monkeypatch.setattr("app.services.ollama_backends._backend_pool", pool)
+    monkeypatch.setattr("app.services.llm._model_keeper", keeper)
+    monkeypatch.setattr("app.services.llm._llm_scheduler", None)
+    monkeypatch.setattr("app.services.llm.get_ollama_client", fake.client)
+    monkeypatch.setattr(settings, "llm_provider", "ollama")
+    monkeypatch.setattr(settings, "chat_cache_enabled", False)
+    monkeypatch.setattr(settings, "llm_fast_path_enabled", False)
+
+    first = await llm.generate_chat_reply("Plan 2 days in Rome", None)
+    await llm.generate_chat_reply("Plan 3 days in Rome", None)
+
+    assert first == "Here is your plan."
+    assert keeper.stats()["cold_starts"] == 1
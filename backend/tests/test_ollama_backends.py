@@ -0,0 +1,192 @@
+"""Tests for multi-backend Ollama routing and health checks."""
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services import llm
+from app.services.ollama_backends import OllamaBackendPool, parse_backend_specs
+
+GPU_A = "http://gpu-a:11434"
+GPU_B = "http://gpu-b:11434"
+
+
+class FakeResponse:
+    def __init__(self, url: str, payload=None, status_code: int = 200):
+        self.url = url
+        self.payload = payload or {}
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            request = httpx.Request("GET", self.url)
+            raise httpx.HTTPStatusError(
+                "error",
+                request=request,
+                response=httpx.Response(self.status_code, request=request),
+            )
+
+    def json(self):
+        return self.payload
+
+
+class FakeOllamaHosts:
+    """Per-URL fake clients; ``down`` hosts refuse connections."""
+
+    def __init__(self, down=()):
+        self.down = set(down)
+        self.posts = []
+
+    def client(self, base_url: str):
+        hosts = self
+
+        class Client:
+            async def get(self, url, **kwargs):
+                if base_url in hosts.down:
+                    raise httpx.ConnectError("refused")
+                return FakeResponse(url, {"models": [{"name": settings.ollama_model}]})
+
+            async def post(self, url, **kwargs):
+                hosts.posts.append(base_url)
+                if base_url in hosts.down:
+                    raise httpx.ConnectError("refused")
+                return FakeResponse(url, {"message": {"content": f"reply from {base_url}"}})
+
+        return Client()
+
+
+@pytest.fixture
+def two_backends(monkeypatch):
+    hosts = FakeOllamaHosts()
+    pool = OllamaBackendPool({GPU_A: 2, GPU_B: 2}, model=settings.ollama_model, health_check_interval_seconds=0)
+    monkeypatch.setattr("app.services.ollama_backends._backend_pool", pool)
+    monkeypatch.setattr("app.services.llm._llm_scheduler", None)
+    monkeypatch.setattr("app.services.llm.get_ollama_client", hosts.client)
+    monkeypatch.setattr("app.services.llm.asyncio.sleep", _no_sleep)
+    monkeypatch.setattr(settings, "llm_provider", "ollama")
+    monkeypatch.setattr(settings, "chat_cache_enabled", False)
+    monkeypatch.setattr(settings, "llm_fast_path_enabled", False)
+    monkeypatch.setattr(settings, "llm_retry_attempts", 2)
+    return pool, hosts
+
+
+async def _no_sleep(_seconds: float):
+    return None
+
+
+def test_parse_backend_specs_uses_default_capacity():
+    assert parse_backend_specs([f"{GPU_A}/=4", GPU_B, " "], default_capacity=2) == {GPU_A: 4, GPU_B: 2}
+
+
+def test_pick_prefers_fewest_outstanding_relative_to_capacity():
+    pool = OllamaBackendPool({GPU_A: 4, GPU_B: 1}, model="m")
+    a, b = pool.backends
+
+    pool.begin(a)
+    assert pool.pick() is b  # 1/4 vs 0/1
+    pool.begin(b)
+    assert pool.pick() is a  # 1/4 vs 1/1 (b is full)
+    assert pool.pick(exclude={GPU_A}) is b
+
+
+def test_failing_backend_is_ejected_until_probe_readmits_it():
+    pool = OllamaBackendPool({GPU_A: 1, GPU_B: 1}, model="m", eject_after_failures=2)
+    a, b = pool.backends
+
+    for _ in range(2):
+        pool.record_failure(a, httpx.ConnectError("refused"))
+
+    assert [pool.pick() for _ in range(4)] == [b] * 4
+    assert pool.stats()[GPU_A]["available"] is False
+
+
+@pytest.mark.asyncio
+async def test_health_probe_ejects_and_readmits_backends():
+    hosts = FakeOllamaHosts(down={GPU_A})
+    pool = OllamaBackendPool({GPU_A: 1, GPU_B: 1}, model=settings.ollama_model)
+    a, b = pool.backends
+
+    await pool.check_all(hosts.client)
+    assert pool.stats()[GPU_A]["reachable"] is False
+    assert {pool.pick() for _ in range(4)} == {b}
+
+    hosts.down.clear()
+    await pool.check_all(hosts.client)
+    assert {pool.pick() for _ in range(4)} == {a, b}
+
+
+@pytest.mark.asyncio
+async def test_all_backends_down_still_routes_to_one():
+    pool = OllamaBackendPool({GPU_A: 1, GPU_B: 1}, model="m", eject_after_failures=1)
+    for backend in pool.backends:
+        pool.record_failure(backend, httpx.ConnectError("refused"))
+
+    assert pool.pick() in pool.backends
+
+
+@pytest.mark.asyncio
+async def test_retry_goes_to_a_different_backend(two_backends):
+    pool, hosts = two_backends
+    hosts.down.add(GPU_A)
+    pool._picks = -1  # the first pick lands on gpu-a
+
+    reply = await llm.generate_chat_reply("Plan Porto", None)
+
+    assert hosts.posts == [GPU_A, GPU_B]
+    assert reply == f"reply from {GPU_B}"
+    stats = pool.stats()
+    assert stats[GPU_A]["failures"] == 1
+    assert stats[GPU_A]["outstanding"] == 0
+    assert stats[GPU_B]["outstanding"] == 0
+
+
+@pytest.mark.asyncio
+async def test_health_endpoint_reports_every_backend(two_backends, monkeypatch):
+    from app.api.v1.chat import _get_chat_provider_health
+
+    _, hosts = two_backends
+    hosts.down.add(GPU_B)
+    monkeypatch.setattr("app.api.v1.chat.get_ollama_client", hosts.client)
+
+    health = await _get_chat_provider_health()
+
+    assert health["provider_reachable"] is True
+    assert health["backends"][GPU_A]["reachable"] is True
+    assert health["backends"][GPU_B]["reachable"] is False
+
+
+@pytest.mark.asyncio
+async def test_health_endpoint_serves_fresh_snapshot_without_probing(two_backends, monkeypatch):
+    from app.api.v1.chat import _get_chat_provider_health
+
+    pool, hosts = two_backends
+    await pool.check_all(hosts.client)
+    assert pool.stats()[GPU_A]["loaded_models"] == [settings.ollama_model]
+    assert pool.stats()[GPU_A]["probe_latency_ms"] is not None
+
+    def no_client(base_url):
+        raise AssertionError("health endpoint should not call Ollama")
+
+    monkeypatch.setattr("app.api.v1.chat.get_ollama_client", no_client)
+    health = await _get_chat_provider_health()
+
+    assert health["provider_reachable"] is True
+    assert health["checked_at"] == pool.checked_at
+
+
+@pytest.mark.asyncio
+async def test_chat_fails_fast_while_provider_is_known_down(two_backends):
+    pool, hosts = two_backends
+    hosts.down.update({GPU_A, GPU_B})
+    await pool.check_all(hosts.client)
+    assert pool.provider_down() is True
+
+    reply = await llm.generate_chat_reply("Plan Porto", {"destination": "Porto"})
+
+    assert isinstance(reply, llm.FallbackReply)
+    assert hosts.posts == []
+
+    pool.health_max_age_seconds = 0  # the snapshot is too old to trust
+    for backend in pool.backends:
+        backend.last_checked_at -= 1
+    assert pool.provider_down() is False
@@ -0,0 +1,118 @@
+"""Tests for prefix-stable prompts, backend affinity and prompt-eval savings."""
+
+import pytest
+
+from app.core.config import settings
+from app.services import llm
+from app.services.ollama_backends import OllamaBackendPool
+from app.services.prompt_prefix import PromptPrefixTracker
+
+GPU_A = "http://gpu-a:11434"
+GPU_B = "http://gpu-b:11434"
+
+TRIP_CONTEXT = {"destination": "Lisbon", "days": "4", "budget": "1250.00"}
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        return None
+
+    def json(self):
+        return self.payload
+
+
+class PrefixCachingOllama:
+    """Fake hosts that, like Ollama, only evaluate the prompt suffix not already cached on that host."""
+
+    def __init__(self):
+        self.posts = []
+        self.cached = {}
+
+    def client(self, base_url: str):
+        fake = self
+
+        class Client:
+            async def post(self, url, json=None, **kwargs):
+                fake.posts.append(base_url)
+                messages = json["messages"]
+                prompt_chars = sum(len(message["content"]) for message in messages)
+                prefix_chars = sum(len(message["content"]) for message in messages[:-1])
+                cached_chars = prefix_chars if fake.cached.get(base_url) == messages[:-1] else 0
+                fake.cached[base_url] = messages[:-1]
+                evaluated = (prompt_chars - cached_chars) // 4
+                return FakeResponse(
+                    {
+                        "message": {"content": "Here you go."},
+                        "prompt_eval_count": evaluated,
+                        "prompt_eval_duration": evaluated * 2_000_000,
+                    }
+                )
+
+        return Client()
+
+
+def test_trip_prompt_layout_keeps_shared_prefix_stable():
+    first = llm._build_ollama_body("Improve my itinerary for Lisbon", TRIP_CONTEXT, stream=False)
+    second = llm._build_ollama_body("Make it family friendly", TRIP_CONTEXT, stream=False)
+
+    assert [message["role"] for message in first["messages"]] == ["system", "system", "user"]
+    assert "- destination: Lisbon" in first["messages"][1]["content"]
+    assert "destination" not in first["messages"][2]["content"]
+    assert first["messages"][:2] == second["messages"][:2]
+    assert first["messages"][2] != second["messages"][2]
+
+
+def test_affinity_key_sticks_to_backend_while_it_has_room():
+    pool = OllamaBackendPool({GPU_A: 1, GPU_B: 1}, model="m")
+
+    first = pool.pick(affinity_key="trip:1")
+    assert pool.pick(affinity_key="trip:1") is first
+    assert pool.pick(affinity_key="trip:2") is not first
+
+    retried = pool.pick(exclude={first.base_url}, affinity_key="trip:1")
+    assert retried is not first
+    assert pool.pick(affinity_key="trip:1") is retried  # the retry's backend now holds the prefix
+
+    pool.begin(retried)
+    assert pool.pick(affinity_key="trip:1") is first  # sticky backend is full
+    assert pool.affinity_stats() == {"keys": 2, "hits": 2}
+
+
+def test_tracker_reports_tokens_and_time_saved_on_followups():
+    tracker = PromptPrefixTracker()
+
+    assert tracker.record("trip:1", GPU_A, 4000, {"prompt_eval_count": 1000, "prompt_eval_duration": 500_000_000}) is None
+    saved = tracker.record("trip:1", GPU_A, 4200, {"prompt_eval_count": 150, "prompt_eval_duration": 75_000_000})
+
+    assert saved == (900, 450.0)
+    stats = tracker.stats()
+    assert stats["followups"] == 1
+    assert stats["reuse_rate"] == 1.0
+    assert stats["saved_prompt_eval_ms"] == 450.0
+
+
+@pytest.mark.asyncio
+async def test_followups_on_same_trip_reuse_backend_prompt_cache(monkeypatch):
+    fake = PrefixCachingOllama()
+    tracker = PromptPrefixTracker()
+    pool = OllamaBackendPool({GPU_A: 2, GPU_B: 2}, model=settings.ollama_model, health_check_interval_seconds=0)
+    monkeypatch.setattr("app.services.ollama_backends._backend_pool", pool)
+    monkeypatch.setattr("app.services.prompt_prefix._prefix_tracker", tracker)
+    monkeypatch.setattr("app.services.llm._llm_scheduler", None)
+    monkeypatch.setattr("app.services.llm.get_ollama_client", fake.client)
+    monkeypatch.setattr(settings, "llm_provider", "ollama")
+    monkeypatch.setattr(settings, "chat_cache_enabled", False)
+    monkeypatch.setattr(settings, "llm_fast_path_enabled", False)
+
+    for question in ("Improve my itinerary", "Reduce the budget by 15%", "Make it family friendly"):
+        await llm.generate_chat_reply(question, TRIP_CONTEXT, prefix_key="trip:7")
+
+    assert len(set(fake.posts)) == 1
+    stats = tracker.stats()
+    assert stats["followups"] == 2
+    assert stats["reused"] == 2
+    assert stats["saved_prompt_tokens"] > 0
+    assert stats["saved_prompt_eval_ms"] > 0
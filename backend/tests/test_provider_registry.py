@@ -0,0 +1,90 @@
+"""Tests for the provider registry and its shared HTTP connection pool."""
+
+import datetime
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.auth.security import get_current_user
+from app.core.config import settings
+from app.main import app
+from app.models import User
+from app.providers.mock_provider import MockProvider
+from app.providers.registry import ProviderRegistry
+from app.providers.rome2rio_provider import Rome2RioProvider
+
+
+def _rome2rio_handler(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(
+        200,
+        json={
+            "routes": [
+                {"name": "Fly", "indicativePrice": {"price": 120.0, "currency": "USD"}, "totalDuration": 130},
+                {"name": "Train", "indicativePrice": {"price": 80.0, "currency": "USD"}, "totalDuration": 400},
+            ]
+        },
+    )
+
+
+def test_registry_defaults_to_mock_without_api_key():
+    registry = ProviderRegistry(rome2rio_api_key="")
+    registry.start()
+
+    provider = registry.primary_provider()
+
+    assert isinstance(provider, MockProvider)
+    assert registry.primary_provider() is provider
+    assert registry.primary_name() == "mock"
+
+
+@pytest.mark.asyncio
+async def test_registry_shares_pooled_client_across_quotes():
+    registry = ProviderRegistry(
+        rome2rio_api_key="test-key",
+        max_connections=4,
+        max_keepalive_connections=2,
+        transport=httpx.MockTransport(_rome2rio_handler),
+    )
+    registry.start()
+
+    provider = registry.primary_provider()
+    assert isinstance(provider, Rome2RioProvider)
+    assert provider._client is registry.http_client
+
+    start = datetime.date.today() + datetime.timedelta(days=10)
+    first = await provider.get_prices("Berlin", "Paris", start, start + datetime.timedelta(days=3), 2)
+    second = await provider.get_prices("Berlin", "Paris", start, start + datetime.timedelta(days=3), 2)
+
+    assert first == second
+    assert [option["transport_type"] for option in first] == ["flight", "train"]
+    assert first[0]["price"] == 240.0
+
+    stats = registry.stats()
+    assert stats["requests_sent"] == 2
+    assert stats["max_connections"] == 4
+    assert stats["max_keepalive_connections"] == 2
+
+    await registry.close()
+    assert registry.started is False
+    assert registry.stats()["providers"] == []
+
+
+def test_metrics_endpoint_reports_provider_pool(monkeypatch):
+    client = TestClient(app)
+    assert client.get("/api/v1/metrics").status_code == 403
+
+    monkeypatch.setattr(settings, "metrics_token", "ops-secret")
+    app.dependency_overrides[get_current_user] = lambda: User(id=1, email="user@example.com", hashed_password="hashed")
+    try:
+        assert client.get("/api/v1/metrics").status_code == 401
+    finally:
+        app.dependency_overrides.clear()
+    assert client.get("/api/v1/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    response = client.get("/api/v1/metrics", headers={"Authorization": "Bearer ops-secret"})
+
+    assert response.status_code == 200
+    pool = response.json()["transport_providers"]
+    assert pool["started"] is True
+    assert "mock" in pool["providers"]
+    assert pool["max_connections"] >= 1
@@ -425,3 +425,238 @@ def test_quote_case_insensitive_cities(client: TestClient, sample_cities):
     # Should still find Paris data
     data = response.json()
     assert data["breakdown"]["accommodation"]["per_night"] == 120.0
+
+
+# ===== BATCH QUOTE TESTS =====
+
+def _trip_payload(destination: str, offset_days: int = 10, days: int = 4, travelers: int = 2) -> dict:
+    today = datetime.date.today()
+    return {
+        "origin": "Berlin",
+        "destination": destination,
+        "start_date": (today + datetime.timedelta(days=offset_days)).isoformat(),
+        "end_date": (today + datetime.timedelta(days=offset_days + days)).isoformat(),
+        "travelers": travelers,
+    }
+
+
+def test_batch_quote_matches_single_quotes(client: TestClient, sample_cities):
+    """Test that each batch item is priced exactly like /quote."""
+    items = [_trip_payload("Paris"), _trip_payload("New York", travelers=1)]
+
+    response = client.post("/api/v1/quotes/batch", json={"items": items})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["succeeded"] == 2
+    assert data["failed"] == 0
+    for index, item in enumerate(items):
+        single = client.post("/api/v1/quote", json=item).json()
+        assert data["results"][index]["index"] == index
+        assert data["results"][index]["quote"] == single
+
+
+def test_batch_quote_reports_invalid_items_individually(client: TestClient):
+    """Test that one invalid item does not fail the whole batch."""
+    items = [_trip_payload("Paris"), {**_trip_payload("Paris"), "travelers": 0}]
+
+    response = client.post("/api/v1/quotes/batch", json={"items": items})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0]["status"] == "ok"
+    assert results[1]["status"] == "error"
+    assert results[1]["status_code"] == 422
+    assert results[1]["quote"] is None
+
+
+def test_batch_quote_dedupes_routes_and_isolates_provider_errors(client: TestClient, monkeypatch):
+    """Test that identical routes are fetched once and provider errors stay per item."""
+    from app.exceptions import ProviderException
+    from app.schemas import TransportOption
+
+    calls = []
+
+    async def fake_get_transport_options(trip_request):
+        calls.append(trip_request.destination)
+        if trip_request.destination == "Nowhere":
+            raise ProviderException("transport-provider", "no routes")
+        return [TransportOption(provider="Global Airways", transport_type="flight", price=300.0)]
+
+    monkeypatch.setattr("app.services.pricing.get_transport_options", fake_get_transport_options)
+
+    items = [_trip_payload("Paris"), _trip_payload("paris"), _trip_payload("Nowhere")]
+    response = client.post("/api/v1/quotes/batch", json={"items": items})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert sorted(calls) == ["Nowhere", "Paris"]
+    assert [result["status"] for result in data["results"]] == ["ok", "ok", "error"]
+    assert data["results"][2]["status_code"] == 503
+    assert "no routes" in data["results"][2]["error"]
+
+
+def test_batch_quote_rejects_oversized_batch(client: TestClient):
+    """Test that batches above QUOTE_BATCH_MAX_ITEMS are rejected."""
+    from app.core.config import settings
+
+    items = [_trip_payload("Paris")] * (settings.quote_batch_max_items + 1)
+
+    response = client.post("/api/v1/quotes/batch", json={"items": items})
+
+    assert response.status_code == 422
+
+
+# ===== PRICE CALENDAR TESTS =====
+
+def test_price_calendar_matches_single_quotes(client: TestClient, sample_cities):
+    """Test that every calendar entry equals the /quote total for that date."""
+    today = datetime.date.today()
+    payload = {
+        "origin": "Berlin",
+        "destination": "Paris",
+        "window_start": (today + datetime.timedelta(days=5)).isoformat(),
+        "window_end": (today + datetime.timedelta(days=14)).isoformat(),
+        "trip_days": 4,
+        "travelers": 2,
+    }
+
+    response = client.post("/api/v1/quote/calendar", json=payload)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["entries"]) == 10
+    for entry in data["entries"][::3]:
+        single = client.post("/api/v1/quote", json=_trip_payload("Paris", days=4, travelers=2) | {
+            "start_date": entry["start_date"],
+            "end_date": entry["end_date"],
+        }).json()
+        assert entry["total"] == single["breakdown"]["total"]
+        assert entry["food"] == single["breakdown"]["food"]
+    assert data["cheapest"]["total"] == min(entry["total"] for entry in data["entries"])
+
+
+def test_price_calendar_fetches_once_per_date_bucket(client: TestClient, monkeypatch):
+    """Test that provider prices are requested once per date bucket, not per date."""
+    from app.core.config import settings
+    from app.schemas import TransportOption
+
+    monkeypatch.setattr(settings, "quote_cache_date_bucket_days", 7)
+    calls = []
+
+    async def fake_get_transport_options(trip_request):
+        calls.append(trip_request.start_date)
+        return [TransportOption(provider="Global Airways", transport_type="flight", price=200.0)]
+
+    monkeypatch.setattr("app.services.price_calendar.get_transport_options", fake_get_transport_options)
+
+    today = datetime.date.today()
+    window_start = today + datetime.timedelta(days=3)
+    window_end = today + datetime.timedelta(days=31)
+    response = client.post(
+        "/api/v1/quote/calendar",
+        json={
+            "origin": "Berlin",
+            "destination": "Paris",
+            "window_start": window_start.isoformat(),
+            "window_end": window_end.isoformat(),
+            "trip_days": 3,
+        },
+    )
+
+    assert response.status_code == 200
+    expected_buckets = {
+        (window_start + datetime.timedelta(days=offset)).toordinal() // 7
+        for offset in range((window_end - window_start).days + 1)
+    }
+    assert len(calls) == len(expected_buckets)
+    assert len(response.json()["entries"]) == 29
+
+
+def test_price_calendar_rejects_window_over_limit(client: TestClient):
+    """Test that windows longer than QUOTE_CALENDAR_MAX_WINDOW_DAYS are rejected."""
+    today = datetime.date.today()
+    payload = {
+        "origin": "Berlin",
+        "destination": "Paris",
+        "window_start": (today + datetime.timedelta(days=1)).isoformat(),
+        "window_end": (today + datetime.timedelta(days=200)).isoformat(),
+        "trip_days": 4,
+    }
+
+    response = client.post("/api/v1/quote/calendar", json=payload)
+
+    assert response.status_code == 422
+
+
+# ===== ITINERARY TESTS =====
+
+def _itinerary_payload(stops, travelers: int = 2, **extra) -> dict:
+    return {
+        "origin": "Berlin",
+        "stops": [{"city": city, "nights": nights} for city, nights in stops],
+        "start_date": (datetime.date.today() + datetime.timedelta(days=10)).isoformat(),
+        "travelers": travelers,
+        **extra,
+    }
+
+
+def test_itinerary_quote_costs_legs_and_stops(client: TestClient, sample_cities):
+    """Test that the itinerary is a round trip whose total adds up."""
+    payload = _itinerary_payload([("Paris", 3), ("Tokyo", 2), ("New York", 4)])
+
+    response = client.post("/api/v1/quote/itinerary", json=payload)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert sorted(data["order"]) == ["New York", "Paris", "Tokyo"]
+    assert data["solver"] == "exact"
+    assert len(data["legs"]) == 4
+    assert data["legs"][0]["origin"] == "Berlin"
+    assert data["legs"][-1]["destination"] == "Berlin"
+    assert [stop["city"] for stop in data["stops"]] == data["order"]
+
+    paris = next(stop for stop in data["stops"] if stop["city"] == "Paris")
+    assert paris["accommodation"] == {"per_night": 120.0, "nights": 3, "total": 360.0}
+    assert paris["food"] == 40.0 * 3 * 2
+
+    transport_total = sum(leg["option"]["price"] for leg in data["legs"])
+    stay_total = sum(stop["accommodation"]["total"] + stop["food"] + stop["misc"] for stop in data["stops"])
+    assert data["transport_total"] == pytest.approx(transport_total)
+    assert data["total"] == pytest.approx(transport_total + stay_total)
+
+
+def test_itinerary_optimized_order_is_never_more_expensive(client: TestClient, sample_cities):
+    """Test that optimizing the order never costs more than the requested order."""
+    stops = [("Tokyo", 2), ("Paris", 2), ("New York", 2), ("Rome", 1)]
+
+    fixed = client.post("/api/v1/quote/itinerary", json=_itinerary_payload(stops, optimize_order=False)).json()
+    optimized = client.post("/api/v1/quote/itinerary", json=_itinerary_payload(stops)).json()
+
+    assert fixed["solver"] == "fixed"
+    assert fixed["order"] == ["Tokyo", "Paris", "New York", "Rome"]
+    assert optimized["transport_total"] <= fixed["transport_total"]
+
+
+def test_itinerary_eight_stops_under_a_second(client: TestClient):
+    """Test that an 8-stop itinerary is solved exactly well under a second."""
+    import time
+
+    stops = [(city, 1) for city in ["Paris", "Rome", "Madrid", "Lisbon", "Vienna", "Prague", "Oslo", "Athens"]]
+
+    started = time.perf_counter()
+    response = client.post("/api/v1/quote/itinerary", json=_itinerary_payload(stops))
+    elapsed = time.perf_counter() - started
+
+    assert response.status_code == 200
+    assert response.json()["solver"] == "exact"
+    assert elapsed < 1.0
+
+
+def test_itinerary_rejects_duplicate_stops(client: TestClient):
+    """Test that repeated stops or the origin as a stop are rejected."""
+    response = client.post("/api/v1/quote/itinerary", json=_itinerary_payload([("Paris", 2), ("paris", 1)]))
+    assert response.status_code == 422
+
+    response = client.post("/api/v1/quote/itinerary", json=_itinerary_payload([("Berlin", 2)]))
+    assert response.status_code == 422
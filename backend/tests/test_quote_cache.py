@@ -0,0 +1,146 @@
+"""Tests for the two-tier transport quote cache."""
+
+import asyncio
+import datetime
+
+import pytest
+
+from app.core.cache import LRUCache
+from app.schemas import TripRequest
+from app.services.quote_cache import CachedProviderFailure, TransportQuoteCache
+
+
+PRICES = [{"provider": "Global Airways", "transport_type": "flight", "price": 210.0, "currency": "USD"}]
+
+
+class FakeRedisCache:
+    def __init__(self):
+        self.values = {}
+        self.errors = 0
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ttl_seconds):
+        self.values[key] = value
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+
+    async def close(self):
+        return None
+
+
+def _trip(origin="Berlin", destination="Paris", offset_days=10, days=3, travelers=2) -> TripRequest:
+    start = datetime.date.today() + datetime.timedelta(days=offset_days)
+    return TripRequest(
+        origin=origin,
+        destination=destination,
+        start_date=start,
+        end_date=start + datetime.timedelta(days=days),
+        travelers=travelers,
+    )
+
+
+def _counting_fetch(calls, result=PRICES, error=None):
+    async def fetch():
+        calls["count"] += 1
+        if error is not None:
+            raise error
+        return result
+
+    return fetch
+
+
+def test_build_key_normalizes_city_case_and_buckets_dates():
+    cache = TransportQuoteCache(date_bucket_days=7)
+
+    key_a = cache.build_key("mock", _trip(origin="berlin", destination="PARIS"))
+    key_b = cache.build_key("mock", _trip(origin=" Berlin ", destination="Paris"))
+    key_other_travelers = cache.build_key("mock", _trip(travelers=3))
+
+    assert key_a == key_b
+    assert key_a != key_other_travelers
+    assert key_a.startswith("mock|berlin|paris|2|3|")
+
+
+@pytest.mark.asyncio
+async def test_second_lookup_is_served_from_l1():
+    cache = TransportQuoteCache()
+    calls = {"count": 0}
+
+    first = await cache.get_or_fetch("k", "mock", _counting_fetch(calls))
+    second = await cache.get_or_fetch("k", "mock", _counting_fetch(calls))
+
+    assert first == second == PRICES
+    assert calls["count"] == 1
+    stats = cache.stats()
+    assert stats["misses"] == 1
+    assert stats["l1_hits"] == 1
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.evictions == 1
+
+
+@pytest.mark.asyncio
+async def test_provider_failures_are_negatively_cached():
+    cache = TransportQuoteCache(negative_ttl_seconds=30)
+    calls = {"count": 0}
+    failing = _counting_fetch(calls, error=RuntimeError("upstream down"))
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_fetch("k", "rome2rio", failing)
+    with pytest.raises(CachedProviderFailure) as exc_info:
+        await cache.get_or_fetch("k", "rome2rio", failing)
+
+    assert calls["count"] == 1
+    assert "upstream down" in str(exc_info.value)
+    assert cache.stats()["negative_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_entry_is_served_stale_while_one_refresh_runs(monkeypatch):
+    clock = {"now": 1000.0}
+    monkeypatch.setattr("app.services.quote_cache.time", lambda: clock["now"])
+    cache = TransportQuoteCache(provider_ttls={"mock": 60}, stale_while_revalidate_seconds=120)
+    calls = {"count": 0}
+
+    await cache.get_or_fetch("k", "mock", _counting_fetch(calls))
+    clock["now"] += 90
+
+    refreshed = [{**PRICES[0], "price": 250.0}]
+    stale_a = await cache.get_or_fetch("k", "mock", _counting_fetch(calls, result=refreshed))
+    stale_b = await cache.get_or_fetch("k", "mock", _counting_fetch(calls, result=refreshed))
+    await asyncio.sleep(0)
+
+    assert stale_a == stale_b == PRICES
+    assert calls["count"] == 2
+    assert cache.stats()["stale_hits"] == 2
+    assert cache.stats()["refreshes"] == 1
+    assert await cache.get_or_fetch("k", "mock", _counting_fetch(calls)) == refreshed
+
+
+@pytest.mark.asyncio
+async def test_l2_hit_populates_l1():
+    redis_cache = FakeRedisCache()
+    writer = TransportQuoteCache(redis_cache=redis_cache)
+    reader = TransportQuoteCache(redis_cache=redis_cache)
+    calls = {"count": 0}
+
+    await writer.get_or_fetch("k", "mock", _counting_fetch(calls))
+    result = await reader.get_or_fetch("k", "mock", _counting_fetch(calls))
+    await reader.get_or_fetch("k", "mock", _counting_fetch(calls))
+
+    assert result == PRICES
+    assert calls["count"] == 1
+    assert reader.stats()["l2_hits"] == 1
+    assert reader.stats()["l1_hits"] == 1
@@ -0,0 +1,81 @@
+"""Tests for single-flight coalescing of concurrent calls."""
+
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight("test")
+    release = asyncio.Event()
+    calls = {"count": 0}
+
+    async def upstream():
+        calls["count"] += 1
+        await release.wait()
+        return ["flight", "train"]
+
+    waiters = [asyncio.create_task(flight.do("berlin|paris", upstream)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters)
+
+    assert calls["count"] == 1
+    assert all(result == ["flight", "train"] for result in results)
+    assert flight.stats() == {"calls": 5, "executions": 1, "coalesced": 4, "in_flight": 0}
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_with_every_waiter():
+    flight = SingleFlight("test")
+    release = asyncio.Event()
+
+    async def upstream():
+        await release.wait()
+        raise RuntimeError("provider down")
+
+    waiters = [asyncio.create_task(flight.do("k", upstream)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.stats()["executions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelling_one_waiter_does_not_cancel_shared_work():
+    flight = SingleFlight("test")
+    release = asyncio.Event()
+
+    async def upstream():
+        await release.wait()
+        return 42
+
+    leader = asyncio.create_task(flight.do("k", upstream))
+    follower = asyncio.create_task(flight.do("k", upstream))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await follower == 42
+    assert leader.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_sequential_calls_are_not_coalesced():
+    flight = SingleFlight("test")
+
+    async def upstream():
+        return "ok"
+
+    await flight.do("k", upstream)
+    await flight.do("k", upstream)
+
+    assert flight.stats()["executions"] == 2
+    assert flight.stats()["coalesced"] == 0
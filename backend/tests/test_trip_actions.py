@@ -0,0 +1,249 @@
+"""Tests for background pre-generation of saved-trip AI actions."""
+
+import asyncio
+import json
+from datetime import date, datetime, timezone
+
+import httpx
+import pytest
+import pytest_asyncio
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from app.auth.security import get_current_user
+from app.core.config import settings
+from app.db.session import get_session
+from app.main import app
+from app.models import ChatJob, SavedTrip, User
+from app.services import chat_jobs
+from app.services.chat_jobs import ChatJobWorkerPool, run_chat_job
+from app.services.llm import LLM_PRIORITY_BACKGROUND
+from app.services.trip_actions import (
+    PREGENERATED_ACTIONS,
+    build_trip_context,
+    find_trip_action_job,
+    prepare_trip_action_jobs,
+    store_trip_action_reply,
+    trip_content_hash,
+)
+
+BREAKDOWN = {
+    "transport": [{"provider": "Lufthansa", "transport_type": "flight", "price": 900.0, "currency": "USD"}],
+    "accommodation": {"per_night": 100.0, "nights": 11, "total": 1100.0},
+    "food": 300.0,
+    "misc": 100.0,
+    "total": 2400.0,
+}
+
+
+def _trip_payload(**overrides):
+    payload = {
+        "origin": "Berlin",
+        "destination": "Tokyo",
+        "start_date": "2026-04-01",
+        "end_date": "2026-04-12",
+        "travelers": 2,
+        "transport_type": "flight",
+        "breakdown": BREAKDOWN,
+    }
+    payload.update(overrides)
+    return payload
+
+
+@pytest_asyncio.fixture(name="trips")
+async def trips_fixture(monkeypatch):
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr(chat_jobs, "engine", engine)
+    monkeypatch.setattr(settings, "chat_pregenerate_trip_actions", True)
+
+    now = datetime.now(timezone.utc)
+    with Session(engine) as session:
+        user = User(email="owner@example.com", hashed_password="hashed", created_at=now)
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        trip = SavedTrip(
+            user_id=user.id,
+            origin="Berlin",
+            destination="Tokyo",
+            start_date=date(2026, 4, 1),
+            end_date=date(2026, 4, 12),
+            travelers=2,
+            transport_type="flight",
+            breakdown_json=json.dumps(BREAKDOWN),
+            total=2400.0,
+            created_at=now,
+        )
+        session.add(trip)
+        session.commit()
+        session.refresh(trip)
+        session.refresh(user)
+        trip_id = trip.id
+
+    runs = []
+
+    async def fake_runner(job):
+        runs.append(job)
+        return f"Background {job.action} for {json.loads(job.context_json)['budget']}"
+
+    generated = []
+
+    async def fake_generate_chat_reply(message, context, **kwargs):
+        generated.append(message)
+        return "Generated on demand"
+
+    pool = ChatJobWorkerPool(fake_runner, workers=1, max_pending=10)
+    monkeypatch.setattr("app.services.chat_jobs._job_pool", pool)
+    monkeypatch.setattr("app.api.v1.chat.generate_chat_reply", fake_generate_chat_reply)
+
+    def get_session_override():
+        with Session(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_current_user] = lambda: user
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client, engine, trip_id, runs, generated
+    app.dependency_overrides.clear()
+    await pool.close()
+
+
+async def _drain():
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_update_pregenerates_actions_and_serves_them_instantly(trips):
+    client, engine, trip_id, runs, generated = trips
+
+    assert (await client.put(f"/api/v1/trips/{trip_id}", json=_trip_payload())).status_code == 200
+    await _drain()
+
+    assert sorted(job.action for job in runs) == sorted(PREGENERATED_ACTIONS)
+    assert {job.priority for job in runs} == {LLM_PRIORITY_BACKGROUND}
+
+    response = await client.post(f"/api/v1/chat/from-trip/{trip_id}", json={"action": "reduce_budget_15"})
+    data = response.json()
+    assert data["precomputed"] is True
+    assert data["reply"] == "Background reduce_budget_15 for 2400.00"
+    assert generated == []
+
+    custom = await client.post(
+        f"/api/v1/chat/from-trip/{trip_id}",
+        json={"action": "reduce_budget_15", "question": "Cheaper hotels?"},
+    )
+    assert custom.json()["precomputed"] is False
+    assert generated == ["Cheaper hotels?"]
+
+
+@pytest.mark.asyncio
+async def test_changed_trip_drops_stale_replies(trips):
+    client, engine, trip_id, runs, generated = trips
+
+    await client.put(f"/api/v1/trips/{trip_id}", json=_trip_payload())
+    await _drain()
+    cheaper = dict(BREAKDOWN, total=1800.0)
+    await client.put(f"/api/v1/trips/{trip_id}", json=_trip_payload(breakdown=cheaper))
+    await _drain()
+
+    with Session(engine) as session:
+        jobs = session.exec(select(ChatJob).where(ChatJob.trip_id == trip_id)).all()
+    assert len(jobs) == len(PREGENERATED_ACTIONS)
+    assert {job.reply for job in jobs if job.action == "family_friendly"} == {"Background family_friendly for 1800.00"}
+
+    data = (await client.post(f"/api/v1/chat/from-trip/{trip_id}", json={"action": "family_friendly"})).json()
+    assert data["reply"] == "Background family_friendly for 1800.00"
+
+
+@pytest.mark.asyncio
+async def test_disabled_pregeneration_generates_on_demand(trips, monkeypatch):
+    client, engine, trip_id, runs, generated = trips
+    monkeypatch.setattr(settings, "chat_pregenerate_trip_actions", False)
+
+    await client.put(f"/api/v1/trips/{trip_id}", json=_trip_payload())
+    await _drain()
+    data = (await client.post(f"/api/v1/chat/from-trip/{trip_id}", json={"action": "improve_itinerary"})).json()
+
+    assert runs == []
+    assert data["precomputed"] is False
+    assert data["reply"] == "Generated on demand"
+
+
+@pytest.mark.asyncio
+async def test_on_demand_reply_finishes_the_queued_job(trips):
+    client, engine, trip_id, runs, generated = trips
+
+    with Session(engine) as session:
+        trip = session.get(SavedTrip, trip_id)
+        prepare_trip_action_jobs(session, trip)
+        store_trip_action_reply(session, trip, "family_friendly", "On demand")
+        job = session.exec(select(ChatJob).where(ChatJob.action == "family_friendly")).one()
+
+    assert job.status == chat_jobs.JOB_SUCCEEDED
+    assert job.reply == "On demand"
+    assert job.finished_at is not None
+
+
+@pytest.mark.asyncio
+async def test_failed_or_fallback_pregenerations_are_retried(trips):
+    client, engine, trip_id, runs, generated = trips
+
+    with Session(engine) as session:
+        trip = session.get(SavedTrip, trip_id)
+        prepare_trip_action_jobs(session, trip)
+        for job in session.exec(select(ChatJob).where(ChatJob.trip_id == trip_id)).all():
+            if job.action == "improve_itinerary":
+                job.status = chat_jobs.JOB_FAILED
+            elif job.action == "family_friendly":
+                job.status, job.reply, job.fallback = chat_jobs.JOB_SUCCEEDED, "Try again later", True
+            session.add(job)
+        session.commit()
+
+        new_job_ids = prepare_trip_action_jobs(session, trip)
+        retried = {session.get(ChatJob, job_id).action for job_id in new_job_ids}
+        jobs = session.exec(select(ChatJob).where(ChatJob.trip_id == trip_id)).all()
+
+    assert retried == {"improve_itinerary", "family_friendly"}
+    assert len(jobs) == len(PREGENERATED_ACTIONS)
+
+
+@pytest.mark.asyncio
+async def test_pregenerated_replies_are_scoped_to_the_trip_owner_and_deleted_with_the_trip(trips):
+    client, engine, trip_id, runs, generated = trips
+
+    with Session(engine) as session:
+        trip = session.get(SavedTrip, trip_id)
+        prepare_trip_action_jobs(session, trip)
+        content_hash = trip_content_hash(build_trip_context(trip))
+        assert find_trip_action_job(session, trip, "family_friendly", content_hash) is not None
+        stranger_view = SavedTrip.model_validate(trip.model_dump(), update={"user_id": trip.user_id + 1})
+        assert find_trip_action_job(session, stranger_view, "family_friendly", content_hash) is None
+
+        session.delete(trip)
+        session.commit()
+        remaining = session.exec(select(ChatJob).where(ChatJob.trip_id == trip_id)).all()
+
+    assert remaining == []
+
+
+@pytest.mark.asyncio
+async def test_background_jobs_do_not_use_the_users_queue_slots(monkeypatch):
+    calls = []
+
+    async def fake_generate_chat_reply(message, context, **kwargs):
+        calls.append(kwargs)
+        return "Done"
+
+    monkeypatch.setattr("app.services.chat_jobs.generate_chat_reply", fake_generate_chat_reply)
+
+    job = ChatJob(id="job1", user_id=5, message="Plan", trip_id=3, priority=LLM_PRIORITY_BACKGROUND)
+
+    assert await run_chat_job(job) == "Done"
+    assert calls[0]["user_key"] == "background:user:5"